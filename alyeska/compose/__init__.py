@@ -22,28 +22,57 @@ Composer schedules Tasks in accordance with the DAG.
 """
 
 from collections import defaultdict
-from copy import deepcopy
-from hashlib import md5
 import pathlib
-from typing import Dict, Set
+from typing import Dict, List, Sequence, Set, Tuple, TYPE_CHECKING, Union
 import sys
 
 from alyeska.compose.exceptions import CyclicGraphError, EarlyAbortError
 
+if TYPE_CHECKING:  # these modules import Task from this module
+    from alyeska.compose.config import CompiledConfig
+    from alyeska.compose.graph import CSRGraph
+    from alyeska.compose.history import RunHistory
+
 
 class Task:
     """Define a Task and its relevant attributes.
 
     Note:
-        Tasks with the same loc and env are equal.
+        Tasks with the same loc and env are equal. The identity is computed
+        once when loc or env is set, so hashing and comparing Tasks is cheap.
 
     Attributes:
         loc (pathlib.Path): location of the python script that runs the task.
         env (str, optional): Which environment to run.
+        weight (float, optional): Expected duration of the task, relative to
+            other tasks. Used to prioritize the critical path.
+        inputs (`tuple` of `str`, optional): Files or glob patterns the task
+            reads, relative to the task's directory. Used to fingerprint the
+            task for incremental runs.
+        resources (`dict` of `str`: `float`, optional): How much of each
+            named resource pool the task claims while it runs.
     """
 
+    __slots__ = (
+        "_loc",
+        "_env",
+        "_validate_loc",
+        "_key",
+        "_hash",
+        "_weight",
+        "_inputs",
+        "_resources",
+    )
+
     def __init__(
-        self, loc: pathlib.Path, env: str = sys.executable, validate_loc: bool = False
+        self,
+        loc: pathlib.Path,
+        env: str = sys.executable,
+        validate_loc: bool = False,
+        *,
+        weight: float = 1,
+        inputs: Sequence[str] = (),
+        resources: Dict[str, float] = None,
     ):
         """Init a Task.
 
@@ -51,23 +80,37 @@ class Task:
             loc (pathlib.Path): location of the python script that runs the task.
             env (str, optional): Which environment to run.
             validate_loc (bool, optional): if true, validates that the task file exists.
+            weight (float, optional): Expected duration of the task. Defaults to 1.
+            inputs (Sequence[str], optional): Files or glob patterns the task
+                reads. Defaults to none.
+            resources (Dict[str, float], optional): Claims on named resource
+                pools, e.g. {"redshift": 1}. Defaults to none.
         """
         self._loc = None
         self._env = None
+        self._key = None
+        self._hash = None
+        self._weight = None
+        self._inputs = ()
+        self._resources = {}
         self._validate_loc = validate_loc
         # errors handled by property setter
         self.loc = loc
         self.env = env
+        self.weight = weight
+        self.inputs = inputs
+        self.resources = resources
 
     @property
     def loc(self):
-        return self._loc.resolve(self._validate_loc)
+        return self._loc
 
     @loc.setter
     def loc(self, new_loc: pathlib.Path):
         if new_loc == "":
             raise ValueError("`loc` must not be an empty str")
         self._loc = pathlib.Path(new_loc).resolve(self._validate_loc)
+        self._update_identity()
 
     @property
     def env(self):
@@ -85,24 +128,98 @@ class Task:
             if env == "":
                 raise ValueError("`env` must be a non-empty str")
 
-        self._env = env
+        # many tasks share an env; keep one copy of the str
+        self._env = sys.intern(env)
+        self._update_identity()
 
-    def __hash__(self):
-        """md5 is fast, and chances of collision are really low"""
-        hash_str = "-".join((self.loc.as_posix(), self.env))
-        big_int = int(md5(hash_str.encode()).hexdigest(), 16)
+    @property
+    def weight(self):
+        return self._weight
+
+    @weight.setter
+    def weight(self, new_weight: float):
+        # bool is an int, but almost certainly a mistake here
+        if isinstance(new_weight, bool) or not isinstance(new_weight, (int, float)):
+            raise TypeError("`weight` must be a number")
+        if new_weight < 0:
+            raise ValueError("`weight` must not be negative")
+
+        self._weight = new_weight
+
+    @property
+    def inputs(self):
+        return self._inputs
 
-        return big_int
+    @inputs.setter
+    def inputs(self, new_inputs: Sequence[str]):
+        if isinstance(new_inputs, (str, pathlib.PurePath)):
+            new_inputs = [new_inputs]
+        try:
+            self._inputs = tuple(sys.intern(str(i)) for i in new_inputs)
+        except TypeError:
+            raise TypeError("`inputs` must be a str or a sequence of str")
+
+    @property
+    def resources(self):
+        return self._resources
+
+    @resources.setter
+    def resources(self, new_resources: Dict[str, float]):
+        if new_resources is None:
+            new_resources = {}
+        if not isinstance(new_resources, dict):
+            raise TypeError("`resources` must be a dict")
+        for name, amount in new_resources.items():
+            if not isinstance(name, str):
+                raise TypeError("`resources` must be keyed by str")
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                raise TypeError("`resources` must map to numbers")
+            if amount < 0:
+                raise ValueError("`resources` must not be negative")
+
+        self._resources = {sys.intern(k): v for k, v in new_resources.items()}
+
+    def _update_identity(self) -> None:
+        """Cache the (loc, env) identity used by __hash__ and __eq__."""
+        if self._loc is None or self._env is None:
+            return None  # still initializing
+
+        self._key = (sys.intern(self._loc.as_posix()), self._env)
+        self._hash = hash(self._key)
+
+    def __getstate__(self):
+        # str hashes are salted per process, so _hash is never pickled
+        return (
+            self._key[0],
+            self._env,
+            self._validate_loc,
+            self._weight,
+            self._inputs,
+            self._resources,
+        )
+
+    def __setstate__(self, state):
+        loc, env, validate_loc, weight, inputs, resources = state
+        self._validate_loc = validate_loc
+        self._weight = weight
+        self._inputs = inputs
+        self._resources = resources
+        self._loc = pathlib.Path(loc)  # already resolved before pickling
+        self._env = sys.intern(env)
+        self._update_identity()
+
+    def __hash__(self):
+        return self._hash
 
     def __eq__(self, other: "Task") -> bool:
         if not isinstance(other, type(self)):
             return False
 
-        return hash(self) == hash(other)
+        return self._key == other._key
 
     def __lt__(self, other: "Task") -> bool:
         """Tasks are otherwise sorted by their loc"""
-        return self.loc < other.loc
+        return self._loc < other._loc
 
     def __repr__(self):
         """Tasks are idenfied by their loc"""
@@ -131,6 +248,15 @@ class DAG:
         _edges (`dict` of `Task`: `set` of `Task`): Maps tasks to their
            downstream dependencies. Access directly at your own peril.
            e.g. A -> B -> C, not C -> B -> A
+        _reverse_edges (`dict` of `Task`: `set` of `Task`): Maps tasks to
+           their upstream dependencies. The mirror image of _edges.
+        _sources (`set` of `Task`): Tasks with no upstream dependencies.
+        _sinks (`set` of `Task`): Tasks with no downstream dependencies.
+        _order (`dict` of `Task`: `int`): An online topological order of the
+           tasks. Every edge u -> v satisfies _order[u] < _order[v], so new
+           edges only need to search the region between their endpoints.
+        _csr (`CSRGraph`): An array-backed snapshot of the DAG, or None
+           until compile() is called. Dropped whenever the DAG changes.
     """
 
     def __init__(
@@ -151,6 +277,12 @@ class DAG:
         """
         self.tasks = set()
         self._edges = defaultdict(set)
+        self._reverse_edges = defaultdict(set)
+        self._sources = set()
+        self._sinks = set()
+        self._order = {}
+        self._next_order = 0
+        self._csr = None
 
         if isinstance(tasks, (Task, set)):
             if isinstance(tasks, set) and not all(isinstance(t, Task) for t in tasks):
@@ -163,16 +295,20 @@ class DAG:
         self.validate_dependency(upstream_dependencies)
         self.validate_dependency(downstream_dependencies)
 
-        # convert upstream mapping {b: a} to downstream mapping {a: b}
+        # convert downstream mapping {a: b} to upstream mapping {b: a}
+        dependencies = defaultdict(set)
         for k, values in downstream_dependencies.items():
             if isinstance(values, Task):
-                v = values
-                self.add_dependency(v, k)
-            else:
-                for v in values:
-                    self.add_dependency(v, k)
+                values = {values}
+            for v in values:
+                dependencies[v].add(k)
+        for k, values in upstream_dependencies.items():
+            if isinstance(values, Task):
+                values = {values}
+            dependencies[k].update(values)
 
-        self.add_dependencies(upstream_dependencies)
+        # check for cycles once, after every edge is in place
+        self.add_dependencies(dependencies, defer_cycle_check=True)
 
     def __repr__(self):
         if self.tasks:
@@ -180,6 +316,29 @@ class DAG:
         else:
             return f"{DAG.__qualname__}({set()})"
 
+    def copy(self) -> "DAG":
+        """Return a copy of the DAG.
+
+        The graph structure is copied, but the Tasks themselves are shared
+        with the original. This is much cheaper than a deepcopy.
+
+        Returns:
+            DAG: An independent DAG with the same tasks and dependencies.
+        """
+        dag = type(self).__new__(type(self))
+        dag.tasks = set(self.tasks)
+        dag._edges = defaultdict(set, {k: set(v) for k, v in self._edges.items()})
+        dag._reverse_edges = defaultdict(
+            set, {k: set(v) for k, v in self._reverse_edges.items()}
+        )
+        dag._sources = set(self._sources)
+        dag._sinks = set(self._sinks)
+        dag._order = dict(self._order)
+        dag._next_order = self._next_order
+        dag._csr = self._csr  # immutable, so it can be shared
+
+        return dag
+
     @staticmethod
     def validate_dependency(d):
         if not isinstance(d, dict):
@@ -211,7 +370,16 @@ class DAG:
         """
         if not isinstance(task, Task):
             raise TypeError("task is not a Task")
+        if task in self.tasks:
+            return None
+
         self.tasks.add(task)
+        self._csr = None
+        self._sources.add(task)
+        self._sinks.add(task)
+        # new tasks have no edges yet, so they're safe at the end of the order
+        self._order[task] = self._next_order
+        self._next_order += 1
 
     def add_tasks(self, tasks: set) -> None:
         """Add multiple tasks to the set of tasks.
@@ -236,16 +404,23 @@ class DAG:
             task (`Task`): A task to be removed from the DAG.
         """
         if not isinstance(task, Task):
-            TypeError("task is not a Composer Task")
+            raise TypeError("task is not a Composer Task")
 
         self.tasks.remove(task)
+        self._csr = None
+
+        # remove task from edges. Only its neighbors need to be updated
+        for d in list(self._edges.get(task, ())):
+            self._unlink(task, d)
+        for u in list(self._reverse_edges.get(task, ())):
+            self._unlink(u, task)
+        self._edges.pop(task, None)
+        self._reverse_edges.pop(task, None)
 
-        # remove task from edges
-        for k in self._edges:
-            if task in self._edges[k]:
-                self._edges[k].remove(task)
-        if task in self._edges:
-            del self._edges[task]
+        self._sources.discard(task)
+        self._sinks.discard(task)
+        # removing a task never invalidates the topological order
+        del self._order[task]
 
     def remove_tasks(self, tasks: set) -> None:
         """Remove multiple tasks from the set of tasks and any related edges
@@ -290,19 +465,29 @@ class DAG:
             raise TypeError("end is not a Composer Task")
 
         self.add_tasks({task, depends_on})
-        self._edges[depends_on].add(task)
 
         # cycles can only be introduced here
-        if self.is_cyclic():
-            msg = f"Adding the dependency {depends_on} -> {task}" f"introduced a cycle"
+        if task == depends_on or not self._reorder(task, depends_on):
+            msg = f"Adding the dependency {depends_on} -> {task} introduced a cycle"
             raise CyclicGraphError(msg)
 
-    def add_dependencies(self, d: Dict[Task, Set[Task]]) -> None:
+        self._link(depends_on, task)
+
+    def add_dependencies(
+        self, d: Dict[Task, Set[Task]], *, defer_cycle_check: bool = False
+    ) -> None:
         """Add multiple dependencies to DAG
 
         Args:
             d (`dict` of `Task`: `set` of `Task`): An adjacency dict mapping
                 downstream Tasks to possibly many upstream tasks.
+            defer_cycle_check (bool, optional): If true, add every dependency
+                first and check for cycles once at the end. This is much
+                faster for large batches. Defaults to False.
+
+        Raises:
+            CyclicGraphError: If the dependencies introduce a cycle. With
+                defer_cycle_check, none of the new dependencies are kept.
 
         Note:
             If any tasks do not yet exist in DAG, the task will automatically
@@ -316,6 +501,10 @@ class DAG:
             >>> dag = DAG()
             >>> dag.add_dependencies({steep_tea: {boil_water, prep_infuser}})
         """
+        if defer_cycle_check:
+            self._add_dependencies_deferred(d)
+            return None
+
         for task, dependencies in d.items():
             if isinstance(dependencies, Task):
                 dependency = dependencies
@@ -329,34 +518,154 @@ class DAG:
                     f"dependencies does not map to a set of tasks: {dependencies}"
                 )
 
+    def _add_dependencies_deferred(self, d: Dict[Task, Set[Task]]) -> None:
+        """Helper function for add_dependencies(d, defer_cycle_check=True)
+
+        Adds every edge without maintaining the topological order, then
+        rebuilds the order with a single linear-time pass.
+        """
+        new_edges = []
+        for task, dependencies in d.items():
+            if isinstance(dependencies, Task):
+                dependencies = {dependencies}
+            elif not isinstance(dependencies, set):
+                raise ValueError(
+                    f"dependencies does not map to a set of tasks: {dependencies}"
+                )
+            for dependency in dependencies:
+                if not isinstance(task, Task):
+                    raise TypeError("start is not a Composer Task")
+                if not isinstance(dependency, Task):
+                    raise TypeError("end is not a Composer Task")
+                self.add_tasks({task, dependency})
+                if self._link(dependency, task):
+                    new_edges.append((dependency, task))
+
+        order = self.get_topological_order()
+        if order is None:
+            for u, v in new_edges:
+                self._unlink(u, v)
+            raise CyclicGraphError("Adding the dependencies introduced a cycle")
+
+        self._order = {t: i for i, t in enumerate(order)}
+        self._next_order = len(order)
+
+    def _link(self, upstream: Task, downstream: Task) -> bool:
+        """Add the edge upstream -> downstream and update the indexes.
+
+        Returns:
+            True if the edge is new. False if it already existed.
+        """
+        if downstream in self._edges[upstream]:
+            return False
+
+        self._csr = None
+        self._edges[upstream].add(downstream)
+        self._reverse_edges[downstream].add(upstream)
+        self._sinks.discard(upstream)
+        self._sources.discard(downstream)
+
+        return True
+
+    def _unlink(self, upstream: Task, downstream: Task) -> None:
+        """Remove the edge upstream -> downstream and update the indexes."""
+        self._csr = None
+        self._edges[upstream].remove(downstream)
+        self._reverse_edges[downstream].remove(upstream)
+        if not self._edges[upstream]:
+            self._sinks.add(upstream)
+        if not self._reverse_edges[downstream]:
+            self._sources.add(downstream)
+
+    def _reorder(self, task: Task, depends_on: Task) -> bool:
+        """Helper function for add_dependency
+
+        Update the online topological order for the new edge
+        depends_on -> task. Only tasks ordered between the two endpoints are
+        visited (Pearce & Kelly, 2006).
+
+        Returns:
+            True if the order was updated. False if the edge would introduce
+            a cycle, in which case nothing changes.
+        """
+        lower = self._order[task]
+        upper = self._order[depends_on]
+        if upper < lower:
+            return True  # the order already agrees with the new edge
+
+        # tasks reachable from `task` that are ordered before `depends_on`
+        forward = {task}
+        stack = [task]
+        while stack:
+            t = stack.pop()
+            for d in self._edges.get(t, ()):
+                if d == depends_on:
+                    return False
+                if d not in forward and self._order[d] < upper:
+                    forward.add(d)
+                    stack.append(d)
+
+        # tasks that reach `depends_on` and are ordered after `task`
+        backward = {depends_on}
+        stack = [depends_on]
+        while stack:
+            t = stack.pop()
+            for u in self._reverse_edges.get(t, ()):
+                if u not in backward and self._order[u] > lower:
+                    backward.add(u)
+                    stack.append(u)
+
+        # move the backward region ahead of the forward region, reusing the
+        # same order slots
+        key = self._order.__getitem__
+        moved = sorted(backward, key=key) + sorted(forward, key=key)
+        slots = sorted(self._order[t] for t in moved)
+        for t, i in zip(moved, slots):
+            self._order[t] = i
+
+        return True
+
     # ------------------------------------------------------------------------
     # Graph Utilities
     # ------------------------------------------------------------------------
-    # nested loops are easier to read here. If time-complexity becomes a
-    # problem, the user clearly needs to use a full-featured scheduler
+    # Adjacency, sources and sinks are maintained as edges change,
+    # so lookups never rebuild the graph.
 
-    def get_downstream(self) -> dict:
+    def get_downstream(self, task: Task = None) -> Union[dict, set]:
         """Return adjacency dict of downstream Tasks.
 
+        Args:
+            task (`Task`, optional): If supplied, return only the Tasks
+                immediately downstream of this task.
+
         Returns:
-            `dict` of `Task`: `set` of `Task`
+            `dict` of `Task`: `set` of `Task`, or `set` of `Task` if a task
+                is supplied.
         """
+        if task is not None:
+            return set(self._edges.get(task, ()))
+
         downstream = {k: v for k, v in self._edges.items() if len(v) > 0}
 
         return defaultdict(set, downstream)
 
-    def get_upstream(self) -> dict:
+    def get_upstream(self, task: Task = None) -> Union[dict, set]:
         """Return adjacency dict of upstream Tasks
 
+        Args:
+            task (`Task`, optional): If supplied, return only the Tasks
+                immediately upstream of this task.
+
         Returns:
-            `dict` of `Task`: `set` of `Task`
+            `dict` of `Task`: `set` of `Task`, or `set` of `Task` if a task
+                is supplied.
         """
-        upstream = defaultdict(set)
-        for u, d in self.get_downstream().items():
-            for v in d:
-                upstream[v].add(u)
+        if task is not None:
+            return set(self._reverse_edges.get(task, ()))
+
+        upstream = {k: set(v) for k, v in self._reverse_edges.items() if len(v) > 0}
 
-        return upstream
+        return defaultdict(set, upstream)
 
     def get_sources(self) -> set:
         """Return the set of source Tasks (Tasks with no upstream dependencies)
@@ -364,13 +673,7 @@ class DAG:
         Returns:
             `set` of `Task`
         """
-        sources = set()
-        for t in self.tasks:
-            if t in self.get_upstream():
-                continue
-            sources.add(t)
-
-        return sources
+        return set(self._sources)
 
     def get_sinks(self) -> set:
         """Return the set of sink Tasks (Tasks with no downstream dependencies)
@@ -378,33 +681,200 @@ class DAG:
         Returns:
             `set` of `Task`
         """
-        sinks = set()
-        for t in self.tasks:
-            if t in self.get_downstream():
-                continue
-            sinks.add(t)
+        return set(self._sinks)
 
-        return sinks
+    def get_descendants(self, tasks: Set[Task]) -> Set[Task]:
+        """Return the tasks downstream of any of the given tasks, directly or
+        indirectly. The given tasks are not included unless they are
+        downstream of each other.
 
-    def _is_cyclic(self, task, visited, stack) -> bool:
-        """Helper function for is_cyclic
+        Args:
+            tasks (`set` of `Task`): Tasks to start from.
 
         Returns:
-            True if cycle detected. False otherwise.
+            `set` of `Task`
+        """
+        if isinstance(tasks, Task):
+            tasks = {tasks}
+
+        csr = self.compile()
+        ids = csr.get_ids(t for t in tasks if t in csr.ids)
+        return csr.get_tasks(csr.reachable(ids))
+
+    def get_ancestors(self, tasks: Set[Task]) -> Set[Task]:
+        """Return the tasks upstream of any of the given tasks, directly or
+        indirectly. The given tasks are not included unless they are
+        upstream of each other.
+
+        Args:
+            tasks (`set` of `Task`): Tasks to start from.
+
+        Returns:
+            `set` of `Task`
         """
-        visited[task] = True
-        stack[task] = True
+        if isinstance(tasks, Task):
+            tasks = {tasks}
+
+        csr = self.compile()
+        ids = csr.get_ids(t for t in tasks if t in csr.ids)
+        return csr.get_tasks(csr.reachable(ids, reverse=True))
 
-        for d in self.get_downstream()[task]:
-            if not visited[d]:
-                if self._is_cyclic(d, visited, stack):
-                    return True
-            elif stack[d]:
-                return True
+    def subgraph(self, targets: Set[Task], direction: str = "upstream") -> "DAG":
+        """Return the slice of the DAG needed to run the targets.
 
-        stack[task] = False
+        The slice is found by walking the DAG's adjacency sets out from the
+        targets rather than the compiled snapshot, so only the sliced tasks
+        and their dependencies are visited, and a small slice of a large DAG
+        stays cheap.
 
-        return False
+        Args:
+            targets (`set` of `Task`): Tasks to slice around.
+            direction (str, optional): Either 'upstream', 'downstream' or
+                'both'. 'upstream' keeps the targets and everything they
+                depend on. 'downstream' keeps the targets and everything that
+                depends on them. Defaults to 'upstream'.
+
+        Raises:
+            ValueError: If direction is invalid, or a target is not in the DAG.
+
+        Returns:
+            DAG: A new DAG of the sliced tasks and the dependencies between
+                them. The Tasks are shared with this DAG.
+        """
+        if direction not in ("upstream", "downstream", "both"):
+            raise ValueError("direction must be 'upstream', 'downstream' or 'both'")
+        if isinstance(targets, Task):
+            targets = {targets}
+
+        for t in targets:
+            if not isinstance(t, Task):
+                raise TypeError("targets must be Tasks")
+            if t not in self.tasks:
+                raise ValueError(f"{t} is not in the DAG")
+
+        keep = set(targets)
+        if direction in ("upstream", "both"):
+            keep |= self._walk(targets, self._reverse_edges)
+        if direction in ("downstream", "both"):
+            keep |= self._walk(targets, self._edges)
+
+        dag = type(self)()
+        # tasks are added in topological order, so their order stays valid
+        for t in sorted(keep, key=self._order.__getitem__):
+            dag.add_task(t)
+        for t in keep:
+            for d in self._edges.get(t, ()):
+                if d in keep:
+                    dag._link(t, d)
+
+        return dag
+
+    @staticmethod
+    def _walk(tasks: Set[Task], adjacency: Dict[Task, Set[Task]]) -> Set[Task]:
+        """Helper function for subgraph
+
+        Return the tasks reachable from tasks through adjacency, excluding
+        tasks unless they are reachable from each other.
+        """
+        found = set()
+        stack = list(tasks)
+        while stack:
+            for t in adjacency.get(stack.pop(), ()):
+                if t not in found:
+                    found.add(t)
+                    stack.append(t)
+
+        return found
+
+    def get_topological_order(self) -> Union[List[Task], None]:
+        """Return the tasks such that every task comes after its upstream
+        dependencies.
+
+        Runs in linear time with Kahn's algorithm.
+
+        Returns:
+            `list` of `Task`, or None if the DAG is cyclic.
+        """
+        csr = self.compile()
+        order = csr.topological_order()
+        if order is None:
+            return None
+
+        return [csr.tasks[i] for i in order]
+
+    def compile(self) -> "CSRGraph":
+        """Return an array-backed snapshot of the DAG.
+
+        Traversals that read the whole graph, like topological sorting and
+        reachability, run on the snapshot. It's built in linear time the
+        first time it's needed and reused until the DAG changes. It's held in
+        addition to the DAG's own indexes, about a tenth more memory; see
+        alyeska.compose.graph.
+
+        Returns:
+            CSRGraph: See alyeska.compose.graph.
+        """
+        if self._csr is None:
+            # keep this class out of the __init__ namespace
+            from alyeska.compose.graph import CSRGraph
+
+            self._csr = CSRGraph(self.tasks, self._edges, self._reverse_edges)
+
+        return self._csr
+
+    def get_redundant_dependencies(self) -> Set[Tuple[Task, Task]]:
+        """Return the dependencies implied by other dependencies.
+
+        A -> C is redundant if C also depends on A indirectly, e.g. through
+        A -> B -> C. Reachability is kept as one int bitset per task, so each
+        edge costs a few big-int operations instead of a graph search.
+
+        Raises:
+            CyclicGraphError: If the DAG is cyclic.
+
+        Returns:
+            `set` of (`Task`, `Task`): (upstream, downstream) pairs
+        """
+        csr = self.compile()
+        order = csr.topological_order()
+        if order is None:
+            raise CyclicGraphError("Cannot reduce a cyclic graph")
+        position = [0] * len(csr)
+        for p, i in enumerate(order):
+            position[i] = p
+
+        redundant = set()
+        reachable = [0] * len(csr)  # bitset of the positions downstream of each id
+        for i in reversed(order):
+            covered = 0
+            # a task reachable through another child comes after that child
+            for j in sorted(csr.downstream(i), key=position.__getitem__):
+                bit = 1 << position[j]
+                if covered & bit:
+                    redundant.add((csr.tasks[i], csr.tasks[j]))
+                else:
+                    covered |= bit | reachable[j]
+            reachable[i] = covered
+
+        return redundant
+
+    def transitive_reduction(self) -> "DAG":
+        """Return an equivalent DAG with the fewest dependencies.
+
+        Every task depends on the same tasks, directly or indirectly, but
+        redundant dependencies are removed. See get_redundant_dependencies.
+
+        Raises:
+            CyclicGraphError: If the DAG is cyclic.
+
+        Returns:
+            DAG: A reduced copy. The Tasks are shared with this DAG.
+        """
+        dag = self.copy()
+        for upstream, downstream in self.get_redundant_dependencies():
+            dag._unlink(upstream, downstream)
+
+        return dag
 
     def is_cyclic(self) -> bool:
         """Detect if the DAG is cyclic.
@@ -412,66 +882,77 @@ class DAG:
         Returns:
             True if cycle detected. False otherwise.
         """
-        ## developers note:
-        ## I used this source as reference, but the algorithm is pretty well
-        ## documented everywhere
-        ## https://www.geeksforgeeks.org/detect-cycle-in-a-graph/
-
-        visited = {t: False for t in self.tasks}
-        # which tasks are in recursion stack
-        stack = {t: False for t in self.tasks}
-        for task in self.tasks:
-            if not visited[task]:
-                if self._is_cyclic(task, visited, stack):
-                    return True
-
-        return False
+        return self.get_topological_order() is None
 
     @classmethod
-    def from_yaml(cls, p: pathlib.Path) -> "DAG":
+    def from_yaml(cls, p: pathlib.Path, cache_dir: pathlib.Path = None) -> "DAG":
         """Create a DAG from a compose.yaml file
 
+        Args:
+            p (pathlib.Path): path to compose.yaml
+            cache_dir (pathlib.Path, optional): If supplied, save the compiled
+                DAG in this directory and reuse it until compose.yaml changes.
+                See alyeska.compose.cache. Defaults to None.
+
         Returns:
             DAG: Directed Acyclic Graph representation of compose.yaml
         """
+        if cache_dir is not None:
+            return Composer.from_yaml(p, cache_dir).original_dag
+
         # keep these functions out of the __init__ namespace
-        from alyeska.compose.config import (
-            parse_config,
-            parse_tasks,
-            parse_upstream_dependencies,
-        )
+        from alyeska.compose.config import load_config
 
-        config = parse_config(p)
-        tasks = set(parse_tasks(config).values())
-        upstream_dependencies = parse_upstream_dependencies(config)
-        return cls(tasks=tasks, upstream_dependencies=upstream_dependencies)
+        return cls.from_config(load_config(p))
+
+    @classmethod
+    def from_config(cls, compiled: "CompiledConfig") -> "DAG":
+        """Create a DAG from an already loaded compose.yaml file
+
+        Args:
+            compiled (CompiledConfig): as returned by config.load_config
+
+        Returns:
+            DAG: Directed Acyclic Graph representation of compose.yaml
+        """
+        return cls(
+            tasks=set(compiled.task_map.values()),
+            upstream_dependencies=compiled.dependency_map,
+        )
 
 
 class Composer:
     """The Composer handles all the scheduling computations.
 
     Attributes:
-        dag (DAG): A copy of the originally supplied DAG. This attribute is
-            trimmed while planning the schedule.
+        dag (DAG): A snapshot of the originally supplied DAG. Composer only
+            reads from this attribute; planning a schedule never modifies it.
         original_dag (DAG): The originally supplied DAG. Used to refresh dag
-            after the schedule is planned.
+            if the original changes.
+        resources (`dict` of `str`: `float`): Capacity of each named resource
+            pool. Running tasks never claim more than this in total.
     """
 
-    def __init__(self, dag: DAG):
+    def __init__(self, dag: DAG, resources: Dict[str, float] = None):
         """Init a Composer.
 
         Args:
             dag (DAG): A DAG of tasks and dependencies to be scheduled.
+            resources (Dict[str, float], optional): Capacity of each named
+                resource pool, e.g. {"redshift": 4, "memory_gb": 64}. Pools
+                that aren't named here are unlimited. Defaults to None.
         """
         self.original_dag = dag
+        self.resources = dict(resources or {})
         self.refresh_dag()
 
     def __repr__(self):
         return f"{Composer.__qualname__}({self.dag})"
 
     def refresh_dag(self) -> None:
-        """Create a deepcopy of the original_dag."""
-        self.dag = deepcopy(self.original_dag)
+        """Take a new snapshot of the original_dag."""
+        self.dag = self.original_dag.copy()
+        self._schedules = None
 
     def get_task_schedules(self) -> Dict[Task, int]:
         """Define schedule priority level for each task
@@ -483,90 +964,181 @@ class Composer:
             make_tea -> pour_tea -> drink_tea will give the dict:
             {make_tea: 1, pour_tea: 2, drink_tea: 3}
         """
-        dag = self.dag  # copy to something easier to read
-        task_priority = defaultdict(int)
-        visited = set()
-        i = 1
+        # levels come from the DAG's array-backed snapshot, so dag is never
+        # modified
+        csr = self.dag.compile()
+        levels = csr.levels() or ()  # a cyclic DAG has no levels
 
-        while dag.get_sources():
-            task_priority.update({t: i for t in dag.get_sources()})
-            for t in dag.get_sources():
-                visited.add(t)
-                dag.remove_task(t)
-            i += 1
+        return defaultdict(int, zip(csr.tasks, levels))
 
-        self.refresh_dag()
+    def get_task_priorities(
+        self, weights: Dict[Task, float] = None
+    ) -> Dict[Task, float]:
+        """Weigh each task by its longest remaining path to any sink.
+
+        Tasks on the critical path have the highest priority. Starting them
+        first shortens the total runtime when not every ready task can run
+        at once.
+
+        Args:
+            weights (`dict` of `Task`: `float`, optional): Expected duration
+                of each task. Defaults to each Task's weight attribute.
 
-        return task_priority
+        Returns:
+            `dict` of `Task`: `float`
+
+        Example:
+            make_tea -> pour_tea -> drink_tea with unit weights will give
+            {make_tea: 3, pour_tea: 2, drink_tea: 1}
+        """
+        if weights is None:
+            weights = {}
+
+        csr = self.dag.compile()
+        longest = csr.longest_paths([weights.get(t, t.weight) for t in csr.tasks])
+        if longest is None:
+            return {}
 
-    def get_schedules(self) -> Dict[int, Set[Task]]:
+        return dict(zip(csr.tasks, longest))
+
+    def get_schedules(self) -> Dict[int, List[Task]]:
         """Schedule tasks by priority level.
 
+        Within each level, tasks are ordered by their priority from
+        get_task_priorities, highest first.
+
         Returns:
-            `dict` of `int`: `set` of `Task`
+            `dict` of `int`: `list` of `Task`
 
         For example, make_tea -> pour_tea -> drink_tea will give the dict
-            {1: {make_tea},
-             2: {pour_tea},
-             3: {drink_tea}}
+            {1: [make_tea],
+             2: [pour_tea],
+             3: [drink_tea]}
         """
-        priorities = defaultdict(set)
-        task_priorities = self.get_task_schedules()
-        for k, v in task_priorities.items():
-            priorities[v].add(k)
+        # dag is a read-only snapshot, so its schedule only changes with
+        # refresh_dag
+        if self._schedules is None:
+            schedules = defaultdict(list)
+            task_schedules = self.get_task_schedules()
+            task_priorities = self.get_task_priorities()
+            for k in sorted(task_schedules, key=lambda t: (-task_priorities[t], t)):
+                schedules[task_schedules[k]].append(k)
+            self._schedules = sorted(schedules.items())
+
+        return defaultdict(list, ((i, list(ts)) for i, ts in self._schedules))
+
+    def run_tasks(
+        self,
+        *,
+        max_workers: int = None,
+        error_handling: str = "soft",
+        history: "RunHistory" = None,
+        resume: str = None,
+        incremental: bool = False,
+    ) -> dict:
+        """Run all tasks on the DAG as subprocesses.
 
-        self.refresh_dag()
+        Each task starts as soon as its upstream tasks succeed. See
+        alyeska.compose.executor.run_dag for details.
 
-        return priorities
+        Args:
+            max_workers (int, optional): Maximum number of tasks that run at
+                once. Defaults to the number of CPUs.
+            error_handling (str): Either 'soft' or 'hard'. 'hard' error
+                handling will abort the schedule after the first error.
+            history (RunHistory, optional): If supplied, record the run in
+                this history, and prioritize tasks by their past durations
+                where known. Defaults to None.
+            resume (str, optional): A run id from history. Tasks that
+                succeeded in that run are skipped, unless they are downstream
+                of a task that did not. Results are recorded under the same
+                run id. Defaults to None.
+            incremental (bool, optional): If true, skip tasks whose
+                fingerprint matches their last successful run in history.
+                See alyeska.compose.fingerprint. Defaults to False.
+
+        Raises:
+            EarlyAbortError: If a task fails and error_handling is 'hard'.
+
+        Returns:
+            `dict` of `Task`: `TaskResult`
+        """
+        # keep these functions out of the __init__ namespace
+        from alyeska.compose.executor import run_dag
+        from alyeska.compose.fingerprint import get_fingerprints
+
+        weights = None
+        if history is not None:
+            weights = history.get_expected_durations(self.dag.tasks)
+
+        skip = set()
+        if resume is not None:
+            if history is None:
+                raise ValueError("`resume` requires a `history`")
+            history.resume_run(resume)
+            succeeded = history.get_succeeded(resume, self.dag.tasks)
+            rerun = self.dag.tasks - succeeded
+            skip = succeeded - self.dag.get_descendants(rerun)
+
+        fingerprints = None
+        if history is not None:
+            fingerprints = get_fingerprints(self.dag)
+        if incremental:
+            if history is None:
+                raise ValueError("`incremental` requires a `history`")
+            # a changed task changes the fingerprints of all its descendants
+            last_fingerprints = history.get_last_fingerprints(self.dag.tasks)
+            skip |= {
+                t for t, fp in fingerprints.items() if last_fingerprints.get(t) == fp
+            }
+            # a task's last success can match even though an upstream task's
+            # doesn't, e.g. after a change was reverted. It still has to wait
+            # for, and re-run after, everything that runs upstream of it
+            skip -= self.dag.get_descendants(self.dag.tasks - skip)
+
+        return run_dag(
+            self.dag,
+            max_workers=max_workers,
+            error_handling=error_handling,
+            priorities=self.get_task_priorities(weights),
+            history=history,
+            run_id=resume,
+            skip=skip,
+            fingerprints=fingerprints,
+            resources=self.resources,
+        )
 
     @classmethod
-    def from_yaml(cls, p: pathlib.Path) -> "Composer":
+    def from_yaml(cls, p: pathlib.Path, cache_dir: pathlib.Path = None) -> "Composer":
         """Create a Composer from a compose.yaml file
 
+        Args:
+            p (pathlib.Path): path to compose.yaml
+            cache_dir (pathlib.Path, optional): If supplied, save the compiled
+                DAG and its schedule in this directory and reuse them until
+                compose.yaml changes. See alyeska.compose.cache. Defaults to
+                None.
+
+        Returns:
+            Composer: A Composer representation of compose.yaml
+        """
+        # keep these functions out of the __init__ namespace
+        from alyeska.compose.cache import load_composer
+        from alyeska.compose.config import load_config
+
+        if cache_dir is not None:
+            return load_composer(p, cache_dir)
+
+        return cls.from_config(load_config(p))
+
+    @classmethod
+    def from_config(cls, compiled: "CompiledConfig") -> "Composer":
+        """Create a Composer from an already loaded compose.yaml file
+
+        Args:
+            compiled (CompiledConfig): as returned by config.load_config
+
         Returns:
             Composer: A Composer representation of compose.yaml
         """
-        dag = DAG.from_yaml(p)
-        return cls(dag)
-
-
-# ----------------------------------------------------------------------------
-# We won't run tasks out of the Composer for now.
-# ----------------------------------------------------------------------------
-
-# def run_task(self, task: Task) -> None:
-#     """Run the python file defined by Task.loc in the environment defined
-#     by the Task.env
-
-#     Args:
-#         task (`Task`): The task to be run.
-#     """
-#     if not hash(task) in [hash(t) for t in self.dag.tasks]:
-#         raise ValueError(f"{task} is not in the dag")
-
-#     logging.info(f"Running {repr(task)}")
-#     subprocess_run(f"{task.env} {task.loc}", shell=True, check=True)
-
-# def run_tasks(self, error_handling: str = "soft") -> None:
-#     """Run all tasks on the DAG.
-
-#     Args:
-#         error_handling (str): Either 'soft' or 'hard'. 'hard' error
-#             handling will abort the schedule after the first error.
-#     """
-#     if not isinstance(error_handling, str):
-#         raise TypeError("`error_handling` must be a str")
-#     if error_handling not in ("soft", "hard"):
-#         raise ValueError("`error_handling` must be in ('soft', 'hard')")
-
-#     self.refresh_dag()  # refresh just in case
-#     priorities = self.get_schedules()
-
-#     for _, tasks in priorities.items():
-#         for task in tasks:
-#             try:
-#                 self.run_task(task)
-#             except Exception as err:
-#                 logging.error(err)
-#                 if error_handling == "hard":
-#                     raise EarlyAbortError()
+        return cls(DAG.from_config(compiled), compiled.resources)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Cache compiled compose.yaml files on disk
+
+Building a DAG from compose.yaml parses the file, resolves every Task's path
+and checks the graph for cycles. The cache pickles the resulting Composer,
+schedule included, so later calls only have to hash the file and unpickle.
+
+Each compose.yaml gets one cache entry, keyed by the file's contents, the
+alyeska version and the working directory that relative task paths resolve
+against. Changing any of them invalidates the entry.
+"""
+
+from hashlib import sha256
+import os
+import pathlib
+import pickle
+import tempfile
+from typing import Union
+
+import alyeska
+from alyeska.compose import Composer
+from alyeska.compose.config import load_config
+
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".alyeska" / "compose-cache"
+
+
+def get_cache_key(yaml_bytes: bytes) -> str:
+    """Hash everything a compiled compose.yaml depends on
+
+    Args:
+        yaml_bytes (bytes): contents of compose.yaml
+
+    Returns:
+        str: hex digest
+    """
+    h = sha256()
+    for part in (alyeska.__version__, os.getcwd()):
+        h.update(part.encode())
+        h.update(b"\0")
+    h.update(yaml_bytes)
+
+    return h.hexdigest()
+
+
+def get_cache_path(p: pathlib.Path, cache_dir: pathlib.Path) -> pathlib.Path:
+    """Locate the cache entry of a compose.yaml file
+
+    Args:
+        p (pathlib.Path): path to compose.yaml
+        cache_dir (pathlib.Path): directory holding the cache entries
+
+    Returns:
+        pathlib.Path: where the file's entry is, or would be, saved
+    """
+    name = sha256(pathlib.Path(p).resolve().as_posix().encode()).hexdigest()
+
+    return pathlib.Path(cache_dir) / f"{name}.pickle"
+
+
+def read_cache(path: pathlib.Path, key: str) -> Union[Composer, None]:
+    """Load a cached Composer
+
+    Returns:
+        Composer: the cached Composer, or None if there is no entry, the
+            entry is stale, or it can't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            cached_key, composer = pickle.load(f)
+    except Exception:
+        # missing, truncated, or written by an incompatible alyeska
+        return None
+
+    if cached_key != key:
+        return None
+
+    return composer
+
+
+def write_cache(path: pathlib.Path, key: str, composer: Composer) -> None:
+    """Save a Composer as a cache entry
+
+    The entry is written to a temporary file first and then renamed, so
+    concurrent readers never see a partial entry.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((key, composer), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, str(path))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_composer(
+    p: pathlib.Path, cache_dir: pathlib.Path = DEFAULT_CACHE_DIR
+) -> Composer:
+    """Create a Composer from a compose.yaml file, using the cache if possible
+
+    Args:
+        p (pathlib.Path): path to compose.yaml
+        cache_dir (pathlib.Path, optional): directory holding the cache
+            entries. Defaults to ~/.alyeska/compose-cache.
+
+    Raises:
+        CyclicGraphError: If compose.yaml is cyclic. Cyclic files are never
+            cached.
+
+    Returns:
+        Composer: A Composer representation of compose.yaml
+    """
+    p = pathlib.Path(p)
+    key = get_cache_key(p.read_bytes())
+    path = get_cache_path(p, cache_dir)
+
+    composer = read_cache(path, key)
+    if composer is None:
+        composer = Composer.from_config(load_config(p))
+        composer.get_schedules()  # computed once, saved with the entry
+        write_cache(path, key, composer)
+
+    return composer
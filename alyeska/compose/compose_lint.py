@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""check compose.yaml files for problems
+
+Usage:
+```sh
+$ compose-lint compose.yaml
+compose.yaml: time_period uses numbers, which it already depends on indirectly
+```
+
+Invalid files are reported with every validation error, e.g. each `uses:`
+entry naming a missing task and each dependency cycle.
+
+Exits with 1 if any problems were found.
+"""
+
+import argparse
+import pathlib
+from typing import List, Tuple, Union
+
+from alyeska.compose import DAG
+from alyeska.compose.config import CompiledConfig, load_config
+from alyeska.compose.exceptions import ConfigurationError
+
+# None until init_flags() is called.
+FLAGS: Union[argparse.Namespace, None] = None
+
+
+def get_redundant_uses(compiled: CompiledConfig) -> List[Tuple[str, str]]:
+    """Find the `uses:` entries that other `uses:` entries already imply
+
+    Args:
+        compiled (CompiledConfig): as returned by config.load_config
+
+    Returns:
+        List[Tuple[str, str]]: (task, upstream task) aliases, sorted
+    """
+    dag = DAG.from_config(compiled)
+    names = compiled.inv_task_map
+
+    return sorted(
+        (names[downstream], names[upstream])
+        for upstream, downstream in dag.get_redundant_dependencies()
+    )
+
+
+def lint_yaml(compose_yaml: pathlib.Path) -> List[str]:
+    """Check compose.yaml for problems
+
+    Args:
+        compose_yaml (pathlib.Path): Path to the compose.yaml file
+
+    Returns:
+        List[str]: a message for each problem found
+    """
+    try:
+        compiled = load_config(compose_yaml)
+    except ConfigurationError as e:
+        return e.errors
+
+    return [
+        f"{task} uses {upstream}, which it already depends on indirectly"
+        for task, upstream in get_redundant_uses(compiled)
+    ]
+
+
+def init_flags(prefab_flags: List = None) -> None:
+    """ Initializes the flags for this tool.
+
+    Args:
+        prefab_flags (List, optional): A list of flags to parse. Useful for testing.
+
+    Returns:
+        None -- the now-parsed flags can be accessed through the FLAGS variable.
+    """
+    global FLAGS
+    if FLAGS:
+        raise ValueError("Cannot parse flags more than once.")
+
+    parser = argparse.ArgumentParser(description="Check compose.yaml for problems")
+    parser.add_argument(
+        "config_file",
+        metavar="config_file",
+        type=pathlib.Path,
+        help="Python compose configuration file",
+    )
+
+    if prefab_flags is None:
+        FLAGS = parser.parse_args()
+    else:
+        FLAGS = parser.parse_args(prefab_flags)
+
+
+def main(args: List = None) -> int:
+    init_flags(args)
+    problems = lint_yaml(FLAGS.config_file)
+    for problem in problems:
+        print(f"{FLAGS.config_file}: {problem}")
+
+    return 1 if problems else 0
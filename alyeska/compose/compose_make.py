@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""convert compose.yaml files to Makefiles
+
+Every task becomes a target that touches a stamp file once the task succeeds.
+A task's prerequisites are its script, its declared inputs and the stamps of
+the tasks it uses, so `make -j16` runs independent tasks in parallel, and
+re-running make only re-runs tasks whose script, inputs or upstream tasks
+changed since their last success.
+
+Input globs are expanded when the Makefile is written, exactly as compose-run
+expands them, so regenerate the Makefile after adding or removing input files.
+
+Usage:
+```Makefile
+# Makefile generated by alyeska's compose-make from the file below
+# /Users/nick.vogt/dev/ci-alyeska/tests/compose/config-samples/compose-small.yaml
+
+SHELL := /bin/bash
+STAMP_DIR ?= .compose-stamps
+
+.PHONY: all clean
+all: $(STAMP_DIR)/numbers $(STAMP_DIR)/calendar $(STAMP_DIR)/time_period
+
+clean:
+    rm -rf $(STAMP_DIR)
+
+# numbers
+$(STAMP_DIR)/numbers: /Users/nick.vogt/dev/ci-alyeska/db/numbers/main.py
+    cd /Users/nick.vogt/dev/ci-alyeska/db/numbers && source activate ci-python36-2.1 && python main.py
+    @mkdir -p $(@D) && touch $@
+...
+```
+"""
+
+import argparse
+import pathlib
+import re
+import shlex
+import time
+from typing import Dict, List, Union
+
+from alyeska.compose import Task, Composer
+from alyeska.compose.config import load_config
+from alyeska.compose.fingerprint import find_inputs
+
+# None until init_flags() is called.
+FLAGS: Union[argparse.Namespace, None] = None
+
+# characters that are safe in a make target without escaping
+SAFE_TARGET = re.compile(r"^[\w.-]+$")
+
+
+def get_docstring(compose_yaml: pathlib.Path) -> str:
+    compose_yaml = pathlib.Path(compose_yaml)
+    current_time_utc = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    return (
+        f"# Makefile generated by alyeska's compose-make from the file below\n"
+        f"# {pathlib.Path(compose_yaml).resolve()}\n"
+        f"# created at: {current_time_utc}"
+    )
+
+
+def escape_prerequisite(s: str) -> str:
+    """Escape a path for use as a make target or prerequisite"""
+    return s.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def escape_recipe(s: str) -> str:
+    """Quote a word for use in a make recipe, which make passes to the shell"""
+    return shlex.quote(s).replace("$", "$$")
+
+
+def get_stamps(task_map: Dict[str, Task]) -> Dict[Task, str]:
+    """Name the stamp file of each task after its alias
+
+    Raises:
+        ValueError: If a task alias can't be used as a file name in a Makefile.
+
+    Returns:
+        Dict[Task, str]: stamp target of each task
+    """
+    stamps = {}
+    for task_name, task in task_map.items():
+        if not SAFE_TARGET.match(task_name):
+            raise ValueError(
+                f"Task {task_name!r} must only contain letters, digits, '_', "
+                "'.' and '-' to be a make target"
+            )
+        stamps[task] = f"$(STAMP_DIR)/{task_name}"
+
+    return stamps
+
+
+def get_rules(compose_yaml: pathlib.Path) -> str:
+    compiled = load_config(compose_yaml, FLAGS.check_file_presence)
+    stamps = get_stamps(compiled.task_map)
+
+    rules = []
+    targets = []
+    composer = Composer.from_config(compiled)
+    for _, tasks in composer.get_schedules().items():
+        for task in tasks:
+            targets.append(stamps[task])
+            prerequisites = [escape_prerequisite(task.loc.as_posix())]
+            # make's $(wildcard) has no recursive **, so expand the globs the
+            # same way the fingerprints of compose-run --incremental do
+            prerequisites.extend(
+                escape_prerequisite(p.as_posix()) for p in find_inputs(task)
+            )
+            prerequisites.extend(
+                sorted(stamps[t] for t in compiled.dependency_map[task])
+            )
+
+            cmd = " && ".join(
+                [
+                    f"cd {escape_recipe(str(task.loc.parent))}",
+                    f"source activate {escape_recipe(task.env)}",
+                    f"python {escape_recipe(task.loc.name)}",
+                ]
+            )
+            rule = "\n".join(
+                [
+                    f"# {compiled.inv_task_map[task]}",
+                    f"{stamps[task]}: {' '.join(prerequisites)}",
+                    f"\t{cmd}",
+                    "\t@mkdir -p $(@D) && touch $@",
+                ]
+            )
+            rules.append(rule)
+
+    header = "\n".join(
+        [
+            "SHELL := /bin/bash",
+            "STAMP_DIR ?= .compose-stamps",
+            "",
+            ".PHONY: all clean",
+            f"all: {' '.join(targets)}",
+            "",
+            "clean:",
+            "\trm -rf $(STAMP_DIR)",
+        ]
+    )
+
+    return "\n\n".join([header, *rules])
+
+
+def convert_yaml_to_make(compose_yaml: pathlib.Path, ofile: pathlib.Path = None) -> str:
+    """Export a Makefile based on yaml config
+
+    Args:
+        compose_yaml (pathlib.Path): Path to the config.yaml file
+        ofile (pathlib.Path, optional): Where to export the Makefile. Defaults
+            to None.
+
+    Returns:
+        str: output of the Makefile
+    """
+    if ofile:
+        ofile = pathlib.Path(ofile).resolve()
+
+    docstring = get_docstring(compose_yaml)
+    rules = get_rules(compose_yaml)
+    trailing_newline = "\n"
+    makefile = "\n".join([docstring, "", rules, trailing_newline])
+
+    if ofile is not None:
+        ofile.write_text(makefile)
+
+    return makefile
+
+
+def init_flags(prefab_flags: List = None) -> None:
+    """Initializes the flags for this tool.
+
+    Args:
+        prefab_flags (List, optional): A list of flags to parse. Useful for testing.
+
+    Returns:
+        None -- the now-parsed flags can be accessed through the FLAGS variable.
+    """
+    global FLAGS
+    if FLAGS:
+        raise ValueError("Cannot parse flags more than once.")
+
+    parser = argparse.ArgumentParser(description="Convert compose.yaml to a Makefile")
+    parser.add_argument(
+        "config_file",
+        metavar="config_file",
+        type=pathlib.Path,
+        help="Python compose configuration file",
+    )
+    parser.add_argument(
+        "-o", action="store", dest="ofile", default="Makefile", type=pathlib.Path
+    )
+    parser.add_argument(
+        "--no-check",
+        action="store_false",  # Store false to avoid a negative boolean in the code
+        dest="check_file_presence",
+        help="When set, the utility will not enforce the presence of task files",
+    )
+    parser.add_argument("-v", action="store_true", dest="verbose_output")
+
+    if prefab_flags is None:
+        FLAGS = parser.parse_args()
+    else:
+        FLAGS = parser.parse_args(prefab_flags)
+
+
+def main(args: List = None):
+    init_flags(args)
+    output = convert_yaml_to_make(FLAGS.config_file, FLAGS.ofile)
+    if FLAGS.verbose_output:
+        print(output)
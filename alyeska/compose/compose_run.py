@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""run the tasks in a compose.yaml file in parallel
+
+Every run is recorded in a run history. If a run fails, resume it to skip the
+tasks that already succeeded and re-run only the failed tasks and everything
+downstream of them. Run incrementally to skip tasks whose fingerprint has not
+changed since their last successful run.
+
+Usage:
+```sh
+$ compose-run compose.yaml -j 8
+run 20191017T050000-1a2b3c4d
+...
+$ compose-run compose.yaml -j 8 --resume 20191017T050000-1a2b3c4d
+$ compose-run compose.yaml -j 8 --incremental
+$ compose-run compose.yaml -j 8 --target report
+```
+"""
+
+import argparse
+import logging
+import pathlib
+from typing import List, Union
+
+from alyeska.compose import Composer
+from alyeska.compose.config import load_config
+from alyeska.compose.exceptions import EarlyAbortError
+from alyeska.compose.history import RunHistory, DEFAULT_HISTORY_PATH
+from alyeska.logging import config_logging
+
+# None until init_flags() is called.
+FLAGS: Union[argparse.Namespace, None] = None
+
+
+def run_yaml(compose_yaml: pathlib.Path) -> int:
+    """Run the tasks in compose.yaml, as configured by FLAGS
+
+    Args:
+        compose_yaml (pathlib.Path): Path to the compose.yaml file
+
+    Returns:
+        int: 0 if every task succeeded. 1 otherwise.
+    """
+    compiled = load_config(compose_yaml)
+    composer = Composer.from_config(compiled)
+    if FLAGS.targets:
+        targets = compiled.get_tasks(n for names in FLAGS.targets for n in names)
+        dag = composer.dag.subgraph(targets, FLAGS.direction)
+        composer = Composer(dag, composer.resources)
+
+    with RunHistory(FLAGS.history) as history:
+        run_id = FLAGS.resume
+        if run_id is None:
+            run_id = history.start_run()
+        print(f"run {run_id}", flush=True)
+
+        try:
+            # resuming a new run simply runs every task
+            results = composer.run_tasks(
+                max_workers=FLAGS.max_workers,
+                error_handling=FLAGS.error_handling,
+                history=history,
+                resume=run_id,
+                incremental=FLAGS.incremental,
+            )
+        except EarlyAbortError as err:
+            logging.error(err)
+            return 1
+
+    if any(not r.succeeded for r in results.values()):
+        return 1
+
+    return 0
+
+
+def init_flags(prefab_flags: List = None) -> None:
+    """ Initializes the flags for this tool.
+
+    Args:
+        prefab_flags (List, optional): A list of flags to parse. Useful for testing.
+
+    Returns:
+        None -- the now-parsed flags can be accessed through the FLAGS variable.
+    """
+    global FLAGS
+    if FLAGS:
+        raise ValueError("Cannot parse flags more than once.")
+
+    parser = argparse.ArgumentParser(description="Run the tasks in compose.yaml")
+    parser.add_argument(
+        "config_file",
+        metavar="config_file",
+        type=pathlib.Path,
+        help="Python compose configuration file",
+    )
+    parser.add_argument(
+        "-j",
+        action="store",
+        dest="max_workers",
+        default=None,
+        type=int,
+        help="Maximum number of tasks to run at once. Defaults to the CPU count",
+    )
+    parser.add_argument(
+        "--hard",
+        action="store_const",
+        const="hard",
+        default="soft",
+        dest="error_handling",
+        help="When set, stop launching tasks after the first failure",
+    )
+    parser.add_argument(
+        "--history",
+        action="store",
+        dest="history",
+        default=DEFAULT_HISTORY_PATH,
+        type=pathlib.Path,
+        help=f"Run history database. Defaults to {DEFAULT_HISTORY_PATH}",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store",
+        dest="resume",
+        default=None,
+        metavar="RUN_ID",
+        help="Resume a run, skipping the tasks that already succeeded",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        dest="incremental",
+        help=(
+            "When set, skip tasks whose script, env, inputs and upstream tasks "
+            "are unchanged since their last successful run"
+        ),
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        dest="targets",
+        default=None,
+        type=lambda s: s.split(","),
+        metavar="NAME[,NAME]",
+        help="When set, only run these tasks and the tasks they depend on",
+    )
+    parser.add_argument(
+        "--direction",
+        action="store",
+        dest="direction",
+        default="upstream",
+        choices=["upstream", "downstream", "both"],
+        help=(
+            "With --target, run the tasks the targets depend on (upstream), the "
+            "tasks that depend on the targets (downstream), or both"
+        ),
+    )
+
+    if prefab_flags is None:
+        FLAGS = parser.parse_args()
+    else:
+        FLAGS = parser.parse_args(prefab_flags)
+
+
+def main(args: List = None) -> int:
+    init_flags(args)
+    config_logging()
+    return run_yaml(FLAGS.config_file)
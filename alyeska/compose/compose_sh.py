@@ -22,18 +22,20 @@ Usage:
 # shell script generated by alyeska's compose-sh from the file below
 # /Users/nick.vogt/dev/ci-alyeska/tests/compose/config-samples/compose-small.yaml
 
-# numbers
-pushd /Users/nick.vogt/dev/ci-alyeska/db/numbers > /dev/null
-source activate ci-python36-2.1
-python main.py
-conda deactivate
-popd > /dev/null
+source activate python36-2019.8.20
 
 # calendar
 pushd /Users/nick.vogt/dev/ci-alyeska/db/calendar > /dev/null
-source activate python36-2019.8.20
 python main.py
+popd > /dev/null
+
 conda deactivate
+
+source activate ci-python36-2.1
+
+# numbers
+pushd /Users/nick.vogt/dev/ci-alyeska/db/numbers > /dev/null
+python main.py
 popd > /dev/null
 
 # time_period
@@ -41,24 +43,26 @@ popd > /dev/null
 # - numbers
 # - calendar
 pushd /Users/nick.vogt/dev/ci-alyeska/db/time_period > /dev/null
-source activate ci-python36-2.1
 python main.py
-conda deactivate
 popd > /dev/null
+
+conda deactivate
 ```
+
+With `--parallel N`, the script runs independent tasks as background jobs, at
+most N at a time. Each task starts as soon as exactly its own upstream tasks
+have succeeded, and is skipped if any of them failed.
 """
 
 import argparse
+from collections import OrderedDict
 import pathlib
+import shlex
 import time
 from typing import Dict, List, Set, Union
 
 from alyeska.compose import Task, Composer
-from alyeska.compose.config import (
-    parse_config,
-    parse_tasks,
-    parse_upstream_dependencies,
-)
+from alyeska.compose.config import CompiledConfig, load_config
 
 # None until init_flags() is called.
 FLAGS: Union[argparse.Namespace, None] = None
@@ -104,43 +108,200 @@ def comment_task(
     return task_comment
 
 
-def get_tasks_blocks(compose_yaml: pathlib.Path) -> str:
-    compose_yaml = pathlib.Path(compose_yaml)
-    config = parse_config(compose_yaml)
+def get_composer(compiled: CompiledConfig) -> Composer:
+    """Build the Composer, sliced around FLAGS.targets if any were given"""
+    composer = Composer.from_config(compiled)
+    if FLAGS.targets:
+        targets = compiled.get_tasks(n for names in FLAGS.targets for n in names)
+        dag = composer.dag.subgraph(targets, FLAGS.direction)
+        composer = Composer(dag, composer.resources)
+
+    return composer
+
+
+def group_by_env(schedules: Dict[int, List[Task]]) -> List[Task]:
+    """Order tasks so that tasks sharing an env run back to back
+
+    Tasks never leave their schedule level, so every task still runs after
+    its upstream tasks. Within a level, envs are ordered by their highest
+    priority task, except that the env still active from the previous level
+    goes first.
+
+    Args:
+        schedules (Dict[int, List[Task]]): as returned by Composer.get_schedules
 
-    task_map = parse_tasks(config, FLAGS.check_file_presence)
-    inv_task_map = {v: k for k, v in task_map.items()}
-    dependency_map = parse_upstream_dependencies(config)
+    Returns:
+        List[Task]: every task, in the order to run them
+    """
+    ordered = []
+    for _, tasks in sorted(schedules.items()):
+        groups = OrderedDict()
+        for task in tasks:
+            groups.setdefault(task.env, []).append(task)
+        if ordered and ordered[-1].env in groups:
+            ordered.extend(groups.pop(ordered[-1].env))
+        for group in groups.values():
+            ordered.extend(group)
+
+    return ordered
+
+
+def get_tasks_blocks(compose_yaml: pathlib.Path) -> str:
+    compiled = load_config(compose_yaml, FLAGS.check_file_presence)
 
     commands = []
-    composer = Composer.from_yaml(compose_yaml)
+    composer = get_composer(compiled)
+    env = None
+    # activating an env takes seconds, so activate each env once per group
+    for task in group_by_env(composer.get_schedules()):
+        if task.env != env:
+            if env is not None:
+                commands.append("conda deactivate")  # `conda deactivate` is fine
+            env = task.env
+            commands.append(f"source activate {env}")  # `conda activate` is glitchy
+
+        comment = comment_task(
+            compiled.config,
+            task,
+            inv_task_map=compiled.inv_task_map,
+            dependency_map=compiled.dependency_map,
+        )
+        cmd = "\n".join(
+            [
+                f"pushd {task.loc.parent} > /dev/null",
+                f"python {task.loc.name}",
+                "popd > /dev/null",
+            ]
+        )
+        block = "\n".join([comment, cmd])
+        commands.append(block)
+
+    if env is not None:
+        commands.append("conda deactivate")
+
+    tasks_block = "\n\n".join(commands)
+
+    return tasks_block
+
+
+# Every task is its own background job from the start. A job can't `wait` on
+# its siblings, so each one polls the status files of its upstream tasks, and
+# then takes one of MAX_JOBS slots, which are directories because mkdir is
+# atomic. A task starts as soon as its own upstream tasks are done, however
+# long unrelated tasks take.
+PARALLEL_PREAMBLE = """\
+# runs up to {max_jobs} tasks at once
+MAX_JOBS={max_jobs}
+STATUS_DIR="$(mktemp -d)"
+trap 'rm -rf "$STATUS_DIR"' EXIT
+SLOT=  # the slot a task's job holds
+
+# upstream_ok ID...: wait for these tasks, and succeed if they all succeeded
+upstream_ok() {{
+    local id
+    for id in "$@"; do
+        until [[ -e "$STATUS_DIR/$id" ]]; do
+            [[ -d "$STATUS_DIR" ]] || exit 1  # the script itself has exited
+            sleep 0.1
+        done
+        [[ "$(< "$STATUS_DIR/$id")" == 0 ]] || return 1
+    done
+}}
+
+# take_slot: block until fewer than MAX_JOBS tasks are running, and hold a slot
+take_slot() {{
+    while true; do
+        for (( SLOT = 1; SLOT <= MAX_JOBS; SLOT++ )); do
+            mkdir "$STATUS_DIR/slot-$SLOT" 2> /dev/null && return
+        done
+        sleep 0.1
+    done
+}}
+
+# finish ID STATUS: release the slot, if held, and publish the task's status
+finish() {{
+    [[ -z "$SLOT" ]] || rmdir "$STATUS_DIR/slot-$SLOT"
+    # write, then rename, so that nothing reads a half-written status
+    echo "$2" > "$STATUS_DIR/$1.tmp" && mv "$STATUS_DIR/$1.tmp" "$STATUS_DIR/$1"
+}}"""
+
+PARALLEL_EPILOGUE = """\
+wait
+exit_code=0
+for (( id = 1; id <= {n_tasks}; id++ )); do
+    [[ "$(cat "$STATUS_DIR/$id")" == 0 ]] || exit_code=1
+done
+exit $exit_code"""
+
+
+def get_parallel_tasks_blocks(compose_yaml: pathlib.Path, max_jobs: int) -> str:
+    """Write each task as a background job that starts once its upstream
+    tasks have succeeded
+
+    Every job is launched right away and waits on exactly its own upstream
+    tasks, then for a free slot. A task whose upstream task failed is
+    skipped, and the script exits non-zero if any task failed or was skipped.
+
+    Args:
+        compose_yaml (pathlib.Path): Path to the config.yaml file
+        max_jobs (int): Maximum number of tasks that run at once
+
+    Returns:
+        str: the body of the shell script
+    """
+    compiled = load_config(compose_yaml, FLAGS.check_file_presence)
+    composer = get_composer(compiled)
+
+    ids = {}  # task names aren't always safe in shell code, so number them
+    blocks = [PARALLEL_PREAMBLE.format(max_jobs=max_jobs)]
     for _, tasks in composer.get_schedules().items():
         for task in tasks:
+            task_id = ids[task] = len(ids) + 1
+            task_name = compiled.inv_task_map[task]
             comment = comment_task(
-                config, task, inv_task_map=inv_task_map, dependency_map=dependency_map
+                compiled.config,
+                task,
+                inv_task_map=compiled.inv_task_map,
+                dependency_map=compiled.dependency_map,
             )
+            # the DAG may be sliced, so not every upstream task is in it
+            upstream_ids = [
+                str(i) for i in sorted(ids[t] for t in composer.dag.get_upstream(task))
+            ]
+            failed = shlex.quote(f"{task_name} failed with exit code ")
+            skipped = shlex.quote(f"skipping {task_name}: an upstream task failed")
             cmd = "\n".join(
                 [
-                    f"pushd {task.loc.parent} > /dev/null",
-                    f"source activate {task.env}",  # `conda activate env` is glitchy
-                    f"python {task.loc.name}",
-                    f"conda deactivate",  # `conda deactivate` is not, however...
-                    "popd > /dev/null",
+                    "{",
+                    f"    if {' '.join(['upstream_ok', *upstream_ids])}; then",
+                    "        take_slot",
+                    "        (",
+                    f"            cd {shlex.quote(str(task.loc.parent))} &&",
+                    f"            source activate {shlex.quote(task.env)} &&",
+                    f"            python {shlex.quote(task.loc.name)}",
+                    "        )",
+                    "        status=$?",
+                    f'        (( status == 0 )) || echo {failed}"$status" >&2',
+                    "    else",
+                    f"        echo {skipped} >&2",
+                    "        status=skipped",
+                    "    fi",
+                    f'    finish {task_id} "$status"',
+                    "} &",
                 ]
             )
-            # ^^^^^^^^^^^^^^^^
-            # /path/to/exe  \
-            #     /path/to/loc
-            block = "\n".join([comment, cmd])
-            commands.append(block)
+            blocks.append("\n".join([comment, cmd]))
 
-    tasks_block = "\n\n".join(commands)
+    blocks.append(PARALLEL_EPILOGUE.format(n_tasks=len(ids)))
 
-    return tasks_block
+    return "\n\n".join(blocks)
 
 
 def convert_yaml_to_sh(
-    compose_yaml: pathlib.Path, ofile: pathlib.Path = None, shebang: str = "#!/bin/bash"
+    compose_yaml: pathlib.Path,
+    ofile: pathlib.Path = None,
+    shebang: str = "#!/bin/bash",
+    parallel: int = None,
 ) -> str:
     """Export a compose.sh file based on yaml config
 
@@ -149,15 +310,23 @@ def convert_yaml_to_sh(
         validate_tasks (bool, optional): If true, validates that the task file exists
         ofile (pathlib.Path, optional): Where to export shell file. Defaults to None.
         shebang (str, options): The shebang line at the start of the output file.
+        parallel (int, optional): If supplied, run independent tasks as
+            background jobs, at most this many at once. Defaults to None,
+            running one task after another.
 
     Returns:
         str: output of str file
     """
+    if parallel is not None and parallel < 1:
+        raise ValueError("`parallel` must be at least 1")
     if ofile:
         ofile = pathlib.Path(ofile).resolve()
 
     docstring = get_docstring(compose_yaml)
-    tasks_block = get_tasks_blocks(compose_yaml)
+    if parallel is None:
+        tasks_block = get_tasks_blocks(compose_yaml)
+    else:
+        tasks_block = get_parallel_tasks_blocks(compose_yaml, parallel)
     trailing_newline = "\n"
     shell_script = "\n".join([shebang, docstring, "", tasks_block, trailing_newline])
 
@@ -198,6 +367,35 @@ def init_flags(prefab_flags: List = None) -> None:
         dest="check_file_presence",
         help="When set, the utility will not enforce the presence of task files",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store",
+        dest="parallel",
+        default=None,
+        type=int,
+        metavar="N",
+        help="When set, run independent tasks as background jobs, N at a time",
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        dest="targets",
+        default=None,
+        type=lambda s: s.split(","),
+        metavar="NAME[,NAME]",
+        help="When set, only run these tasks and the tasks they depend on",
+    )
+    parser.add_argument(
+        "--direction",
+        action="store",
+        dest="direction",
+        default="upstream",
+        choices=["upstream", "downstream", "both"],
+        help=(
+            "With --target, run the tasks the targets depend on (upstream), the "
+            "tasks that depend on the targets (downstream), or both"
+        ),
+    )
     parser.add_argument("-v", action="store_true", dest="verbose_output")
 
     if prefab_flags is None:
@@ -208,6 +406,6 @@ def init_flags(prefab_flags: List = None) -> None:
 
 def main(args: List = None):
     init_flags(args)
-    output = convert_yaml_to_sh(FLAGS.config_file, FLAGS.ofile)
+    output = convert_yaml_to_sh(FLAGS.config_file, FLAGS.ofile, parallel=FLAGS.parallel)
     if FLAGS.verbose_output:
         print(output)
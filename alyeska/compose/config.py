@@ -19,29 +19,72 @@
 
 from collections import defaultdict
 import pathlib
-from typing import Dict, Set
+from typing import Dict, Iterable, NamedTuple, Set
 
 import yaml
 
 from alyeska.compose import Task
 from alyeska.compose.validate import validate_config
 
+# libyaml's loader is several times faster, but it's only there if PyYAML was
+# built against libyaml
+YAML_LOADER = getattr(yaml, "CLoader", yaml.Loader)
 
-def parse_config(p: pathlib.Path) -> Dict:
+
+class CompiledConfig(NamedTuple):
+    """compose.yaml, parsed and validated once
+
+    Attributes:
+        config (Dict): compose.yaml as dict
+        task_map (Dict[str, Task]): task aliases to Task objects
+        inv_task_map (Dict[Task, str]): Task objects to task aliases
+        dependency_map (Dict[Task, Set[Task]]): Task objects to their
+            upstream dependencies
+    """
+
+    config: Dict
+    task_map: Dict[str, Task]
+    inv_task_map: Dict[Task, str]
+    dependency_map: Dict[Task, Set[Task]]
+
+    @property
+    def resources(self) -> Dict[str, float]:
+        return self.config.get("resources", {})
+
+    def get_tasks(self, names: Iterable[str]) -> Set[Task]:
+        """Look up tasks by their aliases
+
+        Raises:
+            ValueError: If a name is not a task in compose.yaml.
+        """
+        names = list(names)
+        unknown = [name for name in names if name not in self.task_map]
+        if unknown:
+            raise ValueError(f"Unknown tasks: {', '.join(unknown)}")
+
+        return {self.task_map[name] for name in names}
+
+
+def parse_config(p: pathlib.Path, check_cycles: bool = False) -> Dict:
     """Parse the compose.yaml file and return a dict
 
-    Basically the same as yaml.load().
+    Basically the same as yaml.load(), plus validation.
 
     Args:
         p (pathlib.Path): path to compose.yaml
+        check_cycles (bool, optional): if true, cyclic dependencies are a
+            validation error. Defaults to False.
+
+    Raises:
+        ConfigurationError: If compose.yaml is invalid.
 
     Returns:
         Dict: parsed compose.yaml file
     """
     p = pathlib.Path(p)
-    config = yaml.load(p.read_text(), Loader=yaml.Loader)
+    config = yaml.load(p.read_text(), Loader=YAML_LOADER)
 
-    validate_config(config)
+    validate_config(config, check_cycles)
 
     return config
 
@@ -68,21 +111,31 @@ def parse_tasks(config: Dict, validate_tasks: bool = False) -> Dict[str, Task]:
         path = pathlib.Path(*path_components)
 
         env = task_config["env"]
-        task_map[task_name] = Task(path, env, validate_tasks)
+        weight = task_config.get("weight", 1)
+        inputs = task_config.get("inputs", ())
+        resources = task_config.get("resources")
+        task_map[task_name] = Task(
+            path, env, validate_tasks, weight=weight, inputs=inputs, resources=resources
+        )
 
     return task_map
 
 
-def parse_upstream_dependencies(config: Dict) -> Dict[Task, Set[Task]]:
+def parse_upstream_dependencies(
+    config: Dict, task_map: Dict[str, Task] = None
+) -> Dict[Task, Set[Task]]:
     """Map tasks to their upstream dependencies, if any
 
     Args:
         config (Dict): compose.yaml as dict
+        task_map (Dict[str, Task], optional): task aliases to Task objects, as
+            returned by parse_tasks. Parsed from config if None.
 
     Returns:
         Dict[Task, Set[Task]]: mapping Task objects to their upstream dependencies
     """
-    task_map = parse_tasks(config)
+    if task_map is None:
+        task_map = parse_tasks(config)
     d = defaultdict(set, {})
     for task_name in config["tasks"].keys():
         task_attrs = config["tasks"][task_name]
@@ -102,3 +155,25 @@ def parse_upstream_dependencies(config: Dict) -> Dict[Task, Set[Task]]:
                     d[downstream_task].add(upstream_task)
 
     return d
+
+
+def load_config(p: pathlib.Path, validate_tasks: bool = False) -> CompiledConfig:
+    """Read, validate and compile compose.yaml in a single pass
+
+    Args:
+        p (pathlib.Path): path to compose.yaml
+        validate_tasks (bool, optional): if true, validates that the task file exists
+
+    Raises:
+        CyclicConfigurationError: If compose.yaml has cyclic dependencies.
+        ConfigurationError: If compose.yaml is invalid in any other way.
+
+    Returns:
+        CompiledConfig: the config with its tasks and dependencies
+    """
+    config = parse_config(p, check_cycles=True)
+    task_map = parse_tasks(config, validate_tasks)
+    inv_task_map = {v: k for k, v in task_map.items()}
+    dependency_map = parse_upstream_dependencies(config, task_map)
+
+    return CompiledConfig(config, task_map, inv_task_map, dependency_map)
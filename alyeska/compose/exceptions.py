@@ -27,4 +27,16 @@ class EarlyAbortError(Exception):
 
 
 class ConfigurationError(Exception):
-    """For configuration errors with the compose.yaml file"""
+    """For configuration errors with the compose.yaml file
+
+    Attributes:
+        errors (`list` of `str`): Every problem found with the file.
+    """
+
+    def __init__(self, msg: str = "", errors: list = None):
+        super().__init__(msg)
+        self.errors = list(errors) if errors is not None else [msg]
+
+
+class CyclicConfigurationError(ConfigurationError, CyclicGraphError):
+    """compose.yaml declares cyclic dependencies, possibly among other errors"""
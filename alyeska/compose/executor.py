@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Run the Tasks in a DAG as subprocesses
+
+Each Task starts as soon as all of its upstream Tasks have succeeded, rather
+than waiting for the whole schedule level to finish. At most `max_workers`
+Tasks run at once.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import heapq
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Set, TYPE_CHECKING
+
+from alyeska.compose import Task, DAG
+from alyeska.compose.exceptions import EarlyAbortError
+
+if TYPE_CHECKING:
+    from alyeska.compose.history import RunHistory
+
+
+class TaskResult(NamedTuple):
+    """The outcome of running a Task.
+
+    Attributes:
+        task (Task): The task that was run.
+        returncode (int): Exit code of the task's process.
+        start (float): Unix timestamp when the task started.
+        end (float): Unix timestamp when the task finished.
+        max_rss (int): Peak resident memory of the process in bytes. None on
+            platforms without os.wait4.
+        cpu_time (float): User plus system CPU seconds of the process. None
+            on platforms without os.wait4.
+    """
+
+    task: Task
+    returncode: int
+    start: float
+    end: float
+    max_rss: int = None
+    cpu_time: float = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+
+def get_command(task: Task) -> List[str]:
+    """Build the command that runs task.loc in task.env
+
+    Args:
+        task (Task): The task to be run.
+
+    Returns:
+        List[str]: The command as a list of arguments.
+
+    Note:
+        task.env may be a python executable, which is the default for Tasks,
+        or the name of a conda environment, as used in compose.yaml.
+    """
+    if shutil.which(task.env):
+        return [task.env, str(task.loc)]
+
+    return ["conda", "run", "-n", task.env, "python", str(task.loc)]
+
+
+# Runs a task's command as its own child and reports the exit status and
+# resource usage of that child alone over a pipe. ru_maxrss is a high-water
+# mark that survives fork and exec, so a task forked straight from this
+# process would report at least our own peak RSS.
+_LAUNCHER = """\
+import os, subprocess, sys
+fd = int(sys.argv[1])
+try:
+    proc = subprocess.Popen(sys.argv[2:])
+except OSError as e:
+    print(f"{sys.argv[2]}: {e}", file=sys.stderr)
+    sys.exit(127)
+while True:
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+        break
+    except KeyboardInterrupt:  # the task gets the same SIGINT
+        continue
+cpu_time = rusage.ru_utime + rusage.ru_stime
+os.write(fd, f"{status} {rusage.ru_maxrss} {cpu_time}".encode())
+os.close(fd)
+"""
+
+
+def run_task(task: Task) -> TaskResult:
+    """Run the python file defined by Task.loc in the environment defined
+    by the Task.env
+
+    The task runs from its own directory, the same as in compose.sh.
+
+    Args:
+        task (Task): The task to be run.
+
+    Returns:
+        TaskResult: The outcome of the task. A task that can't be started,
+            e.g. because its directory or environment doesn't exist, fails
+            with returncode 127, as in a shell.
+    """
+    logging.info(f"Running {repr(task)}")
+    start = time.time()
+
+    if not hasattr(os, "wait4"):  # e.g. Windows
+        try:
+            returncode = subprocess.call(get_command(task), cwd=task.loc.parent)
+        except OSError as e:
+            logging.error(f"Could not start {repr(task)}: {e}")
+            returncode = 127
+        return TaskResult(task, returncode, start, time.time())
+
+    read_fd, write_fd = os.pipe()
+    try:
+        command = [sys.executable, "-I", "-S", "-c", _LAUNCHER, str(write_fd)]
+        proc = subprocess.Popen(
+            command + get_command(task), cwd=task.loc.parent, pass_fds=(write_fd,)
+        )
+    except OSError as e:
+        os.close(read_fd)
+        logging.error(f"Could not start {repr(task)}: {e}")
+        return TaskResult(task, 127, start, time.time())
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        report = pipe.read().split()
+    launcher_returncode = proc.wait()
+    end = time.time()
+
+    # no report if the command couldn't start or the launcher was killed
+    if not report:
+        return TaskResult(task, launcher_returncode, start, end)
+
+    status, max_rss, cpu_time = int(report[0]), int(report[1]), float(report[2])
+    if os.WIFSIGNALED(status):
+        returncode = -os.WTERMSIG(status)
+    else:
+        returncode = os.WEXITSTATUS(status)
+
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    max_rss *= 1 if sys.platform == "darwin" else 1024
+
+    return TaskResult(task, returncode, start, end, max_rss, cpu_time)
+
+
+def pop_fitting_task(ready: List, available: Dict[str, float]) -> Task:
+    """Helper function for run_dag
+
+    Pop the highest priority task whose resource claims fit in the available
+    resources from the ready heap.
+
+    Returns:
+        Task, or None if no ready task fits.
+    """
+    skipped = []
+    task = None
+    while ready:
+        item = heapq.heappop(ready)
+        claims = item[1].resources.items()
+        if all(amount <= available.get(name, amount) for name, amount in claims):
+            task = item[1]
+            break
+        skipped.append(item)
+
+    for item in skipped:
+        heapq.heappush(ready, item)
+
+    return task
+
+
+def get_free_resources(
+    resources: Dict[str, float], running: Iterable[Task]
+) -> Dict[str, float]:
+    """Helper function for run_dag
+
+    Return what the running tasks leave free of each pool. It's recomputed
+    from the capacities rather than updated as tasks start and finish, so
+    float rounding can't build up, and every pool is exactly at capacity
+    once nothing is running.
+    """
+    free = dict(resources)
+    for task in running:
+        for name, amount in task.resources.items():
+            if name in free:
+                free[name] -= amount
+
+    return free
+
+
+def run_dag(
+    dag: DAG,
+    *,
+    max_workers: int = None,
+    error_handling: str = "soft",
+    priorities: Dict[Task, float] = None,
+    history: "RunHistory" = None,
+    run_id: str = None,
+    skip: Set[Task] = None,
+    fingerprints: Dict[Task, str] = None,
+    resources: Dict[str, float] = None,
+) -> Dict[Task, TaskResult]:
+    """Run all tasks on the DAG, each as soon as its upstream tasks succeed.
+
+    Args:
+        dag (DAG): The tasks and dependencies to run.
+        max_workers (int, optional): Maximum number of tasks that run at
+            once. Defaults to the number of CPUs.
+        error_handling (str): Either 'soft' or 'hard'. 'soft' error handling
+            keeps running every task that does not depend on a failed task.
+            'hard' error handling stops launching tasks after the first
+            error, waits for the running tasks, and aborts.
+        priorities (`dict` of `Task`: `float`, optional): When more tasks
+            are ready than there are workers, higher priority tasks start
+            first. See Composer.get_task_priorities. Defaults to None.
+        history (RunHistory, optional): If supplied, record every task's
+            result in this run history. Defaults to None.
+        run_id (str, optional): The run to record results under. Defaults
+            to a new run from history.start_run().
+        skip (`set` of `Task`, optional): Tasks that already succeeded. They
+            are not run, and count as finished for their downstream tasks.
+            Defaults to None.
+        fingerprints (`dict` of `Task`: `str`, optional): Fingerprint of each
+            task to record in history. Defaults to None.
+        resources (`dict` of `str`: `float`, optional): Capacity of each
+            named resource pool. A task only starts if its claims fit in
+            what the running tasks leave free; meanwhile, lower priority
+            tasks that do fit start instead. Defaults to None.
+
+    Raises:
+        EarlyAbortError: If a task fails and error_handling is 'hard'.
+        ValueError: If a task claims more of a pool than its capacity.
+        RuntimeError: If ready tasks are left that can never start.
+
+    Returns:
+        `dict` of `Task`: `TaskResult` for every task that ran. Tasks
+            downstream of a failed task are not run and have no result.
+    """
+    if not isinstance(error_handling, str):
+        raise TypeError("`error_handling` must be a str")
+    if error_handling not in ("soft", "hard"):
+        raise ValueError("`error_handling` must be in ('soft', 'hard')")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if not isinstance(max_workers, int):
+        raise TypeError("`max_workers` must be an int")
+    if max_workers < 1:
+        raise ValueError("`max_workers` must be at least 1")
+
+    if priorities is None:
+        priorities = {}
+    if skip is None:
+        skip = set()
+    if fingerprints is None:
+        fingerprints = {}
+    if resources is None:
+        resources = {}
+    for t in dag.tasks:
+        for name, amount in t.resources.items():
+            if amount > resources.get(name, float("inf")):
+                raise ValueError(
+                    f"{repr(t)} claims {amount} {name}, but the pool only "
+                    f"holds {resources[name]}"
+                )
+    if history is not None and run_id is None:
+        run_id = history.start_run()
+
+    # count the upstream tasks that each task is still waiting on
+    waiting_on = {
+        t: len(dag.get_upstream(t) - skip) for t in dag.tasks if t not in skip
+    }
+    # heap of (-priority, task); ties are broken by Task order
+    ready = [(-priorities.get(t, 0), t) for t, n in waiting_on.items() if n == 0]
+    heapq.heapify(ready)
+    running = {}
+    results = {}
+    failed = []
+    abort = False
+    stalled = False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while ready or running:
+            while ready and len(running) < max_workers and not abort:
+                free = get_free_resources(resources, running.values())
+                task = pop_fitting_task(ready, free)
+                if task is None:
+                    break  # nothing ready fits until a running task finishes
+                running[pool.submit(run_task, task)] = task
+
+            if not running:
+                # every ready task fits in an empty pool, so this only
+                # happens if the pool accounting is wrong
+                stalled = bool(ready) and not abort
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                result = future.result()
+                results[task] = result
+                if history is not None:
+                    history.record(
+                        run_id,
+                        task,
+                        start=result.start,
+                        end=result.end,
+                        returncode=result.returncode,
+                        max_rss=result.max_rss,
+                        cpu_time=result.cpu_time,
+                        fingerprint=fingerprints.get(task),
+                    )
+
+                if not result.succeeded:
+                    logging.error(f"{repr(task)} exited with {result.returncode}")
+                    failed.append(task)
+                    abort = error_handling == "hard"
+                    continue
+
+                for d in dag.get_downstream(task):
+                    if d in skip:
+                        continue  # already succeeded; nothing to start
+                    waiting_on[d] -= 1
+                    if waiting_on[d] == 0:
+                        heapq.heappush(ready, (-priorities.get(d, 0), d))
+
+    if history is not None:
+        history.end_run(run_id)
+
+    if abort:
+        raise EarlyAbortError(f"Aborted after {repr(failed[0])} failed")
+    if stalled:
+        raise RuntimeError(
+            f"{len(ready)} ready tasks could not start, e.g. {repr(ready[0][1])}"
+        )
+
+    return results
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Fingerprint Tasks by the content they depend on
+
+A Task's fingerprint changes whenever its script, its env, any of its
+declared input files, or the fingerprint of any upstream Task changes. A Task
+whose fingerprint matches its last successful run doesn't need to run again.
+"""
+
+import glob
+from hashlib import sha256
+import pathlib
+from typing import Dict, List
+
+from alyeska.compose import Task, DAG
+from alyeska.compose.exceptions import CyclicGraphError
+
+# read files in blocks so large inputs don't need to fit in memory
+BLOCK_SIZE = 1 << 20
+
+
+def hash_file(p: pathlib.Path) -> str:
+    """sha256 of the file's contents, or of nothing if it doesn't exist
+
+    Args:
+        p (pathlib.Path): file to hash
+
+    Returns:
+        str: hex digest
+    """
+    h = sha256()
+    try:
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                h.update(block)
+    except FileNotFoundError:
+        h.update(b"\0missing")
+
+    return h.hexdigest()
+
+
+def find_inputs(task: Task) -> List[pathlib.Path]:
+    """Expand the task's input globs into a sorted list of files
+
+    Relative patterns are relative to the task's directory, the same
+    directory the task runs from.
+
+    Args:
+        task (Task): the task whose inputs to find
+
+    Returns:
+        List[pathlib.Path]: matching files
+    """
+    files = set()
+    for pattern in task.inputs:
+        matches = glob.glob(str(task.loc.parent / pattern), recursive=True)
+        files.update(pathlib.Path(m) for m in matches if pathlib.Path(m).is_file())
+
+    return sorted(files)
+
+
+def get_fingerprints(dag: DAG) -> Dict[Task, str]:
+    """Fingerprint every task in the DAG
+
+    Args:
+        dag (DAG): tasks and dependencies to fingerprint
+
+    Raises:
+        CyclicGraphError: If the DAG is cyclic.
+
+    Returns:
+        `dict` of `Task`: `str`
+    """
+    order = dag.get_topological_order()
+    if order is None:
+        raise CyclicGraphError("Cannot fingerprint a cyclic graph")
+
+    file_hashes = {}  # tasks may share input files
+
+    def cached_hash_file(p: pathlib.Path) -> str:
+        if p not in file_hashes:
+            file_hashes[p] = hash_file(p)
+        return file_hashes[p]
+
+    fingerprints = {}
+    # every upstream task is fingerprinted before its downstream tasks
+    for task in order:
+        h = sha256()
+        for part in (task.loc.as_posix(), cached_hash_file(task.loc), task.env):
+            h.update(part.encode())
+            h.update(b"\0")
+        for p in find_inputs(task):
+            h.update(f"input:{p.as_posix()}:{cached_hash_file(p)}\0".encode())
+        for upstream_fingerprint in sorted(
+            fingerprints[u] for u in dag.get_upstream(task)
+        ):
+            h.update(f"upstream:{upstream_fingerprint}\0".encode())
+        fingerprints[task] = h.hexdigest()
+
+    return fingerprints
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""An array-backed snapshot of a DAG
+
+CSRGraph numbers the tasks 0 to n - 1 and stores the dependencies in
+compressed sparse row (CSR) arrays: the tasks downstream of task i are
+targets[offsets[i]:offsets[i + 1]]. Walking plain integer arrays never
+hashes a Task.
+
+A CSRGraph is immutable. DAG.compile() builds one on demand and keeps it
+until the DAG changes.
+
+The snapshot is kept alongside the DAG's sets of Tasks, not instead of them,
+since those are what make adding and removing tasks and dependencies cheap.
+It costs roughly a tenth more memory: at 50k tasks and 200k dependencies,
+the DAG's indexes take about 50 MB and its snapshot about 6 MB, most of it
+the Task-to-id dict.
+"""
+
+from array import array
+from typing import Iterable, List, Mapping, Sequence, Set, Tuple, Union
+
+from alyeska.compose import Task
+
+# task ids and edge offsets; 32 bits is plenty and halves the memory of 64
+TYPECODE = "i"
+
+
+def to_csr(n: int, edges: Iterable[Sequence[int]]) -> Tuple[array, array]:
+    """Pack each id's neighbor ids into CSR arrays
+
+    Args:
+        n (int): number of ids
+        edges (Iterable[Sequence[int]]): the neighbors of ids 0 to n - 1
+
+    Returns:
+        (array, array): offsets and targets
+    """
+    offsets = array(TYPECODE, [0]) * (n + 1)
+    targets = array(TYPECODE)
+    for i, neighbors in enumerate(edges):
+        targets.extend(neighbors)
+        offsets[i + 1] = len(targets)
+
+    return offsets, targets
+
+
+def transpose(n: int, offsets: array, targets: array) -> Tuple[array, array]:
+    """Reverse every edge of a CSR graph with a counting sort
+
+    Returns:
+        (array, array): offsets and targets of the reversed graph
+    """
+    reverse_offsets = array(TYPECODE, [0]) * (n + 1)
+    for j in targets:
+        reverse_offsets[j + 1] += 1
+    for i in range(n):
+        reverse_offsets[i + 1] += reverse_offsets[i]
+
+    reverse_targets = array(TYPECODE, [0]) * len(targets)
+    fill = reverse_offsets[:-1]  # next free slot of each id
+    for i in range(n):
+        for j in targets[offsets[i] : offsets[i + 1]]:
+            reverse_targets[fill[j]] = i
+            fill[j] += 1
+
+    return reverse_offsets, reverse_targets
+
+
+class CSRGraph:
+    """Tasks and their dependencies as dense integer arrays.
+
+    Attributes:
+        tasks (`list` of `Task`): The task with each id.
+        ids (`dict` of `Task`: `int`): The id of each task.
+        offsets (array): Tasks downstream of id i are
+            targets[offsets[i]:offsets[i + 1]].
+        targets (array): Downstream ids, grouped by upstream id.
+        reverse_offsets (array): Like offsets, for upstream ids.
+        reverse_targets (array): Like targets, for upstream ids.
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[Task],
+        edges: Mapping[Task, Iterable[Task]],
+        reverse_edges: Mapping[Task, Iterable[Task]] = None,
+    ):
+        """Compile tasks and their dependencies.
+
+        Args:
+            tasks (Iterable[Task]): Every task.
+            edges (Mapping[Task, Iterable[Task]]): Maps tasks to the tasks
+                downstream of them.
+            reverse_edges (Mapping[Task, Iterable[Task]], optional): Maps
+                tasks to the tasks upstream of them. Computed from edges if
+                None.
+        """
+        self.tasks = list(tasks)
+        self.ids = {t: i for i, t in enumerate(self.tasks)}
+        self._order = None
+        self._sorted = False
+        n = len(self.tasks)
+
+        ids = self.ids
+        self.offsets, self.targets = to_csr(
+            n, ([ids[d] for d in edges.get(t, ())] for t in self.tasks)
+        )
+        if reverse_edges is None:
+            self.reverse_offsets, self.reverse_targets = transpose(
+                n, self.offsets, self.targets
+            )
+        else:
+            self.reverse_offsets, self.reverse_targets = to_csr(
+                n, ([ids[u] for u in reverse_edges.get(t, ())] for t in self.tasks)
+            )
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __repr__(self):
+        return f"{CSRGraph.__qualname__}({len(self)} tasks, {len(self.targets)} edges)"
+
+    def downstream(self, i: int) -> array:
+        """Ids immediately downstream of id i"""
+        offsets = self.offsets
+        return self.targets[offsets[i] : offsets[i + 1]]
+
+    def upstream(self, i: int) -> array:
+        """Ids immediately upstream of id i"""
+        offsets = self.reverse_offsets
+        return self.reverse_targets[offsets[i] : offsets[i + 1]]
+
+    def topological_order(self) -> Union[array, None]:
+        """Order the ids so that every id comes after its upstream ids.
+
+        The order is shared between calls, so don't modify it.
+
+        Runs in linear time with Kahn's algorithm, the first time only.
+
+        Returns:
+            array of ids, or None if the graph is cyclic.
+        """
+        if not self._sorted:
+            self._order = self._sort()
+            self._sorted = True
+
+        return self._order
+
+    def _sort(self) -> Union[array, None]:
+        """Helper function for topological_order"""
+        n = len(self)
+        offsets, targets = self.offsets, self.targets
+        in_degree = array(
+            TYPECODE,
+            (self.reverse_offsets[i + 1] - self.reverse_offsets[i] for i in range(n)),
+        )
+        order = array(TYPECODE, (i for i in range(n) if in_degree[i] == 0))
+
+        head = 0  # order doubles as the queue
+        while head < len(order):
+            i = order[head]
+            head += 1
+            for j in targets[offsets[i] : offsets[i + 1]]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    order.append(j)
+
+        if len(order) < n:
+            return None
+
+        return order
+
+    def levels(self) -> Union[array, None]:
+        """Level of each id: 1 for sources, otherwise one more than the
+        highest level upstream of it.
+
+        Returns:
+            array of levels indexed by id, or None if the graph is cyclic.
+        """
+        order = self.topological_order()
+        if order is None:
+            return None
+
+        offsets, targets = self.offsets, self.targets
+        level = array(TYPECODE, [1]) * len(self)
+        for i in order:
+            next_level = level[i] + 1
+            for j in targets[offsets[i] : offsets[i + 1]]:
+                if level[j] < next_level:
+                    level[j] = next_level
+
+        return level
+
+    def longest_paths(self, weights: Sequence[float]) -> Union[List[float], None]:
+        """Weight of the heaviest path from each id to any sink, including
+        the id's own weight.
+
+        Args:
+            weights (Sequence[float]): Weight of each id.
+
+        Returns:
+            list of path weights indexed by id, or None if the graph is cyclic.
+        """
+        order = self.topological_order()
+        if order is None:
+            return None
+
+        offsets, targets = self.offsets, self.targets
+        longest = [0.0] * len(self)
+        for i in reversed(order):
+            longest[i] = weights[i] + max(
+                (longest[j] for j in targets[offsets[i] : offsets[i + 1]]), default=0
+            )
+
+        return longest
+
+    def reachable(self, ids: Iterable[int], reverse: bool = False) -> Set[int]:
+        """Ids downstream of any of the given ids, directly or indirectly.
+
+        The given ids are not included unless they are downstream of each
+        other.
+
+        Args:
+            ids (Iterable[int]): Ids to start from.
+            reverse (bool, optional): If true, follow dependencies upstream
+                instead. Defaults to False.
+
+        Returns:
+            `set` of `int`
+        """
+        if reverse:
+            offsets, targets = self.reverse_offsets, self.reverse_targets
+        else:
+            offsets, targets = self.offsets, self.targets
+
+        seen = bytearray(len(self))
+        found = []
+        stack = list(ids)
+        while stack:
+            i = stack.pop()
+            for j in targets[offsets[i] : offsets[i + 1]]:
+                if not seen[j]:
+                    seen[j] = 1
+                    found.append(j)
+                    stack.append(j)
+
+        return set(found)
+
+    def get_tasks(self, ids: Iterable[int]) -> Set[Task]:
+        """The tasks with the given ids"""
+        tasks = self.tasks
+        return {tasks[i] for i in ids}
+
+    def get_ids(self, tasks: Iterable[Task]) -> List[int]:
+        """The ids of the given tasks"""
+        ids = self.ids
+        return [ids[t] for t in tasks]
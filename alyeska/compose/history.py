@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Remember how every Task ran
+
+RunHistory is a local SQLite store of compose runs. Each run records the
+start, end, exit code, peak memory and CPU time of every Task, keyed by the
+Task's loc and env. Query it for percentiles, trends and the slowest tasks.
+"""
+
+import pathlib
+import sqlite3
+import time
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Set, Tuple
+import uuid
+
+from alyeska.compose import Task
+
+DEFAULT_HISTORY_PATH = pathlib.Path.home() / ".alyeska" / "compose-history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id     TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at   REAL
+);
+CREATE TABLE IF NOT EXISTS task_runs (
+    run_id     TEXT NOT NULL REFERENCES runs (run_id),
+    loc        TEXT NOT NULL,
+    env        TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time   REAL NOT NULL,
+    returncode INTEGER NOT NULL,
+    max_rss    INTEGER,
+    cpu_time   REAL,
+    fingerprint TEXT,
+    PRIMARY KEY (run_id, loc, env)
+);
+CREATE INDEX IF NOT EXISTS task_runs_by_task ON task_runs (loc, env, start_time);
+"""
+
+
+class TaskRun(NamedTuple):
+    """One recorded run of a Task.
+
+    Attributes:
+        run_id (str): The compose run that ran the task.
+        start (float): Unix timestamp when the task started.
+        end (float): Unix timestamp when the task finished.
+        returncode (int): Exit code of the task's process.
+        max_rss (int): Peak resident memory in bytes, if known.
+        cpu_time (float): User plus system CPU seconds, if known.
+        fingerprint (str): The task's fingerprint when it ran, if known.
+    """
+
+    run_id: str
+    start: float
+    end: float
+    returncode: int
+    max_rss: int
+    cpu_time: float
+    fingerprint: str
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted values
+
+    Args:
+        values (Sequence[float]): Values sorted in ascending order.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The q-th percentile of values.
+    """
+    if not values:
+        raise ValueError("values must not be empty")
+    if not 0 <= q <= 100:
+        raise ValueError("q must be between 0 and 100")
+
+    rank = (len(values) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+class RunHistory:
+    """A local store of task durations and outcomes.
+
+    The database runs in WAL mode so reports can read while a run writes.
+
+    Attributes:
+        path (pathlib.Path): Location of the SQLite database.
+    """
+
+    def __init__(self, path: pathlib.Path = DEFAULT_HISTORY_PATH):
+        """Open, and if needed create, a run history.
+
+        Args:
+            path (pathlib.Path, optional): Location of the SQLite database.
+                Defaults to ~/.alyeska/compose-history.db.
+        """
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._cnxn = sqlite3.connect(str(self.path))
+        self._cnxn.execute("PRAGMA journal_mode=WAL")
+        self._cnxn.executescript(SCHEMA)
+        self._migrate()
+
+    def __repr__(self):
+        return f"{RunHistory.__qualname__}({self.path})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        self._cnxn.close()
+
+    def _migrate(self) -> None:
+        """Add columns that histories from earlier versions are missing."""
+        columns = {row[1] for row in self._cnxn.execute("PRAGMA table_info(task_runs)")}
+        if "fingerprint" not in columns:
+            with self._cnxn:
+                self._cnxn.execute("ALTER TABLE task_runs ADD COLUMN fingerprint TEXT")
+
+    # ------------------------------------------------------------------------
+    # Record runs
+    # ------------------------------------------------------------------------
+
+    def start_run(self) -> str:
+        """Record the start of a new compose run.
+
+        Returns:
+            str: The new run id, e.g. 20191017T050000-1a2b3c4d
+        """
+        run_id = "-".join([time.strftime("%Y%m%dT%H%M%S"), uuid.uuid4().hex[:8]])
+        with self._cnxn:
+            self._cnxn.execute(
+                "INSERT INTO runs (run_id, started_at) VALUES (?, ?)",
+                (run_id, time.time()),
+            )
+
+        return run_id
+
+    def resume_run(self, run_id: str) -> None:
+        """Record that a compose run is running again.
+
+        Raises:
+            ValueError: If the run does not exist.
+        """
+        with self._cnxn:
+            cursor = self._cnxn.execute(
+                "UPDATE runs SET ended_at = NULL WHERE run_id = ?", (run_id,)
+            )
+        if cursor.rowcount == 0:
+            raise ValueError(f"There is no run with the id {run_id}")
+
+    def end_run(self, run_id: str) -> None:
+        """Record the end of a compose run."""
+        with self._cnxn:
+            self._cnxn.execute(
+                "UPDATE runs SET ended_at = ? WHERE run_id = ?", (time.time(), run_id)
+            )
+
+    def record(
+        self,
+        run_id: str,
+        task: Task,
+        *,
+        start: float,
+        end: float,
+        returncode: int,
+        max_rss: int = None,
+        cpu_time: float = None,
+        fingerprint: str = None,
+    ) -> None:
+        """Record one run of a task. Recording a task twice in the same run
+        replaces the first record.
+        """
+        with self._cnxn:
+            self._cnxn.execute(
+                "INSERT OR REPLACE INTO task_runs (run_id, loc, env, start_time, "
+                "end_time, returncode, max_rss, cpu_time, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    task.loc.as_posix(),
+                    task.env,
+                    start,
+                    end,
+                    returncode,
+                    max_rss,
+                    cpu_time,
+                    fingerprint,
+                ),
+            )
+
+    # ------------------------------------------------------------------------
+    # Query runs
+    # ------------------------------------------------------------------------
+
+    def get_task_runs(self, task: Task, limit: int = None) -> List[TaskRun]:
+        """Return the runs of a task, most recent first.
+
+        Args:
+            task (Task): The task to look up.
+            limit (int, optional): Maximum number of runs. Defaults to all.
+        """
+        rows = self._cnxn.execute(
+            "SELECT run_id, start_time, end_time, returncode, max_rss, cpu_time, "
+            "fingerprint FROM task_runs WHERE loc = ? AND env = ? "
+            "ORDER BY start_time DESC LIMIT ?",
+            (task.loc.as_posix(), task.env, -1 if limit is None else limit),
+        )
+
+        return [TaskRun(*row) for row in rows]
+
+    def get_succeeded(self, run_id: str, tasks: Iterable[Task]) -> Set[Task]:
+        """Return the tasks that succeeded in a run.
+
+        Args:
+            run_id (str): The run to look up.
+            tasks (Iterable[Task]): The tasks to check.
+        """
+        rows = self._cnxn.execute(
+            "SELECT loc, env FROM task_runs WHERE run_id = ? AND returncode = 0",
+            (run_id,),
+        )
+        succeeded = set(rows)
+
+        return {t for t in tasks if (t.loc.as_posix(), t.env) in succeeded}
+
+    def get_last_fingerprints(self, tasks: Iterable[Task]) -> Dict[Task, str]:
+        """Return the fingerprint of each task's last successful run.
+
+        Returns:
+            `dict` of `Task`: `str`. Tasks without a fingerprinted successful
+                run are left out.
+        """
+        # SQLite returns the fingerprint from the row with the max start_time
+        rows = self._cnxn.execute(
+            "SELECT loc, env, fingerprint, MAX(start_time) FROM task_runs "
+            "WHERE returncode = 0 AND fingerprint IS NOT NULL GROUP BY loc, env"
+        )
+        last = {(loc, env): fingerprint for loc, env, fingerprint, _ in rows}
+
+        fingerprints = {}
+        for task in tasks:
+            fingerprint = last.get((task.loc.as_posix(), task.env))
+            if fingerprint is not None:
+                fingerprints[task] = fingerprint
+
+        return fingerprints
+
+    def get_durations(self, task: Task) -> List[float]:
+        """Return the durations of a task's successful runs, ascending."""
+        rows = self._cnxn.execute(
+            "SELECT end_time - start_time AS duration FROM task_runs "
+            "WHERE loc = ? AND env = ? AND returncode = 0 ORDER BY duration",
+            (task.loc.as_posix(), task.env),
+        )
+
+        return [duration for duration, in rows]
+
+    def get_percentiles(
+        self, task: Task, percentiles: Iterable[float] = (50, 90, 99)
+    ) -> Dict[float, float]:
+        """Percentiles of a task's successful run durations.
+
+        Returns:
+            `dict` of `float`: `float` mapping each percentile to seconds.
+                Empty if the task never succeeded.
+        """
+        durations = self.get_durations(task)
+        if not durations:
+            return {}
+
+        return {q: percentile(durations, q) for q in percentiles}
+
+    def get_trend(self, task: Task, last: int = 20) -> float:
+        """How much slower a task gets with each run.
+
+        Args:
+            task (Task): The task to look up.
+            last (int, optional): How many recent successful runs to fit.
+                Defaults to 20.
+
+        Returns:
+            float: Least-squares slope of duration in seconds per run.
+                Positive means the task is getting slower. 0 with fewer than
+                two runs.
+        """
+        runs = [r for r in self.get_task_runs(task) if r.returncode == 0][:last]
+        durations = [r.duration for r in reversed(runs)]
+        n = len(durations)
+        if n < 2:
+            return 0.0
+
+        mean_x = (n - 1) / 2
+        mean_y = sum(durations) / n
+        covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(durations))
+        variance = sum((x - mean_x) ** 2 for x in range(n))
+
+        return covariance / variance
+
+    def get_slowest(self, n: int = 10, q: float = 50) -> List[Tuple[Task, float]]:
+        """The n tasks with the slowest q-th percentile successful duration.
+
+        Returns:
+            `list` of (`Task`, `float`): Tasks and their durations in
+                seconds, slowest first.
+        """
+        rows = self._cnxn.execute(
+            "SELECT loc, env, end_time - start_time AS duration FROM task_runs "
+            "WHERE returncode = 0 ORDER BY loc, env, duration"
+        )
+        durations = {}
+        for loc, env, duration in rows:
+            durations.setdefault((loc, env), []).append(duration)
+
+        slowest = sorted(
+            ((k, percentile(v, q)) for k, v in durations.items()),
+            key=lambda kv: kv[1],
+            reverse=True,
+        )[:n]
+
+        return [(Task(loc, env), duration) for (loc, env), duration in slowest]
+
+    def get_expected_durations(
+        self, tasks: Iterable[Task], q: float = 50
+    ) -> Dict[Task, float]:
+        """Expected duration of each task that has succeeded before.
+
+        Useful as weights for Composer.get_task_priorities.
+
+        Returns:
+            `dict` of `Task`: `float`. Tasks without history are left out.
+        """
+        expected = {}
+        for task in tasks:
+            durations = self.get_durations(task)
+            if durations:
+                expected[task] = percentile(durations, q)
+
+        return expected
@@ -15,27 +15,93 @@
 ## limitations under the License.
 ## ---------------------------------------------------------------------------
 """Determine whether a given compose.yaml is valid
+
+validate_config finds every problem in a single pass and raises them
+together: bad top-level keys, malformed tasks, `uses:` entries naming tasks
+that don't exist, and dependency cycles, each with its path. The pass is
+linear in the number of tasks and `uses:` entries, so large files are
+checked in milliseconds.
 """
 
+from collections import deque
 from packaging.version import parse as version_parse
-from typing import Dict
+from typing import Dict, List
+
+from alyeska.compose.exceptions import ConfigurationError, CyclicConfigurationError
 
-from alyeska.compose.exceptions import ConfigurationError
+TASK_KEYS = {"loc", "env", "uses", "weight", "inputs", "resources"}
 
 
-def validate_config(config: Dict) -> None:
+def validate_config(config: Dict, check_cycles: bool = True) -> None:
     """Determine whether a given compose.yaml is valid
 
     Args:
         config (Dict): dict representation of compose.yaml
+        check_cycles (bool, optional): if false, cyclic dependencies are
+            allowed. Defaults to True.
 
     Raises:
-        ConfigurationError
+        ValueError: If config is not a dict.
+        CyclicConfigurationError: If config has any cycles. Also a
+            ConfigurationError and a CyclicGraphError.
+        ConfigurationError: If config has any other problems. The `errors`
+            attribute lists every problem found.
     """
     if not isinstance(config, dict):
         raise ValueError("config must be parsed as a dict before validation")
-    validate_top_level(config)
-    validate_tasks(config)
+
+    errors = find_errors(config, check_cycles)
+    if not errors:
+        return
+
+    msg = f"compose.yaml has {len(errors)} problem(s):\n" + "\n".join(
+        f"  - {e}" for e in errors
+    )
+    if any(e.startswith("cycle: ") for e in errors):
+        raise CyclicConfigurationError(msg, errors)
+    raise ConfigurationError(msg, errors)
+
+
+def find_errors(config: Dict, check_cycles: bool = True) -> List[str]:
+    """List every problem with a compose.yaml
+
+    Args:
+        config (Dict): dict representation of compose.yaml
+        check_cycles (bool, optional): if false, cyclic dependencies are
+            allowed. Defaults to True.
+
+    Returns:
+        List[str]: a message for each problem, empty if config is valid
+    """
+    errors = validate_top_level(config)
+    tasks = config.get("tasks")
+    if "tasks" in config and not (isinstance(tasks, dict) and tasks):
+        errors.append("`tasks` must be a non-empty mapping of task names to tasks")
+    if not isinstance(tasks, dict):
+        return errors
+
+    resources = config.get("resources", {})
+    if not isinstance(resources, dict):
+        errors.append("`resources` must be a mapping of names to capacities")
+    else:
+        errors.extend(validate_amounts("resources", resources))
+
+    downstream = {name: [] for name in tasks}
+    for name, task in tasks.items():
+        errors.extend(validate_task(name, task))
+        for upstream in get_uses(task):
+            if upstream in downstream:
+                downstream[upstream].append(name)
+            else:
+                errors.append(f"tasks.{name}.uses: unknown task {upstream!r}")
+
+    if check_cycles:
+        errors.extend(
+            "cycle: " + " -> ".join(map(str, cycle))
+            for cycle in find_cycles(downstream)
+        )
+
+    return errors
 
 
 # def validate_version(config: Dict) -> None:
@@ -70,28 +136,186 @@ def validate_config(config: Dict) -> None:
 #         raise ConfigurationError(msg)
 
 
-def validate_top_level(config: Dict) -> None:
+def validate_top_level(config: Dict) -> List[str]:
     required_keys = {"conda-envs", "tasks", "version"}
-    optional_keys = {"tasks-dir", "entrypoint"}
+    optional_keys = {"tasks-dir", "entrypoint", "resources"}
     possible_keys = required_keys.union(optional_keys)
 
     observed_keys = set(config.keys())
 
-    if not required_keys.issubset(observed_keys):
-        raise ConfigurationError(
-            f"Composer config is missing one or more required tags. "
-            f"Observed tags: {observed_keys}. "
-            f"Required tags: {required_keys}."
+    errors = []
+    missing_keys = required_keys - observed_keys
+    if missing_keys:
+        errors.append(
+            f"Composer config is missing one or more required tags: "
+            f"{sorted(missing_keys)}"
         )
     bad_tags = observed_keys - possible_keys
     if len(bad_tags) > 0:
-        raise ConfigurationError(
-            f"Composer config contains one or more invalid tags: {bad_tags}"
+        errors.append(
+            f"Composer config contains one or more invalid tags: "
+            f"{sorted(map(str, bad_tags))}"
         )
 
+    return errors
+
+
+def get_uses(task: Dict) -> List:
+    """Names in a task's `uses:` entry, ignoring malformed entries"""
+    if not isinstance(task, dict):
+        return []
+    uses = task.get("uses", [])
+    if isinstance(uses, str):
+        return [uses]
+    if not isinstance(uses, list):
+        return []
+
+    return [u for u in uses if isinstance(u, str)]
+
+
+def validate_amounts(key: str, amounts: Dict) -> List[str]:
+    """Check a mapping of resource names to non-negative numbers"""
+    errors = []
+    for name, amount in amounts.items():
+        if not isinstance(name, str):
+            errors.append(f"{key}: {name!r} must be a str")
+        elif isinstance(amount, bool) or not isinstance(amount, (int, float)):
+            errors.append(f"{key}.{name}: must be a number")
+        elif amount < 0:
+            errors.append(f"{key}.{name}: must not be negative")
+
+    return errors
+
+
+def validate_task(name: str, task: Dict) -> List[str]:
+    """Check one task's schema
+
+    Args:
+        name (str): task alias
+        task (Dict): the task's entry under `tasks`
+
+    Returns:
+        List[str]: a message for each problem
+    """
+    prefix = f"tasks.{name}"
+    if not isinstance(task, dict):
+        return [f"{prefix}: must be a mapping"]
+
+    errors = []
+    unknown_keys = set(task) - TASK_KEYS
+    if unknown_keys:
+        errors.append(f"{prefix}: unknown keys {sorted(map(str, unknown_keys))}")
+
+    if "env" not in task:
+        errors.append(f"{prefix}: missing `env`")
+    elif not isinstance(task["env"], str) or not task["env"]:
+        errors.append(f"{prefix}.env: must be a non-empty str")
+
+    if "loc" in task and (not isinstance(task["loc"], str) or not task["loc"]):
+        errors.append(f"{prefix}.loc: must be a non-empty str")
+
+    uses = task.get("uses", [])
+    if not isinstance(uses, (str, list)) or (
+        isinstance(uses, list) and not all(isinstance(u, str) for u in uses)
+    ):
+        errors.append(f"{prefix}.uses: must be a task name or a list of task names")
+
+    weight = task.get("weight", 1)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+        errors.append(f"{prefix}.weight: must be a number")
+    elif weight < 0:
+        errors.append(f"{prefix}.weight: must not be negative")
+
+    inputs = task.get("inputs", [])
+    if not isinstance(inputs, (str, list)) or (
+        isinstance(inputs, list) and not all(isinstance(i, str) for i in inputs)
+    ):
+        errors.append(f"{prefix}.inputs: must be a str or a list of str")
+
+    resources = task.get("resources", {})
+    if not isinstance(resources, dict):
+        errors.append(f"{prefix}.resources: must be a mapping of names to amounts")
+    else:
+        errors.extend(validate_amounts(f"{prefix}.resources", resources))
+
+    return errors
+
+
+def find_cycles(downstream: Dict[str, List[str]]) -> List[List[str]]:
+    """Find a cycle in each strongly connected component of a graph
+
+    Every cycle lies inside one strongly connected component, so a component
+    with no cycle reported through it has none. Tarjan's algorithm finds the
+    components, then a breadth-first search finds the shortest cycle through
+    the first node of each, in O(V + E) overall.
+
+    Args:
+        downstream (Dict[str, List[str]]): maps each node to the nodes
+            downstream of it
+
+    Returns:
+        List[List[str]]: cycles as paths that start and end on the same node,
+            in the order the nodes appear in downstream
+    """
+    order = {node: i for i, node in enumerate(downstream)}
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in downstream:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(downstream[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(downstream[child])))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in downstream[node]:
+                        components.append(component)
+
+    cycles = []
+    for component in sorted(components, key=lambda c: min(order[n] for n in c)):
+        members = set(component)
+        start = min(component, key=order.__getitem__)
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if start in downstream[node]:
+                break
+            for child in downstream[node]:
+                if child in members and child not in previous:
+                    previous[child] = node
+                    queue.append(child)
+
+        path = [start]
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        cycles.append(path[::-1])
 
-def validate_tasks(config: Dict) -> None:
-    try:
-        tasks = config["tasks"]
-    except KeyError:
-        raise ConfigurationError("config is missing `tasks`")
+    return cycles
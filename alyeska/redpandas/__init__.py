@@ -17,9 +17,22 @@
 """alyeska redpandas module for smoother pandas/redshift functionality
 """
 
-from typing import Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import itertools
+import logging
+import threading
+from typing import Callable, Coroutine, Iterable, Tuple, Union
+import uuid
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+)
 import psycopg2
 
 from alyeska.redpandas.exceptions import MissingTableError
@@ -47,6 +60,74 @@ def assert_table_exists(
         raise MissingTableError(f"{schema}.{table} does not exist")
 
 
+def quote_strings(values: pd.Series, standard_strings: bool = True) -> np.ndarray:
+    """Quote str values as SQL string literals
+
+    Args:
+        values (pd.Series): str values, no NULLs
+        standard_strings (bool, optional): whether the server has
+            standard_conforming_strings on. If not, backslashes are escapes,
+            so they're doubled and the literal gets an E prefix, as libpq
+            does. Defaults to True.
+
+    Returns:
+        np.ndarray: object array of literals
+    """
+    escaped = values.astype(str).str.replace("'", "''", regex=False)
+    if standard_strings:
+        return ("'" + escaped + "'").to_numpy(dtype=object)
+
+    escaped = escaped.str.replace("\\", "\\\\", regex=False)
+    return ("E'" + escaped + "'").to_numpy(dtype=object)
+
+
+def format_sql_literals(
+    column: pd.Series, curs: psycopg2.extensions.cursor
+) -> np.ndarray:
+    """Format a column as SQL literals for INSERT ... VALUES
+
+    Each dtype is formatted with vectorized operations. NULLs (None, NaN, NaT)
+    become NULL. Values in object columns that aren't str, e.g. Decimal or
+    date, fall back to curs.mogrify one at a time.
+
+    Args:
+        column (pd.Series): column to format
+        curs (psycopg2.extensions.cursor): cursor of the target connection,
+            whose settings decide how strings are escaped
+
+    Returns:
+        np.ndarray: object array of literals, one per row
+    """
+    isnull = column.isna().to_numpy()
+    values = column[~isnull]
+    if is_bool_dtype(column):
+        text = np.where(values.to_numpy(dtype=bool), "true", "false")
+    elif is_integer_dtype(column):
+        text = values.astype(str).to_numpy()
+    elif is_float_dtype(column):
+        floats = values.to_numpy(dtype=float)
+        text = floats.astype(str).astype(object)
+        text[np.isposinf(floats)] = "'Infinity'::float"
+        text[np.isneginf(floats)] = "'-Infinity'::float"
+    elif is_datetime64_any_dtype(column):
+        cast = "timestamptz" if getattr(column.dt, "tz", None) else "timestamp"
+        text = ("'" + values.astype(str) + f"'::{cast}").to_numpy()
+    else:
+        standard_strings = (
+            curs.connection.get_parameter_status("standard_conforming_strings") != "off"
+        )
+        objects = values.to_numpy(dtype=object)
+        is_str = np.fromiter((isinstance(v, str) for v in objects), bool, len(objects))
+        text = np.empty(len(objects), dtype=object)
+        text[is_str] = quote_strings(pd.Series(objects[is_str]), standard_strings)
+        text[~is_str] = [curs.mogrify("%s", (v,)).decode() for v in objects[~is_str]]
+
+    literals = np.full(len(column), "NULL", dtype=object)
+    literals[~isnull] = text
+
+    return literals
+
+
 def generate_insert_queries(
     curs: psycopg2.extensions.cursor,
     insert_table: str,
@@ -57,6 +138,9 @@ def generate_insert_queries(
     """Generator that helps insert_pandas_into. Assumes totally valid
     arguments, and colnames must match the schema of the insert table.
 
+    Each chunk is formatted column by column with vectorized operations, and
+    its VALUES are assembled into a single bytes query.
+
     Args:
         curs (psycopg2.extensions.cursor): Connection used to insert to table
         insert_table (str): Target table in database
@@ -74,12 +158,14 @@ def generate_insert_queries(
         raise TypeError("df must be a pandas DataFrame")
     if not isinstance(chunksize, int):
         raise TypeError("chunksize must be an int")
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive")
 
-    ncol = len(df.columns)
     colnames = df.columns.tolist()
     sanitized_colnames = [f'"{col}"' for col in colnames]
+    encoding = psycopg2.extensions.encodings[curs.connection.encoding]
 
-    insert_template = "\n".join(
+    insert_header = "\n".join(
         [
             f"INSERT INTO {insert_table} ",
             "(",
@@ -87,25 +173,267 @@ def generate_insert_queries(
             "  " + ",\n  ".join(sanitized_colnames),
             ")",
             "VALUES\n",
-            "{}",
+            "",
         ]
-    )
-    all_values = df.values.tolist()
-
-    formatting = ", ".join(["%s"] * ncol)  # e.g. '%s, %s, %s'
-    for i in range(0, len(all_values) + chunksize, chunksize):
-        subset_values = all_values[i : i + chunksize]
-        if subset_values:
-            # as of 2018 Dec 7, you can only use mogrify with a cursor object
-            query_values = "  " + ",\n  ".join(
-                curs.mogrify(f"({formatting})", row).decode() for row in subset_values
-            )
-            # cleanup values
-            query_values = query_values.replace("'NaT'::timestamp", "NULL")
-            query_values = query_values.replace("'NaN'::float", "NULL")
-            query_values = query_values.replace("'None'", "NULL")
-            query = insert_template.format(query_values)
-            yield query
+    ).encode(encoding)
+
+    for i in range(0, len(df), chunksize):
+        subset = df.iloc[i : i + chunksize]
+        columns = [
+            format_sql_literals(subset.iloc[:, j], curs) for j in range(subset.shape[1])
+        ]
+        rows = "  (" + columns[0]
+        for literals in columns[1:]:
+            rows = rows + ", " + literals
+        rows = rows + ")"
+        yield insert_header + ",\n".join(rows).encode(encoding)
+
+
+def format_floats(values: np.ndarray) -> np.ndarray:
+    """Format floats as text that PostgreSQL parses back to the same value
+
+    Whole numbers lose their ".0" so that they also load into integer
+    columns, as they do through INSERT ... VALUES.
+
+    Args:
+        values (np.ndarray): finite or infinite floats, no NaN
+
+    Returns:
+        np.ndarray: str representations
+    """
+    values = np.asarray(values, dtype=float)
+    text = values.astype(str).astype(object)
+    with np.errstate(invalid="ignore"):
+        whole = np.isfinite(values) & (values % 1 == 0) & (np.abs(values) < 2 ** 53)
+    text[whole] = values[whole].astype(np.int64).astype(str)
+    text[np.isposinf(values)] = "Infinity"
+    text[np.isneginf(values)] = "-Infinity"
+
+    return text
+
+
+def format_csv_column(column: pd.Series, null: str = "") -> np.ndarray:
+    """Format a column as fields of a PostgreSQL CSV COPY
+
+    NULLs (None, NaN, NaT) become unquoted `null` fields. Strings and other
+    objects are always quoted, so empty strings stay empty strings.
+
+    Args:
+        column (pd.Series): column to format
+        null (str, optional): text of NULL fields. Defaults to "".
+
+    Returns:
+        np.ndarray: object array of CSV fields, one per row
+    """
+    isnull = column.isna().to_numpy()
+    values = column[~isnull]
+    if is_bool_dtype(column):
+        text = np.where(values.to_numpy(dtype=bool), "true", "false")
+    elif is_integer_dtype(column):
+        text = values.astype(str).to_numpy()
+    elif is_float_dtype(column):
+        text = format_floats(values.to_numpy(dtype=float))
+    elif is_datetime64_any_dtype(column):
+        text = values.astype(str).to_numpy()
+    else:
+        escaped = values.astype(str).str.replace('"', '""', regex=False)
+        text = ('"' + escaped + '"').to_numpy()
+
+    fields = np.full(len(column), null, dtype=object)
+    fields[~isnull] = text
+
+    return fields
+
+
+def generate_csv_chunks(
+    df: pd.DataFrame, *, chunksize: int = 10000, null: str = ""
+) -> Coroutine:
+    """Generator that formats df as CSV text for COPY ... FROM STDIN, one
+    chunk of rows at a time. Each column is formatted with vectorized
+    operations rather than row by row.
+
+    Args:
+        df (pd.DataFrame): Pandas dataframe that will be inserted
+        chunksize (int, optional): How many rows to format at a time.
+            Defaults to 10000.
+        null (str, optional): text of NULL fields. Defaults to "".
+
+    Returns:
+        None
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("df must be a pandas DataFrame")
+    if not isinstance(chunksize, int):
+        raise TypeError("chunksize must be an int")
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive")
+
+    for i in range(0, len(df), chunksize):
+        subset = df.iloc[i : i + chunksize]
+        columns = [
+            format_csv_column(subset.iloc[:, j], null) for j in range(subset.shape[1])
+        ]
+        rows = columns[0]
+        for fields in columns[1:]:
+            rows = rows + "," + fields
+        yield "\n".join(rows) + "\n"
+
+
+class ChunkedReader:
+    """Read-only file-like object over an iterable of str or bytes, so that
+    cursor.copy_expert can stream chunks without joining them first.
+
+    psycopg2 turns an exception raised while reading into a QueryCanceled
+    error that only quotes its message, so the original exception is kept
+    in the error attribute.
+    """
+
+    def __init__(self, chunks: Iterable[Union[str, bytes]]):
+        self._chunks = iter(chunks)
+        self._chunk = ""
+        self._pos = 0
+        self.error = None
+
+    def read(self, size: int = -1) -> Union[str, bytes]:
+        """Read up to size characters, or everything left if size < 0"""
+        parts = []
+        while size != 0:
+            if self._pos == len(self._chunk):
+                try:
+                    chunk = next(self._chunks, None)
+                except Exception as e:
+                    self.error = e
+                    raise
+                if chunk is None:
+                    break
+                self._chunk, self._pos = chunk, 0
+            end = len(self._chunk) if size < 0 else self._pos + size
+            part = self._chunk[self._pos : end]
+            self._pos += len(part)
+            parts.append(part)
+            if size > 0:
+                size -= len(part)
+
+        return self._chunk[:0].join(parts)
+
+
+@contextmanager
+def transaction(cnxn: psycopg2.extensions.connection):
+    """Run the statements in the with block as a single transaction
+
+    Commits when the block exits normally and rolls back if it raises. An
+    autocommit connection is switched out of autocommit for the duration of
+    the block. Otherwise, anything already pending on the connection is
+    committed or rolled back with the block.
+
+    Args:
+        cnxn (psycopg2.extensions.connection): connection to run the
+            transaction on
+    """
+    autocommit = cnxn.autocommit
+    if autocommit:
+        cnxn.autocommit = False
+    try:
+        yield cnxn
+    except BaseException:
+        cnxn.rollback()
+        raise
+    else:
+        cnxn.commit()
+    finally:
+        if autocommit:
+            cnxn.autocommit = True
+
+
+def write_frames(
+    curs: psycopg2.extensions.cursor,
+    insert_table: str,
+    frames: Iterable[pd.DataFrame],
+    *,
+    chunksize: int = 10000,
+    method: str = "values",
+    progress: Callable[[int, int], None] = None,
+) -> Tuple[int, int]:
+    """Write frames into insert_table, one chunk at a time
+
+    Only one chunk of one frame is formatted in memory at a time. Frames are
+    pulled from the iterable as they are needed. Every frame must have the
+    same columns as the first.
+
+    Args:
+        curs (psycopg2.extensions.cursor): Cursor used to insert to table
+        insert_table (str): Target table in database
+        frames (Iterable[pd.DataFrame]): Pandas dataframes to insert
+        chunksize (int, optional): How many rows to write per insert.
+            Defaults to 10000.
+        method (str, optional): "values" or "copy", as in insert_pandas_into.
+            Defaults to "values".
+        progress (Callable[[int, int], None], optional): called with the
+            total rows and bytes sent so far after every chunk. Defaults to
+            None.
+
+    Raises:
+        TypeError: If an item of frames is not a DataFrame.
+        ValueError: If a frame's columns differ from the first frame's.
+
+    Returns:
+        (int, int): total rows and bytes sent
+    """
+    encoding = psycopg2.extensions.encodings[curs.connection.encoding]
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return 0, 0
+    if not isinstance(first, pd.DataFrame):
+        raise TypeError("frames must only contain pandas DataFrames")
+    colnames = first.columns.tolist()
+    rows = nbytes = 0
+
+    def chunks():
+        nonlocal rows, nbytes
+        for df in itertools.chain([first], frames):
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError("frames must only contain pandas DataFrames")
+            if df.columns.tolist() != colnames:
+                raise ValueError(
+                    f"Every frame must have the columns {colnames}. "
+                    f"Got {df.columns.tolist()}"
+                )
+
+            if method == "copy":
+                queries = (
+                    chunk.encode(encoding)
+                    for chunk in generate_csv_chunks(df, chunksize=chunksize)
+                )
+            else:
+                queries = generate_insert_queries(
+                    curs=curs, insert_table=insert_table, df=df, chunksize=chunksize
+                )
+            for start, query in zip(range(0, len(df), chunksize), queries):
+                yield query
+                rows += min(chunksize, len(df) - start)
+                nbytes += len(query)
+                if progress is not None:
+                    progress(rows, nbytes)
+
+    if method == "copy":
+        sanitized_colnames = ", ".join(f'"{col}"' for col in colnames)
+        query = (
+            f"COPY {insert_table} ({sanitized_colnames}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        reader = ChunkedReader(chunks())
+        try:
+            curs.copy_expert(query, reader)
+        except psycopg2.Error:
+            if reader.error is None:
+                raise
+            raise reader.error
+    else:
+        for query in chunks():
+            curs.execute(query)
+
+    return rows, nbytes
 
 
 def insert_pandas_into(
@@ -114,6 +442,7 @@ def insert_pandas_into(
     df: pd.DataFrame,
     *,
     chunksize: int = 10000,
+    method: str = "values",
 ) -> None:
     """Open connection and insert df into insert_table.
 
@@ -123,6 +452,14 @@ def insert_pandas_into(
         df (pd.DataFrame): Pandas dataframe that will be inserted
         chunksize (int, optional): How many rows to write per insert.
             Defaults to 10000.
+        method (str, optional): "values" to run INSERT ... VALUES statements,
+            or "copy" to stream df as CSV with a single COPY ... FROM STDIN,
+            formatting chunksize rows at a time. "copy" is several times
+            faster, but Redshift doesn't support COPY FROM STDIN; use it with
+            PostgreSQL. Defaults to "values".
+
+    Raises:
+        ValueError: If method is not "values" or "copy".
 
     Returns:
         None: [description]
@@ -135,6 +472,8 @@ def insert_pandas_into(
         raise TypeError("df must be a pandas DataFrame")
     if not isinstance(chunksize, int):
         raise TypeError("chunksize must be an int")
+    if method not in ("values", "copy"):
+        raise ValueError('method must be "values" or "copy"')
 
     # TODO: assert insert_table exists
     try:
@@ -146,9 +485,263 @@ def insert_pandas_into(
         assert_table_exists(cnxn, schema, table)
 
     with cnxn.cursor() as curs:
-        for query in generate_insert_queries(
-            curs=curs, insert_table=insert_table, df=df, chunksize=chunksize
-        ):
-            curs.execute(query)
+        write_frames(curs, insert_table, [df], chunksize=chunksize, method=method)
 
     return None
+
+
+def insert_frames_into(
+    cnxn: psycopg2.extensions.connection,
+    insert_table: str,
+    frames: Iterable[pd.DataFrame],
+    *,
+    chunksize: int = 10000,
+    method: str = "values",
+    progress: Callable[[int, int], None] = None,
+) -> Tuple[int, int]:
+    """Stream an iterable of dataframes into insert_table in one transaction.
+
+    frames can be any iterable or generator, e.g. pd.read_csv(...,
+    chunksize=...) or pd.read_sql(..., chunksize=...). Frames are consumed
+    one at a time, so memory use doesn't grow with the total number of rows.
+    Either every row of every frame is inserted, or none are.
+
+    Args:
+        cnxn (psycopg2.extensions.connection): Connection used to insert to table
+        insert_table (str): Target table in database
+        frames (Iterable[pd.DataFrame]): Pandas dataframes that will be
+            inserted. Every frame must have the same columns.
+        chunksize (int, optional): How many rows to write per insert.
+            Defaults to 10000.
+        method (str, optional): "values" or "copy", as in insert_pandas_into.
+            Defaults to "values".
+        progress (Callable[[int, int], None], optional): called with the
+            total rows and bytes sent so far after every chunk. Defaults to
+            None.
+
+    Raises:
+        ValueError: If method is not "values" or "copy", or if the frames'
+            columns differ. The transaction is rolled back.
+
+    Returns:
+        (int, int): total rows and bytes written
+    """
+    if not isinstance(cnxn, psycopg2.extensions.connection):
+        raise TypeError("cnxn must be a psycopg2 connection")
+    if not isinstance(insert_table, str):
+        raise TypeError("insert_table must be a str")
+    if isinstance(frames, pd.DataFrame):
+        raise TypeError("frames must be an iterable of DataFrames, not a DataFrame")
+    if not isinstance(chunksize, int):
+        raise TypeError("chunksize must be an int")
+    if method not in ("values", "copy"):
+        raise ValueError('method must be "values" or "copy"')
+
+    try:
+        schema, table = insert_table.split(".")
+    except ValueError:
+        # not enough values to unpack e.g. temp_table
+        pass
+    else:
+        assert_table_exists(cnxn, schema, table)
+
+    with transaction(cnxn), cnxn.cursor() as curs:
+        rows, nbytes = write_frames(
+            curs,
+            insert_table,
+            frames,
+            chunksize=chunksize,
+            method=method,
+            progress=progress,
+        )
+    logging.info(f"Inserted {rows} rows ({nbytes} bytes) into {insert_table}")
+
+    return rows, nbytes
+
+
+def get_staging_table(insert_table: str) -> str:
+    """Name a uniquely named staging table next to insert_table
+
+    e.g. etl.account -> etl.account_staging_1f2e3d4c
+    """
+    return f"{insert_table}_staging_{uuid.uuid4().hex[:8]}"
+
+
+def parallel_insert_into(
+    connect: Callable[[], psycopg2.extensions.connection],
+    insert_table: str,
+    frames: Iterable[pd.DataFrame],
+    *,
+    connections: int = 4,
+    chunksize: int = 10000,
+    method: str = "values",
+    append: bool = False,
+    progress: Callable[[int, int], None] = None,
+) -> Tuple[int, int]:
+    """Load frames over several connections at once, all or nothing.
+
+    The frames are loaded in parallel into a staging table created LIKE
+    insert_table. Each connection pulls the next frame as soon as it's done
+    with the last. Once every frame is staged, the rows are moved into
+    insert_table by a single INSERT INTO ... SELECT transaction, or by ALTER
+    TABLE APPEND. If anything fails, insert_table is left untouched. The
+    staging table is always dropped.
+
+    Example:
+        >>> import functools
+        >>> import alyeska.locksmith.redshift as rs
+        >>> connect = functools.partial(rs.connect_with_environment, "my-secret")
+        >>> parallel_insert_into(connect, "etl.account", frames, connections=8)
+
+    Args:
+        connect (Callable[[], psycopg2.extensions.connection]): opens a new
+            connection, e.g. a locksmith.redshift connect function with its
+            arguments bound. Called connections + 1 times.
+        insert_table (str): Target table in database
+        frames (Iterable[pd.DataFrame]): Pandas dataframes that will be
+            inserted. Every frame must have the same columns.
+        connections (int, optional): How many connections load at once.
+            Defaults to 4.
+        chunksize (int, optional): How many rows to write per insert.
+            Defaults to 10000.
+        method (str, optional): "values" or "copy", as in insert_pandas_into.
+            Defaults to "values".
+        append (bool, optional): if true, move the rows with Redshift's ALTER
+            TABLE APPEND, which moves storage blocks instead of copying rows.
+            It requires the frames to fill every column, since insert_table's
+            defaults aren't applied. Defaults to False.
+        progress (Callable[[int, int], None], optional): called with the
+            total rows and bytes staged so far, across every connection,
+            after every chunk. Defaults to None.
+
+    Raises:
+        ValueError: If method is not "values" or "copy", or if the frames'
+            columns differ.
+
+    Returns:
+        (int, int): total rows and bytes loaded
+    """
+    if not callable(connect):
+        raise TypeError("connect must be a function that returns a connection")
+    if not isinstance(insert_table, str):
+        raise TypeError("insert_table must be a str")
+    if isinstance(frames, pd.DataFrame):
+        raise TypeError("frames must be an iterable of DataFrames, not a DataFrame")
+    if not isinstance(connections, int):
+        raise TypeError("connections must be an int")
+    if not isinstance(chunksize, int):
+        raise TypeError("chunksize must be an int")
+    if method not in ("values", "copy"):
+        raise ValueError('method must be "values" or "copy"')
+    if connections < 1:
+        raise ValueError("connections must be positive")
+
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return 0, 0
+    if not isinstance(first, pd.DataFrame):
+        raise TypeError("frames must only contain pandas DataFrames")
+    colnames = first.columns.tolist()
+    frames = itertools.chain([first], frames)
+
+    lock = threading.Lock()
+    failed = threading.Event()
+    totals = [0, 0]  # rows and bytes staged by every connection
+
+    def next_frames():
+        """Hand out frames to one connection until they run out"""
+        while not failed.is_set():
+            with lock:
+                df = next(frames, None)
+            if df is None:
+                return
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError("frames must only contain pandas DataFrames")
+            if df.columns.tolist() != colnames:
+                raise ValueError(
+                    f"Every frame must have the columns {colnames}. "
+                    f"Got {df.columns.tolist()}"
+                )
+            yield df
+
+    def report(rows: int, nbytes: int, sent: list) -> None:
+        """Add one connection's progress to the totals"""
+        with lock:
+            totals[0] += rows - sent[0]
+            totals[1] += nbytes - sent[1]
+            sent[:] = rows, nbytes
+            current = tuple(totals)
+        if progress is not None:
+            progress(*current)
+
+    def load(staging_table: str) -> None:
+        """Stage frames over one connection, in one transaction"""
+        sent = [0, 0]
+        try:
+            worker_cnxn = connect()
+            try:
+                with transaction(worker_cnxn), worker_cnxn.cursor() as curs:
+                    write_frames(
+                        curs,
+                        staging_table,
+                        next_frames(),
+                        chunksize=chunksize,
+                        method=method,
+                        progress=lambda rows, nbytes: report(rows, nbytes, sent),
+                    )
+            finally:
+                worker_cnxn.close()
+        except BaseException:
+            # stop the other connections; their rows are dropped with the table
+            failed.set()
+            raise
+
+    cnxn = connect()
+    cnxn.autocommit = True
+    try:
+        try:
+            schema, table = insert_table.split(".")
+        except ValueError:
+            # not enough values to unpack e.g. temp_table
+            pass
+        else:
+            assert_table_exists(cnxn, schema, table)
+
+        staging_table = get_staging_table(insert_table)
+        with cnxn.cursor() as curs:
+            curs.execute(f"CREATE TABLE {staging_table} (LIKE {insert_table});")
+        try:
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                futures = [
+                    executor.submit(load, staging_table) for _ in range(connections)
+                ]
+            for future in futures:
+                future.result()
+
+            sanitized_colnames = ", ".join(f'"{col}"' for col in colnames)
+            with cnxn.cursor() as curs:
+                if append:
+                    # ALTER TABLE APPEND can't run inside a transaction block
+                    curs.execute(
+                        f"ALTER TABLE {insert_table} APPEND FROM {staging_table};"
+                    )
+                else:
+                    with transaction(cnxn):
+                        curs.execute(
+                            f"INSERT INTO {insert_table} ({sanitized_colnames}) "
+                            f"SELECT {sanitized_colnames} FROM {staging_table};"
+                        )
+        finally:
+            with cnxn.cursor() as curs:
+                curs.execute(f"DROP TABLE IF EXISTS {staging_table};")
+    finally:
+        cnxn.close()
+
+    rows, nbytes = totals
+    logging.info(
+        f"Inserted {rows} rows ({nbytes} bytes) into {insert_table} "
+        f"over {connections} connections"
+    )
+
+    return rows, nbytes
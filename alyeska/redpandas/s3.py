@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Load DataFrames into Redshift through S3
+
+Redshift loads fastest with COPY from S3. Each slice of the cluster reads
+files in parallel, while INSERT statements all go through the leader node.
+copy_pandas_into splits a DataFrame into a multiple of the cluster's slice
+count of gzipped CSV or Parquet parts and uploads them concurrently. It then
+writes a manifest listing exactly those parts, runs a single COPY ...
+MANIFEST, and deletes everything it staged.
+
+Usage:
+    >>> import boto3
+    >>> import alyeska.locksmith.redshift as rs
+    >>> import alyeska.redpandas.s3 as rps
+    >>> session = boto3.Session()
+    >>> cnxn = rs.connect_with_session(session, "my-redshift-secret")
+    >>> rps.copy_pandas_into(
+    ...     cnxn, "etl.account", df, session=session, bucket="my-staging-bucket"
+    ... )
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import io
+import json
+from typing import Dict, List, Sequence
+import uuid
+
+import boto3
+import pandas as pd
+import psycopg2
+
+from alyeska.redpandas import generate_csv_chunks
+
+FILE_FORMATS = {"csv": ".csv.gz", "parquet": ".parquet"}
+
+# unquoted \N is NULL, so that quoted empty strings stay empty strings
+NULL_AS = "\\N"
+
+# delete_objects takes at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+def get_slice_count(cnxn: psycopg2.extensions.connection) -> int:
+    """Count the slices of the Redshift cluster behind cnxn
+
+    Args:
+        cnxn (psycopg2.extensions.connection): Redshift connection
+
+    Returns:
+        int: number of slices
+    """
+    with cnxn.cursor() as curs:
+        curs.execute("SELECT COUNT(*) FROM stv_slices;")
+        (slices,) = curs.fetchone()
+
+    return slices
+
+
+def split_frame(df: pd.DataFrame, nparts: int) -> List[pd.DataFrame]:
+    """Split df into at most nparts runs of rows of near-equal length
+
+    Parts that would be empty, because df has fewer than nparts rows, are
+    left out.
+
+    Args:
+        df (pd.DataFrame): Pandas dataframe to split
+        nparts (int): number of parts
+
+    Returns:
+        List[pd.DataFrame]: the parts, in order
+    """
+    if not isinstance(nparts, int):
+        raise TypeError("nparts must be an int")
+    if nparts < 1:
+        raise ValueError("nparts must be positive")
+
+    size, extra = divmod(len(df), nparts)
+    parts = []
+    start = 0
+    for i in range(nparts):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            parts.append(df.iloc[start:stop])
+        start = stop
+
+    return parts
+
+
+def serialize_part(df: pd.DataFrame, file_format: str = "csv") -> bytes:
+    """Encode a part as gzipped CSV or as Parquet
+
+    CSV parts are compressed as they are formatted, so the uncompressed text
+    is never held in memory all at once. Parquet needs pyarrow or
+    fastparquet to be installed.
+
+    Args:
+        df (pd.DataFrame): Pandas dataframe to encode
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+
+    Returns:
+        bytes: contents of the part's file
+    """
+    buffer = io.BytesIO()
+    if file_format == "parquet":
+        df.to_parquet(buffer, index=False)
+    else:
+        with gzip.GzipFile(fileobj=buffer, mode="wb") as f:
+            for chunk in generate_csv_chunks(df, null=NULL_AS):
+                f.write(chunk.encode("utf-8"))
+
+    return buffer.getvalue()
+
+
+def get_manifest(bucket: str, keys: Sequence[str], sizes: Sequence[int]) -> Dict:
+    """Describe the staged parts as a Redshift COPY manifest
+
+    Every entry is mandatory, so COPY fails rather than load partial data.
+    The content lengths are required for Parquet, and harmless for CSV.
+
+    Args:
+        bucket (str): S3 bucket holding the parts
+        keys (Sequence[str]): S3 key of each part
+        sizes (Sequence[int]): size of each part, in bytes
+
+    Returns:
+        Dict: the manifest, ready for json.dumps
+    """
+    return {
+        "entries": [
+            {
+                "url": f"s3://{bucket}/{key}",
+                "mandatory": True,
+                "meta": {"content_length": size},
+            }
+            for key, size in zip(keys, sizes)
+        ]
+    }
+
+
+def get_credentials_clause(session: boto3.Session, iam_role: str = None) -> str:
+    """Authorize COPY with an IAM role, or else with the session's keys
+
+    Args:
+        session (boto3.Session): session whose credentials COPY uses if
+            iam_role is None
+        iam_role (str, optional): ARN of a role attached to the cluster.
+            Defaults to None.
+
+    Raises:
+        ValueError: If there's no iam_role and the session has no credentials.
+
+    Returns:
+        str: the authorization clause of a COPY statement
+    """
+    if iam_role is not None:
+        return f"IAM_ROLE '{iam_role}'"
+
+    credentials = session.get_credentials()
+    if credentials is None:
+        raise ValueError("session has no credentials and no iam_role was given")
+    creds = credentials.get_frozen_credentials()
+    parts = [
+        f"aws_access_key_id={creds.access_key}",
+        f"aws_secret_access_key={creds.secret_key}",
+    ]
+    if creds.token:
+        parts.append(f"token={creds.token}")
+
+    return f"CREDENTIALS '{';'.join(parts)}'"
+
+
+def get_copy_query(
+    insert_table: str,
+    colnames: Sequence[str],
+    manifest_url: str,
+    credentials_clause: str,
+    file_format: str = "csv",
+) -> str:
+    """Write the COPY statement that loads every part listed in a manifest
+
+    Parquet columns are matched to the table's columns by position, so
+    colnames is only used for CSV.
+
+    Args:
+        insert_table (str): Target table in database
+        colnames (Sequence[str]): names of the columns in each part
+        manifest_url (str): s3:// URL of the manifest
+        credentials_clause (str): as returned by get_credentials_clause
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+
+    Returns:
+        str: the COPY statement
+    """
+    if file_format == "parquet":
+        target = insert_table
+        format_options = "FORMAT AS PARQUET"
+    else:
+        sanitized_colnames = ", ".join(f'"{col}"' for col in colnames)
+        target = f"{insert_table} ({sanitized_colnames})"
+        # Redshift string literals treat backslashes as escapes
+        null_as = NULL_AS.replace("\\", "\\\\")
+        format_options = f"FORMAT AS CSV GZIP NULL AS '{null_as}' TIMEFORMAT 'auto'"
+
+    return "\n".join(
+        [
+            f"COPY {target}",
+            f"FROM '{manifest_url}'",
+            credentials_clause,
+            "MANIFEST",
+            f"{format_options};",
+        ]
+    )
+
+
+def delete_staged(s3, bucket: str, keys: Sequence[str]) -> None:
+    """Delete staged objects, in batches of up to 1000 keys"""
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[i : i + DELETE_BATCH_SIZE]
+        s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+
+
+def stage_frame(
+    s3,
+    bucket: str,
+    prefix: str,
+    df: pd.DataFrame,
+    nparts: int,
+    *,
+    file_format: str = "csv",
+    max_workers: int = 8,
+) -> List[str]:
+    """Split df into parts, upload them concurrently, then upload a manifest
+
+    Each worker encodes and uploads one part at a time, so at most
+    max_workers parts are in memory at once. upload_fileobj switches to
+    multipart uploads for large parts.
+
+    Args:
+        s3: boto3 S3 client
+        bucket (str): S3 bucket to stage in
+        prefix (str): S3 key prefix of the staged objects
+        df (pd.DataFrame): Pandas dataframe to stage
+        nparts (int): number of parts to split df into
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+        max_workers (int, optional): concurrent uploads. Defaults to 8.
+
+    Returns:
+        List[str]: keys of the uploaded objects, with the manifest last. On
+            error, every object is deleted before raising.
+    """
+    parts = split_frame(df, nparts)
+    keys = [
+        f"{prefix}part-{i:05d}{FILE_FORMATS[file_format]}" for i in range(len(parts))
+    ]
+
+    def upload(key: str, part: pd.DataFrame) -> int:
+        body = serialize_part(part, file_format)
+        s3.upload_fileobj(io.BytesIO(body), bucket, key)
+        return len(body)
+
+    manifest_key = f"{prefix}manifest"
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sizes = list(executor.map(upload, keys, parts))
+
+        manifest = json.dumps(get_manifest(bucket, keys, sizes))
+        s3.put_object(Bucket=bucket, Key=manifest_key, Body=manifest.encode())
+    except BaseException:
+        # deleting keys that were never uploaded is not an error
+        delete_staged(s3, bucket, [*keys, manifest_key])
+        raise
+
+    return [*keys, manifest_key]
+
+
+def copy_pandas_into(
+    cnxn: psycopg2.extensions.connection,
+    insert_table: str,
+    df: pd.DataFrame,
+    *,
+    session: boto3.Session,
+    bucket: str,
+    prefix: str = "alyeska/redpandas/",
+    iam_role: str = None,
+    file_format: str = "csv",
+    parts_per_slice: int = 1,
+    max_workers: int = 8,
+    endpoint_url: str = None,
+) -> None:
+    """Stage df in S3 and load it into insert_table with one COPY ... MANIFEST
+
+    The parts are staged under a unique prefix and always deleted afterwards,
+    whether or not COPY succeeds.
+
+    Args:
+        cnxn (psycopg2.extensions.connection): Redshift connection
+        insert_table (str): Target table in database
+        df (pd.DataFrame): Pandas dataframe that will be inserted
+        session (boto3.Session): session used to stage the parts, e.g. the
+            one given to locksmith.redshift.connect_with_session. COPY uses
+            its credentials unless iam_role is given.
+        bucket (str): S3 bucket to stage in
+        prefix (str, optional): S3 key prefix of the staging area. Defaults
+            to "alyeska/redpandas/".
+        iam_role (str, optional): ARN of a role attached to the cluster that
+            can read the bucket. Defaults to None.
+        file_format (str, optional): "csv" for gzipped CSV or "parquet".
+            Defaults to "csv".
+        parts_per_slice (int, optional): parts per cluster slice. Defaults
+            to 1.
+        max_workers (int, optional): concurrent uploads. Defaults to 8.
+        endpoint_url (str, optional): S3 endpoint, e.g. a local stand-in for
+            testing. Defaults to None.
+
+    Raises:
+        ValueError: If file_format is not "csv" or "parquet".
+
+    Returns:
+        None
+    """
+    if not isinstance(cnxn, psycopg2.extensions.connection):
+        raise TypeError("cnxn must be a psycopg2 connection")
+    if not isinstance(insert_table, str):
+        raise TypeError("insert_table must be a str")
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("df must be a pandas DataFrame")
+    if not isinstance(session, boto3.Session):
+        raise TypeError("session must be a boto3 Session")
+    if not isinstance(bucket, str):
+        raise TypeError("bucket must be a str")
+    if not isinstance(parts_per_slice, int):
+        raise TypeError("parts_per_slice must be an int")
+    if file_format not in FILE_FORMATS:
+        raise ValueError('file_format must be "csv" or "parquet"')
+    if parts_per_slice < 1:
+        raise ValueError("parts_per_slice must be positive")
+
+    if df.empty:
+        return None
+
+    credentials_clause = get_credentials_clause(session, iam_role)
+    nparts = get_slice_count(cnxn) * parts_per_slice
+    s3 = session.client("s3", endpoint_url=endpoint_url)
+    staging_prefix = f"{prefix}{uuid.uuid4().hex}/"
+
+    keys = stage_frame(
+        s3,
+        bucket,
+        staging_prefix,
+        df,
+        nparts,
+        file_format=file_format,
+        max_workers=max_workers,
+    )
+    try:
+        query = get_copy_query(
+            insert_table,
+            df.columns.tolist(),
+            f"s3://{bucket}/{keys[-1]}",
+            credentials_clause,
+            file_format,
+        )
+        with cnxn.cursor() as curs:
+            curs.execute(query)
+    finally:
+        delete_staged(s3, bucket, keys)
+
+    return None
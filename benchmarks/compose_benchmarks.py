@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""benchmark alyeska.compose on synthetic DAGs
+
+Times DAG construction, cycle checks, sources and sinks, scheduling,
+DAG.from_yaml and compose-sh on long chains, wide fan-out and fan-in, and
+random layered graphs. Each benchmark reports the best of a few repeats, in
+seconds.
+
+Usage:
+```sh
+$ python benchmarks/compose_benchmarks.py --sizes 100,1000,10000 -o baseline.json
+# ...change alyeska.compose...
+$ python benchmarks/compose_benchmarks.py --sizes 100,1000,10000 -o new.json \\
+    --baseline baseline.json --threshold 0.2
+REGRESSION layered/10000/get_schedules: 0.412s -> 0.561s (+36%)
+```
+
+Exits with 1 if any benchmark is more than threshold slower than its baseline.
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple, Union
+
+import alyeska
+from alyeska.compose import Task, DAG, Composer
+import alyeska.compose.compose_sh as compose_sh
+
+# None until init_flags() is called.
+FLAGS: Union[argparse.Namespace, None] = None
+
+# slowdowns smaller than this are timer noise, whatever the percentage
+NOISE_FLOOR = 0.001
+
+Graph = Tuple[List[Task], Dict[Task, set]]
+
+# ----------------------------------------------------------------------------
+# Synthetic DAGs
+# ----------------------------------------------------------------------------
+
+
+def make_tasks(n: int) -> List[Task]:
+    return [Task(f"t{i}/main.py", env="base") for i in range(n)]
+
+
+def chain(n: int) -> Graph:
+    """t0 -> t1 -> ... -> tn"""
+    tasks = make_tasks(n)
+    return tasks, {tasks[i]: {tasks[i - 1]} for i in range(1, n)}
+
+
+def fan_out(n: int) -> Graph:
+    """t0 -> every other task"""
+    tasks = make_tasks(n)
+    return tasks, {t: {tasks[0]} for t in tasks[1:]}
+
+
+def fan_in(n: int) -> Graph:
+    """every other task -> t0"""
+    tasks = make_tasks(n)
+    return tasks, {tasks[0]: set(tasks[1:])} if n > 1 else {}
+
+
+def layered(n: int, width: int = 100, degree: int = 3, seed: int = 0) -> Graph:
+    """Layers of `width` tasks, each using `degree` random tasks of the
+    layer before it"""
+    rng = random.Random(seed)
+    tasks = make_tasks(n)
+    dependencies = {}
+    for i in range(width, n):
+        layer_start = (i // width - 1) * width
+        previous = tasks[layer_start : layer_start + width]
+        dependencies[tasks[i]] = set(rng.sample(previous, min(degree, width)))
+
+    return tasks, dependencies
+
+
+GENERATORS: Dict[str, Callable[[int], Graph]] = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "fan_in": fan_in,
+    "layered": layered,
+}
+
+
+def write_compose_yaml(graph: Graph, p: pathlib.Path) -> None:
+    """Write a graph as compose.yaml"""
+    tasks, dependencies = graph
+    names = {t: f"t{i}" for i, t in enumerate(tasks)}
+    lines = ['version: "2019.8.21"', "conda-envs: [base]", "tasks:"]
+    for t in tasks:
+        uses = sorted(names[u] for u in dependencies.get(t, ()))
+        uses_entry = f", uses: [{', '.join(uses)}]" if uses else ""
+        task = f"{{loc: {names[t]}/main.py, env: base{uses_entry}}}"
+        lines.append(f"  {names[t]}: {task}")
+
+    p.write_text("\n".join(lines) + "\n")
+
+
+# ----------------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------------
+
+
+def best_of(fn: Callable, repeat: int) -> float:
+    """Fastest of `repeat` calls to fn, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def convert_yaml_to_sh(compose_yaml: pathlib.Path) -> str:
+    compose_sh.FLAGS = None
+    compose_sh.init_flags([str(compose_yaml), "--no-check"])
+    try:
+        return compose_sh.convert_yaml_to_sh(compose_yaml)
+    finally:
+        compose_sh.FLAGS = None
+
+
+def run_benchmarks(
+    shapes: List[str], sizes: List[int], repeat: int = 3
+) -> Dict[str, float]:
+    """Time every benchmark on every shape and size
+
+    Returns:
+        Dict[str, float]: seconds, keyed by shape/size/benchmark
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for shape in shapes:
+            for n in sizes:
+                tasks, dependencies = graph = GENERATORS[shape](n)
+                compose_yaml = pathlib.Path(tmp) / f"{shape}-{n}.yaml"
+                write_compose_yaml(graph, compose_yaml)
+                dag = DAG(tasks=set(tasks), upstream_dependencies=dependencies)
+
+                benchmarks = {
+                    "DAG": lambda: DAG(
+                        tasks=set(tasks), upstream_dependencies=dependencies
+                    ),
+                    # compile() is cached until the DAG changes, so copy it
+                    "is_cyclic": lambda: dag.copy().is_cyclic(),
+                    "get_sources": dag.get_sources,
+                    "get_sinks": dag.get_sinks,
+                    "get_schedules": lambda: Composer(dag).get_schedules(),
+                    "from_yaml": lambda: DAG.from_yaml(compose_yaml),
+                    "convert_yaml_to_sh": lambda: convert_yaml_to_sh(compose_yaml),
+                }
+                for name, fn in benchmarks.items():
+                    key = f"{shape}/{n}/{name}"
+                    results[key] = best_of(fn, repeat)
+                    print(f"{key}: {results[key]:.4f}s", flush=True)
+
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Find the benchmarks that got slower than the baseline allows
+
+    Args:
+        results (Dict[str, float]): new timings
+        baseline (Dict[str, float]): saved timings
+        threshold (float): allowed slowdown, e.g. 0.2 for 20%. Slowdowns of
+            less than NOISE_FLOOR seconds are always allowed.
+
+    Returns:
+        List[str]: a message for each regression
+    """
+    regressions = []
+    for key, seconds in sorted(results.items()):
+        if key not in baseline:
+            continue
+        before = baseline[key]
+        if seconds > before * (1 + threshold) and seconds - before > NOISE_FLOOR:
+            change = (seconds - before) / before if before else float("inf")
+            regressions.append(
+                f"REGRESSION {key}: {before:.3f}s -> {seconds:.3f}s ({change:+.0%})"
+            )
+
+    return regressions
+
+
+def init_flags(prefab_flags: List = None) -> None:
+    """ Initializes the flags for this tool.
+
+    Args:
+        prefab_flags (List, optional): A list of flags to parse. Useful for testing.
+
+    Returns:
+        None -- the now-parsed flags can be accessed through the FLAGS variable.
+    """
+    global FLAGS
+    if FLAGS:
+        raise ValueError("Cannot parse flags more than once.")
+
+    parser = argparse.ArgumentParser(description="Benchmark alyeska.compose")
+    parser.add_argument(
+        "--sizes",
+        action="store",
+        dest="sizes",
+        default=[100, 1000, 10000],
+        type=lambda s: [int(n) for n in s.split(",")],
+        help="Comma-separated numbers of tasks. Defaults to 100,1000,10000",
+    )
+    parser.add_argument(
+        "--shapes",
+        action="store",
+        dest="shapes",
+        default=list(GENERATORS),
+        type=lambda s: s.split(","),
+        help=f"Comma-separated DAG shapes. Defaults to {','.join(GENERATORS)}",
+    )
+    parser.add_argument(
+        "--repeat",
+        action="store",
+        dest="repeat",
+        default=3,
+        type=int,
+        help="Runs of each benchmark. The fastest counts. Defaults to 3",
+    )
+    parser.add_argument(
+        "-o", action="store", dest="ofile", default=None, type=pathlib.Path
+    )
+    parser.add_argument(
+        "--baseline",
+        action="store",
+        dest="baseline",
+        default=None,
+        type=pathlib.Path,
+        help="Results of an earlier run to compare against",
+    )
+    parser.add_argument(
+        "--threshold",
+        action="store",
+        dest="threshold",
+        default=0.2,
+        type=float,
+        help="Allowed slowdown against the baseline. Defaults to 0.2 (20%%)",
+    )
+
+    if prefab_flags is None:
+        FLAGS = parser.parse_args()
+    else:
+        FLAGS = parser.parse_args(prefab_flags)
+
+    unknown = set(FLAGS.shapes) - set(GENERATORS)
+    if unknown:
+        parser.error(f"unknown shapes: {', '.join(sorted(unknown))}")
+
+
+def main(args: List = None) -> int:
+    init_flags(args)
+    results = run_benchmarks(FLAGS.shapes, FLAGS.sizes, FLAGS.repeat)
+
+    if FLAGS.ofile is not None:
+        report = {
+            "alyeska": alyeska.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+            "results": results,
+        }
+        FLAGS.ofile.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    if FLAGS.baseline is None:
+        return 0
+
+    baseline = json.loads(FLAGS.baseline.read_text())["results"]
+    regressions = compare(results, baseline, FLAGS.threshold)
+    for regression in regressions:
+        print(regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,6 +37,9 @@ setup(
         "console_scripts": [
             "authmfa = alyeska.locksmith.authmfa:main",
             "compose-sh = alyeska.compose.compose_sh:main",
+            "compose-lint = alyeska.compose.compose_lint:main",
+            "compose-make = alyeska.compose.compose_make:main",
+            "compose-run = alyeska.compose.compose_run:main",
         ]
     },
     install_requires=requirements,
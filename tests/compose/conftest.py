@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Fixtures shared by the compose tests that run tasks."""
+import sys
+
+import pytest
+
+from alyeska.compose import Task
+
+
+@pytest.fixture()
+def make_task(tmp_path):
+    """Write tasks into tmp_path that append their name to tmp_path/log.txt"""
+
+    def make_task(name, exit_code=0, sleep=0, **kwargs):
+        """Write a script that logs its name and exits with exit_code"""
+        log = tmp_path / "log.txt"
+        script = tmp_path / f"{name}.py"
+        script.write_text(
+            f"import time\n"
+            f"time.sleep({sleep})\n"
+            f"with open({str(log)!r}, 'a') as f:\n"
+            f"    f.write({name!r} + '\\n')\n"
+            f"raise SystemExit({exit_code})\n"
+        )
+        kwargs.setdefault("env", sys.executable)
+        return Task(script, **kwargs)
+
+    return make_task
+
+
+@pytest.fixture()
+def read_log(tmp_path):
+    """Read the names logged to tmp_path/log.txt"""
+
+    def read_log(sort=True, clear=False):
+        """Return the logged names, sorted unless sort is False. If clear,
+        empty the log so the next call only sees what runs after this one."""
+        log = tmp_path / "log.txt"
+        if not log.exists():
+            return []
+        names = log.read_text().split()
+        if clear:
+            log.unlink()
+        return sorted(names) if sort else names
+
+    return read_log
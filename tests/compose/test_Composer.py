@@ -130,8 +130,71 @@ def test__Composer_get_schedules():
     assert testable == {1: {hash(A), hash(Z)}, 2: {hash(B)}, 3: {hash(C)}}
 
 
+def test__Composer_get_schedules_is_read_only():
+    A = Task("A.py", "test-exe")
+    B = Task("B.py", "test-exe")
+    C = Task("C.py", "test-exe")
+    dag = DAG()
+    dag.add_dependencies({B: A, C: {A, B}})
+    dq = Composer(dag)
+
+    first = dq.get_schedules()
+    assert dq.dag.tasks == {A, B, C}
+    assert dq.dag.get_downstream() == {A: {B, C}, B: {C}}
+    assert dq.get_schedules() == first == {1: [A], 2: [B], 3: [C]}
+
+
+def test__Composer_get_task_priorities():
+    A = Task("A.py", "test-exe")
+    B = Task("B.py", "test-exe", weight=5)
+    C = Task("C.py", "test-exe")
+    Z = Task("Z.py", "test-exe")
+    dag = DAG()
+    dag.add_tasks({A, B, C, Z})
+    dag.add_dependencies({B: A, C: {A, B}})
+    dq = Composer(dag)
+
+    assert dq.get_task_priorities() == {A: 7, B: 6, C: 1, Z: 1}
+    assert dq.get_task_priorities(weights={C: 10}) == {A: 16, B: 15, C: 10, Z: 1}
+
+
+def test__Composer_get_schedules_critical_path_first():
+    A = Task("A.py", "test-exe")
+    B = Task("B.py", "test-exe")
+    Y = Task("Y.py", "test-exe", weight=10)
+    Z = Task("Z.py", "test-exe")
+    dag = DAG()
+    dag.add_tasks({Y, Z})
+    dag.add_dependencies({B: A})
+    dq = Composer(dag)
+
+    assert dq.get_schedules() == {1: [Y, A, Z], 2: [B]}
+
+
 def test__Composer_from_yaml():
-    Composer.from_yaml(COMPOSE_SMALL)
+    dq = Composer.from_yaml(COMPOSE_SMALL)
+    assert dq.resources == {}
 
     with pytest.raises(CyclicGraphError):
         Composer.from_yaml(COMPOSE_CYCLE)
+
+
+def test__Composer_from_yaml_resources(tmp_path):
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                "resources: {redshift: 4, memory_gb: 64}",
+                "tasks:",
+                "  load: {loc: load.py, env: base, resources: {redshift: 1}}",
+                "  model: {loc: model.py, env: base, resources: {memory_gb: 32}}",
+            ]
+        )
+    )
+    dq = Composer.from_yaml(compose_yaml)
+
+    assert dq.resources == {"redshift": 4, "memory_gb": 64}
+    claims = {t.loc.stem: t.resources for t in dq.dag.tasks}
+    assert claims == {"load": {"redshift": 1}, "model": {"memory_gb": 32}}
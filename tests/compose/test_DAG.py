@@ -178,6 +178,62 @@ def test__DAG_add_dependency_detect_cycle2():
         dag.add_dependencies({A: C, B: A, C: B})
 
 
+def test__DAG_add_dependency_cycle_leaves_dag_unchanged():
+    A, B = get_two_tasks()
+    dag = DAG()
+    dag.add_dependency(B, A)
+    with pytest.raises(CyclicGraphError):
+        dag.add_dependency(A, B)
+    assert dag._edges[B] == set()
+    assert not dag.is_cyclic()
+
+    with pytest.raises(CyclicGraphError):
+        dag.add_dependency(A, A)
+
+
+def test__DAG_add_dependency_maintains_order():
+    tasks = [Task(f"{i}.py", env="test-env") for i in range(50)]
+    dag = DAG()
+    dag.add_tasks(set(tasks))
+
+    # add a chain against the insertion order so every edge forces a reorder
+    for upstream, downstream in zip(reversed(tasks[1:]), reversed(tasks[:-1])):
+        dag.add_dependency(downstream, upstream)
+
+    for u, downstream in dag._edges.items():
+        for v in downstream:
+            assert dag._order[u] < dag._order[v]
+
+    with pytest.raises(CyclicGraphError):
+        dag.add_dependency(tasks[-1], tasks[0])
+
+
+def test__DAG_add_dependencies_defer_cycle_check():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+
+    dag = DAG()
+    dag.add_dependencies({B: A, C: {A, B}}, defer_cycle_check=True)
+    assert dag._edges[A] == {B, C}
+    assert dag._edges[B] == {C}
+    assert dag.get_topological_order() == [A, B, C]
+
+    # a rejected batch keeps none of its edges
+    with pytest.raises(CyclicGraphError):
+        dag.add_dependencies({A: C, B: {A}}, defer_cycle_check=True)
+    assert dag._edges[C] == set()
+    assert dag._edges[A] == {B, C}
+    assert not dag.is_cyclic()
+
+
+def test__DAG_long_chain():
+    # deep enough to overflow a recursive depth-first search
+    tasks = [Task(f"{i}.py", env="test-env") for i in range(2000)]
+    dag = DAG(upstream_dependencies={b: a for a, b in zip(tasks[:-1], tasks[1:])})
+    assert not dag.is_cyclic()
+    assert dag.get_topological_order() == tasks
+
+
 # ----------------------------------------------------------------------------
 # methods
 # ----------------------------------------------------------------------------
@@ -215,6 +271,120 @@ def test__DAG_get_sinks():
     assert dag.get_sinks() == {B}
 
 
+def test__DAG_get_neighbors():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+    dag = DAG()
+    dag.add_dependencies({B: A, C: {A, B}})
+    assert dag.get_downstream(A) == {B, C}
+    assert dag.get_downstream(C) == set()
+    assert dag.get_upstream(C) == {A, B}
+    assert dag.get_upstream(A) == set()
+
+
+def test__DAG_indexes_after_remove_task():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+    dag = DAG()
+    dag.add_dependencies({B: A, C: B})
+    assert dag.get_sources() == {A}
+    assert dag.get_sinks() == {C}
+
+    dag.remove_task(B)
+    assert dag.get_sources() == {A, C}
+    assert dag.get_sinks() == {A, C}
+    assert dag.get_upstream() == {}
+    assert dag.get_downstream() == {}
+
+    with pytest.raises(TypeError):
+        dag.remove_task("A.py")
+
+
+def test__DAG_get_descendants():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+    Z = Task("Z.py", env="test-env")
+    dag = DAG(tasks={Z})
+    dag.add_dependencies({B: A, C: B})
+    assert dag.get_descendants(A) == {B, C}
+    assert dag.get_descendants({B, Z}) == {C}
+    assert dag.get_descendants(C) == set()
+
+
+def test__DAG_get_ancestors():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+    Z = Task("Z.py", env="test-env")
+    dag = DAG(tasks={Z})
+    dag.add_dependencies({B: A, C: B})
+    assert dag.get_ancestors(C) == {A, B}
+    assert dag.get_ancestors({B, Z}) == {A}
+    assert dag.get_ancestors(A) == set()
+
+
+def test__DAG_subgraph():
+    """A -> B -> C -> D, X -> C, Z"""
+    A, B = get_two_tasks()
+    C, D, X, Z = (Task(f"{name}.py", env="test-env") for name in "CDXZ")
+    dag = DAG(tasks={Z}, upstream_dependencies={B: A, C: {B, X}, D: C})
+
+    upstream = dag.subgraph({B})
+    assert upstream.tasks == {A, B}
+    assert upstream.get_upstream(B) == {A}
+    assert upstream.get_sinks() == {B}
+
+    downstream = dag.subgraph(B, direction="downstream")
+    assert downstream.tasks == {B, C, D}
+    assert downstream.get_upstream(C) == {B}  # X is not in the slice
+    assert downstream.get_sources() == {B}
+
+    # slicing walks the adjacency sets, without compiling the whole graph
+    dag.add_task(Task("Y.py", env="test-env"))
+    both = dag.subgraph(C, direction="both")
+    assert dag._csr is None
+    assert both.tasks == {A, B, C, D, X}
+    assert both.get_topological_order().index(A) < both.get_topological_order().index(D)
+
+    # the slice is independent of the original
+    both.add_dependency(A, depends_on=Z)
+    assert dag.get_upstream(A) == set()
+
+    with pytest.raises(ValueError):
+        dag.subgraph({B}, direction="sideways")
+    with pytest.raises(ValueError):
+        dag.subgraph({Task("not-in-dag.py")})
+    with pytest.raises(TypeError):
+        dag.subgraph({"B.py"})
+
+
+def test__DAG_transitive_reduction():
+    """A -> B -> C -> D, plus the redundant A -> C, A -> D and B -> D"""
+    A, B = get_two_tasks()
+    C, D, Z = (Task(f"{name}.py", env="test-env") for name in "CDZ")
+    dag = DAG(tasks={Z}, upstream_dependencies={B: A, C: {A, B}, D: {A, B, C}})
+
+    assert dag.get_redundant_dependencies() == {(A, C), (A, D), (B, D)}
+
+    reduced = dag.transitive_reduction()
+    assert reduced.tasks == dag.tasks
+    assert reduced.get_upstream() == {B: {A}, C: {B}, D: {C}}
+    assert reduced.get_redundant_dependencies() == set()
+    for t in dag.tasks:
+        assert reduced.get_descendants(t) == dag.get_descendants(t)
+    # the original keeps its dependencies
+    assert dag.get_upstream(D) == {A, B, C}
+
+
+def test__DAG_transitive_reduction_diamond():
+    """A -> {B, C} -> D has no redundant dependencies"""
+    A, B = get_two_tasks()
+    C, D = (Task(f"{name}.py", env="test-env") for name in "CD")
+    dag = DAG(upstream_dependencies={B: A, C: A, D: {B, C}})
+
+    assert dag.get_redundant_dependencies() == set()
+    assert dag.transitive_reduction().get_upstream() == dag.get_upstream()
+
+
 def test__DAG_is_cyclic():
     A, B = get_two_tasks()
     dag = DAG()
@@ -226,6 +396,24 @@ def test__DAG_is_cyclic():
         dag.add_dependency(A, depends_on=B)
 
 
+def test__DAG_copy():
+    A, B = get_two_tasks()
+    C = Task("C.py", env="test-env")
+    dag = DAG()
+    dag.add_dependencies({B: A, C: B})
+
+    dag_copy = dag.copy()
+    dag_copy.remove_task(B)
+
+    assert dag.tasks == {A, B, C}
+    assert dag.get_downstream() == {A: {B}, B: {C}}
+    assert dag.get_sources() == {A}
+    assert dag_copy.tasks == {A, C}
+    assert dag_copy.get_sources() == {A, C}
+    # tasks are shared, not copied
+    assert {id(t) for t in dag_copy.tasks} <= {id(t) for t in dag.tasks}
+
+
 def test__DAG_from_yaml():
     DAG.from_yaml(COMPOSE_SMALL)
 
@@ -15,8 +15,10 @@
 ## limitations under the License.
 ## ---------------------------------------------------------------------------
 """Unit tests for the Task class."""
+import copy
 import os
 import pathlib
+import pickle
 
 import pytest
 
@@ -79,3 +81,75 @@ def test__Task_eq():
     A.loc = "new-test.py"
 
     assert A != B
+
+
+def test__Task_weight():
+    A = Task("test.py", "test-env")
+    B = Task("test.py", "test-env", weight=2.5)
+
+    assert A.weight == 1
+    assert B.weight == 2.5
+    # weight is not part of the identity
+    assert A == B
+
+    with pytest.raises(TypeError):
+        Task("test.py", weight="heavy")
+
+    with pytest.raises(ValueError):
+        Task("test.py", weight=-1)
+
+
+def test__Task_inputs():
+    assert Task("test.py").inputs == ()
+    assert Task("test.py", inputs="data/*.csv").inputs == ("data/*.csv",)
+    A = Task("test.py", inputs=["a.csv", pathlib.Path("b.csv")])
+    assert A.inputs == ("a.csv", "b.csv")
+    # inputs are not part of the identity
+    assert A == Task("test.py")
+
+    with pytest.raises(TypeError):
+        Task("test.py", inputs=1)
+
+
+def test__Task_resources():
+    assert Task("test.py").resources == {}
+    A = Task("test.py", resources={"redshift": 1, "memory_gb": 16.5})
+    assert A.resources == {"redshift": 1, "memory_gb": 16.5}
+    assert A == Task("test.py")
+
+    with pytest.raises(TypeError):
+        Task("test.py", resources=["redshift"])
+    with pytest.raises(TypeError):
+        Task("test.py", resources={"redshift": "one"})
+    with pytest.raises(ValueError):
+        Task("test.py", resources={"redshift": -1})
+
+
+def test__Task_identity_cache():
+    A = Task("test.py", "test-env")
+    B = Task("test.py", "test-env")
+
+    assert not hasattr(A, "__dict__")
+    # one copy of each str, however many Tasks refer to it
+    assert A._key[0] is B._key[0]
+    assert A.env is B.env
+
+    A.env = "other-env"
+    assert A != B
+    A.env = "test-env"
+    assert A == B
+    assert hash(A) == hash(B)
+
+
+def test__Task_pickle():
+    A = Task(
+        "test.py", "test-env", weight=3, inputs=["a.csv"], resources={"redshift": 1}
+    )
+    for B in (pickle.loads(pickle.dumps(A)), copy.deepcopy(A)):
+        assert A == B
+        assert hash(A) == hash(B)
+        assert A.loc == B.loc
+        assert A.env == B.env
+        assert A.weight == B.weight
+        assert A.inputs == B.inputs
+        assert A.resources == B.resources
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Unit tests for the compiled compose.yaml cache."""
+import pytest
+
+from alyeska.compose import DAG, Composer
+import alyeska.compose.cache as cache
+from alyeska.compose.exceptions import CyclicGraphError
+
+from test_compose_globals import COMPOSE_SMALL, COMPOSE_CYCLE
+
+
+@pytest.fixture()
+def compose_yaml(tmp_path):
+    p = tmp_path / "compose.yaml"
+    p.write_text(COMPOSE_SMALL.read_text())
+    return p
+
+
+def test__load_composer(compose_yaml, tmp_path):
+    cache_dir = tmp_path / "cache"
+    expected = Composer.from_yaml(compose_yaml)
+
+    first = Composer.from_yaml(compose_yaml, cache_dir=cache_dir)
+    assert first.get_schedules() == expected.get_schedules()
+    (entry,) = cache_dir.iterdir()
+
+    second = Composer.from_yaml(compose_yaml, cache_dir=cache_dir)
+    assert second is not first  # unpickled from the entry
+    assert second.get_schedules() == expected.get_schedules()
+    assert second.dag.get_sources() == expected.dag.get_sources()
+    for task in expected.dag.tasks:
+        assert second.dag.get_upstream(task) == expected.dag.get_upstream(task)
+
+    dag = DAG.from_yaml(compose_yaml, cache_dir=cache_dir)
+    assert dag.tasks == expected.dag.tasks
+    assert list(cache_dir.iterdir()) == [entry]
+
+
+def test__load_composer_invalidates(compose_yaml, tmp_path):
+    cache_dir = tmp_path / "cache"
+    Composer.from_yaml(compose_yaml, cache_dir=cache_dir)
+
+    compose_yaml.write_text(
+        compose_yaml.read_text().replace("uses: [numbers, calendar]", "uses: numbers")
+    )
+    composer = Composer.from_yaml(compose_yaml, cache_dir=cache_dir)
+    tasks = {t.loc.parent.name: t for t in composer.dag.tasks}
+    assert composer.dag.get_upstream(tasks["time_period"]) == {tasks["numbers"]}
+
+
+def test__load_composer_corrupt_entry(compose_yaml, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache.get_cache_path(compose_yaml, cache_dir).parent.mkdir()
+    cache.get_cache_path(compose_yaml, cache_dir).write_bytes(b"not a pickle")
+
+    composer = Composer.from_yaml(compose_yaml, cache_dir=cache_dir)
+    assert len(composer.get_schedules()) == 2
+
+
+def test__load_composer_cyclic(tmp_path):
+    cache_dir = tmp_path / "cache"
+    with pytest.raises(CyclicGraphError):
+        Composer.from_yaml(COMPOSE_CYCLE, cache_dir=cache_dir)
+    assert not cache_dir.exists()
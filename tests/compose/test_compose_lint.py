@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Integration test for the compose-lint script
+"""
+import pytest
+
+import alyeska.compose.compose_lint as compose_lint
+from alyeska.compose.config import load_config
+
+from test_compose_globals import COMPOSE_SMALL
+
+
+@pytest.fixture()
+def reset_flags():
+    yield
+    compose_lint.FLAGS = None
+
+
+@pytest.fixture()
+def redundant_yaml(tmp_path):
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                "tasks:",
+                "  a: {loc: a.py, env: base}",
+                "  b: {loc: b.py, env: base, uses: a}",
+                "  c: {loc: c.py, env: base, uses: [a, b]}",
+                "  d: {loc: d.py, env: base, uses: [a, c]}",
+            ]
+        )
+    )
+    return compose_yaml
+
+
+def test__get_redundant_uses(redundant_yaml):
+    compiled = load_config(redundant_yaml)
+    assert compose_lint.get_redundant_uses(compiled) == [("c", "a"), ("d", "a")]
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main(redundant_yaml, capsys):
+    assert compose_lint.main([str(redundant_yaml)]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out == [
+        f"{redundant_yaml}: c uses a, which it already depends on indirectly",
+        f"{redundant_yaml}: d uses a, which it already depends on indirectly",
+    ]
+
+    compose_lint.FLAGS = None
+    assert compose_lint.main([str(COMPOSE_SMALL)]) == 0
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main_invalid(tmp_path, capsys):
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                "tasks:",
+                "  a: {loc: a.py, env: base, uses: [b, missing]}",
+                "  b: {loc: b.py, env: base, uses: a}",
+            ]
+        )
+    )
+    assert compose_lint.main([str(compose_yaml)]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out == [
+        f"{compose_yaml}: tasks.a.uses: unknown task 'missing'",
+        f"{compose_yaml}: cycle: a -> b -> a",
+    ]
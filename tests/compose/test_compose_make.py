@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Integration test for the compose-make script"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from alyeska.compose import Task
+import alyeska.compose.compose_make as compose_make
+
+from test_compose_globals import COMPOSE_SMALL
+
+
+@pytest.fixture()
+def reset_flags():
+    yield
+    compose_make.FLAGS = None
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main(tmp_path):
+    makefile = tmp_path / "Makefile"
+    compose_make.main([str(COMPOSE_SMALL), "-o", str(makefile), "--no-check"])
+
+    rules = makefile.read_text()
+    assert "SHELL := /bin/bash" in rules
+    assert "$(STAMP_DIR)/time_period: " in rules
+    (prerequisites,) = [
+        line for line in rules.splitlines() if line.startswith("$(STAMP_DIR)/time_")
+    ]
+    assert prerequisites.endswith(" $(STAMP_DIR)/calendar $(STAMP_DIR)/numbers")
+
+
+def test__get_stamps():
+    A = Task("A.py")
+    assert compose_make.get_stamps({"a.b-c_d": A}) == {A: "$(STAMP_DIR)/a.b-c_d"}
+    with pytest.raises(ValueError):
+        compose_make.get_stamps({"a:b": A})
+
+
+def test__escape():
+    assert compose_make.escape_prerequisite("/a b/$c") == "/a\\ b/$$c"
+    assert compose_make.escape_recipe("a b$") == "'a b$$'"
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="needs make")
+@pytest.mark.usefixtures("reset_flags")
+def test__main_make(tmp_path):
+    """a, b -> c, where a reads data.csv"""
+    log = tmp_path / "log.txt"
+    for name in "abc":
+        body = f"open({str(log)!r}, 'a').write('{name}\\n')\n"
+        (tmp_path / f"{name}.py").write_text(body)
+    (tmp_path / "data.csv").touch()
+    (tmp_path / "activate").touch()  # stands in for conda's activate
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                f"tasks-dir: {tmp_path}",
+                "tasks:",
+                "  a: {loc: a.py, env: base, inputs: ['*.csv']}",
+                "  b: {loc: b.py, env: base}",
+                "  c: {loc: c.py, env: base, uses: [a, b]}",
+            ]
+        )
+    )
+    compose_make.main([str(compose_yaml), "-o", str(tmp_path / "Makefile")])
+
+    env = dict(os.environ, PATH=os.pathsep.join([str(tmp_path), os.environ["PATH"]]))
+
+    def make():
+        subprocess.run(["make", "-j2", "-s"], cwd=str(tmp_path), env=env, check=True)
+        runs = log.read_text().split() if log.exists() else []
+        log.write_text("")
+        return runs
+
+    assert make()[-1] == "c"
+    assert make() == []
+    # a newer input re-runs a and everything downstream of it
+    os.utime(tmp_path / "data.csv", (0, 2 ** 32))
+    assert make() == ["a", "c"]
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="needs make")
+@pytest.mark.usefixtures("reset_flags")
+def test__main_make_recursive_inputs(tmp_path):
+    """a reads data/**/*.csv, which make's $(wildcard) can't expand"""
+    log = tmp_path / "log.txt"
+    (tmp_path / "a.py").write_text(f"open({str(log)!r}, 'a').write('a\\n')\n")
+    inputs = [
+        tmp_path / "data" / "top.csv",
+        tmp_path / "data" / "x" / "mid.csv",
+        tmp_path / "data" / "x" / "y" / "deep.csv",
+    ]
+    for p in inputs:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.touch()
+    (tmp_path / "activate").touch()  # stands in for conda's activate
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                f"tasks-dir: {tmp_path}",
+                "tasks:",
+                "  a: {loc: a.py, env: base, inputs: ['data/**/*.csv']}",
+            ]
+        )
+    )
+    compose_make.main([str(compose_yaml), "-o", str(tmp_path / "Makefile")])
+
+    (prerequisites,) = [
+        line
+        for line in (tmp_path / "Makefile").read_text().splitlines()
+        if line.startswith("$(STAMP_DIR)/a:")
+    ]
+    assert all(p.as_posix() in prerequisites for p in inputs)
+
+    env = dict(os.environ, PATH=os.pathsep.join([str(tmp_path), os.environ["PATH"]]))
+
+    def make():
+        subprocess.run(["make", "-s"], cwd=str(tmp_path), env=env, check=True)
+        runs = log.read_text().split() if log.exists() else []
+        log.write_text("")
+        return runs
+
+    assert make() == ["a"]
+    assert make() == []
+    # every level of the tree counts, as it does for compose-run's fingerprints
+    for p in inputs:
+        os.utime(p, (0, p.stat().st_mtime + 10))
+        assert make() == ["a"]
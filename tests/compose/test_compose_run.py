@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Integration test for the compose-run script
+"""
+import sys
+
+import pytest
+
+import alyeska.compose.compose_run as compose_run
+
+
+@pytest.fixture()
+def reset_flags():
+    yield
+    compose_run.FLAGS = None
+
+
+def write_compose_yaml(tmp_path):
+    """numbers -> time_period -> report, calendar -> time_period
+
+    time_period fails until tmp_path/fixed exists
+    """
+    log = tmp_path / "log.txt"
+    for name in ("numbers", "calendar", "time_period", "report", "other"):
+        body = f"open({str(log)!r}, 'a').write({name!r} + '\\n')\n"
+        if name == "time_period":
+            fixed = tmp_path / "fixed"
+            body = f"import os\nassert os.path.exists({str(fixed)!r})\n" + body
+        (tmp_path / f"{name}.py").write_text(body)
+
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                f"tasks-dir: {tmp_path}",
+                "tasks:",
+                "  numbers: {loc: numbers.py, env: %s}" % sys.executable,
+                "  calendar: {loc: calendar.py, env: %s}" % sys.executable,
+                "  time_period:",
+                "    loc: time_period.py",
+                f"    env: {sys.executable}",
+                "    uses: [numbers, calendar]",
+                "  report: {loc: report.py, env: %s, uses: time_period}"
+                % sys.executable,
+                "  other: {loc: other.py, env: %s}" % sys.executable,
+            ]
+        )
+    )
+    return compose_yaml
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main_resume(tmp_path, capsys, read_log):
+    compose_yaml = write_compose_yaml(tmp_path)
+    history = tmp_path / "history.db"
+
+    exit_code = compose_run.main([str(compose_yaml), "--history", str(history)])
+    assert exit_code == 1
+    assert read_log(clear=True) == ["calendar", "numbers", "other"]
+    run_id = capsys.readouterr().out.split()[1]
+
+    (tmp_path / "fixed").touch()
+    compose_run.FLAGS = None
+    exit_code = compose_run.main(
+        [str(compose_yaml), "--history", str(history), "--resume", run_id]
+    )
+    assert exit_code == 0
+    assert read_log(clear=True) == ["report", "time_period"]
+
+    # everything succeeded, so resuming again runs nothing
+    compose_run.FLAGS = None
+    exit_code = compose_run.main(
+        [str(compose_yaml), "--history", str(history), "--resume", run_id]
+    )
+    assert exit_code == 0
+    assert read_log() == []
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main_resume_unknown_run(tmp_path):
+    compose_yaml = write_compose_yaml(tmp_path)
+    history = tmp_path / "history.db"
+
+    with pytest.raises(ValueError):
+        compose_run.main(
+            [str(compose_yaml), "--history", str(history), "--resume", "bad-id"]
+        )
+
+
+@pytest.mark.usefixtures("reset_flags")
+def test__main_target(tmp_path, read_log):
+    compose_yaml = write_compose_yaml(tmp_path)
+    history = tmp_path / "history.db"
+
+    exit_code = compose_run.main(
+        [str(compose_yaml), "--history", str(history), "--target", "numbers,other"]
+    )
+    assert exit_code == 0
+    assert read_log() == ["numbers", "other"]
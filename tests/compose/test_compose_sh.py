@@ -16,10 +16,14 @@
 ## ---------------------------------------------------------------------------
 """Integration test for the compose-sh script
 """
+import os
 import pathlib
+import shutil
+import subprocess
 
 import pytest
 
+from alyeska.compose import Task
 import alyeska.compose.compose_sh as compose_sh
 
 from test_compose_globals import COMPOSE_SMALL
@@ -34,6 +38,7 @@ def cleanup_output():
     yield
     if OUTFILE_PATH.exists():
         OUTFILE_PATH.unlink()
+    compose_sh.FLAGS = None
 
 
 @pytest.mark.usefixtures("cleanup_output")
@@ -41,3 +46,154 @@ def test__main():
     # Setting --no-check since we don't want to check for task file presence. They definitely don't exist.
     compose_sh.main([str(COMPOSE_SMALL), "-o", str(OUTFILE_PATH), "--no-check"])
     assert OUTFILE_PATH.exists()
+
+    # every task shares one env
+    script = OUTFILE_PATH.read_text()
+    assert script.count("source activate ci-python36-2.1") == 1
+    assert script.count("conda deactivate") == 1
+
+
+@pytest.mark.usefixtures("cleanup_output")
+@pytest.mark.parametrize(
+    "flags,expected",
+    [
+        (["--target", "numbers"], {"numbers"}),
+        (["--target", "numbers,calendar"], {"numbers", "calendar"}),
+        (["--target", "time_period"], {"numbers", "calendar", "time_period"}),
+        (
+            ["--target", "numbers", "--direction", "downstream"],
+            {"numbers", "time_period"},
+        ),
+    ],
+)
+def test__main_target(flags, expected):
+    compose_sh.main([str(COMPOSE_SMALL), "-o", str(OUTFILE_PATH), "--no-check", *flags])
+
+    # every task in compose-small.yaml lives in a directory named after it
+    script = OUTFILE_PATH.read_text().splitlines()
+    tasks = {pathlib.Path(ln.split()[1]).name for ln in script if "pushd" in ln}
+    assert tasks == expected
+
+
+def test__group_by_env():
+    a1, a2, a3 = (Task(f"a{i}.py", "env-a") for i in range(3))
+    b1, b2 = (Task(f"b{i}.py", "env-b") for i in range(2))
+    c1 = Task("c1.py", "env-c")
+
+    schedules = {1: [a1, b1, a2], 2: [c1, b2, a3]}
+    assert compose_sh.group_by_env(schedules) == [a1, a2, b1, b2, c1, a3]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+@pytest.mark.usefixtures("cleanup_output")
+def test__main_parallel(tmp_path):
+    """a, b -> c -> d where c fails"""
+    log = tmp_path / "log.txt"
+    for name in "abcd":
+        (tmp_path / f"{name}.py").write_text(
+            "import time\n"
+            f"open({str(log)!r}, 'a').write('{name}-start\\n')\n"
+            "time.sleep(0.5)\n"
+            f"open({str(log)!r}, 'a').write('{name}-end\\n')\n"
+            f"raise SystemExit({int(name == 'c')})\n"
+        )
+    (tmp_path / "activate").touch()  # stands in for conda's activate
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                f"tasks-dir: {tmp_path}",
+                "tasks:",
+                "  a: {loc: a.py, env: base}",
+                "  b: {loc: b.py, env: base}",
+                "  c: {loc: c.py, env: base, uses: [a, b]}",
+                "  d: {loc: d.py, env: base, uses: c}",
+            ]
+        )
+    )
+
+    compose_sh.main([str(compose_yaml), "-o", str(OUTFILE_PATH), "--parallel", "2"])
+    env = dict(os.environ, PATH=os.pathsep.join([str(tmp_path), os.environ["PATH"]]))
+    proc = subprocess.run(["bash", str(OUTFILE_PATH)], env=env, stderr=subprocess.PIPE)
+
+    assert proc.returncode == 1
+    assert b"skipping d" in proc.stderr
+    events = log.read_text().split()
+    # a and b ran at the same time, c only after both of them
+    assert set(events[:2]) == {"a-start", "b-start"}
+    assert set(events[2:4]) == {"a-end", "b-end"}
+    assert events[4:] == ["c-start", "c-end"]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+@pytest.mark.usefixtures("cleanup_output")
+def test__main_parallel_independent_branches(tmp_path):
+    """a -> b, c -> d where a is slow"""
+    log = tmp_path / "log.txt"
+    for name, sleep in zip("abcd", [3, 0, 0.1, 0]):
+        (tmp_path / f"{name}.py").write_text(
+            "import time\n"
+            f"open({str(log)!r}, 'a').write('{name}-start\\n')\n"
+            f"time.sleep({sleep})\n"
+            f"open({str(log)!r}, 'a').write('{name}-end\\n')\n"
+        )
+    (tmp_path / "activate").touch()  # stands in for conda's activate
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            [
+                'version: "2019.8.21"',
+                "conda-envs: [base]",
+                f"tasks-dir: {tmp_path}",
+                "tasks:",
+                "  a: {loc: a.py, env: base}",
+                "  b: {loc: b.py, env: base, uses: a}",
+                "  c: {loc: c.py, env: base}",
+                "  d: {loc: d.py, env: base, uses: c}",
+            ]
+        )
+    )
+
+    compose_sh.main([str(compose_yaml), "-o", str(OUTFILE_PATH), "--parallel", "4"])
+    env = dict(os.environ, PATH=os.pathsep.join([str(tmp_path), os.environ["PATH"]]))
+    proc = subprocess.run(["bash", str(OUTFILE_PATH)], env=env)
+
+    assert proc.returncode == 0
+    events = log.read_text().split()
+    # d only waits for c, not for the unrelated a
+    assert events.index("c-end") < events.index("d-start") < events.index("a-end")
+    assert events.index("a-end") < events.index("b-start")
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+@pytest.mark.usefixtures("cleanup_output")
+def test__main_parallel_max_jobs(tmp_path):
+    log = tmp_path / "log.txt"
+    for name in "abcd":
+        (tmp_path / f"{name}.py").write_text(
+            "import time\n"
+            f"open({str(log)!r}, 'a').write('start\\n')\n"
+            "time.sleep(0.3)\n"
+            f"open({str(log)!r}, 'a').write('end\\n')\n"
+        )
+    (tmp_path / "activate").touch()  # stands in for conda's activate
+    compose_yaml = tmp_path / "compose.yaml"
+    compose_yaml.write_text(
+        "\n".join(
+            ['version: "2019.8.21"', "conda-envs: [base]", f"tasks-dir: {tmp_path}"]
+            + ["tasks:"]
+            + [f"  {name}: {{loc: {name}.py, env: base}}" for name in "abcd"]
+        )
+    )
+
+    compose_sh.main([str(compose_yaml), "-o", str(OUTFILE_PATH), "--parallel", "2"])
+    env = dict(os.environ, PATH=os.pathsep.join([str(tmp_path), os.environ["PATH"]]))
+    proc = subprocess.run(["bash", str(OUTFILE_PATH)], env=env)
+
+    assert proc.returncode == 0
+    running = [0]
+    for event in log.read_text().split():
+        running.append(running[-1] + (1 if event == "start" else -1))
+    assert max(running) == 2
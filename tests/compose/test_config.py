@@ -19,7 +19,9 @@
 
 import pytest
 
+from alyeska.compose import DAG
 from alyeska.compose.config import (
+    load_config,
     validate_config,
     parse_upstream_dependencies,
     parse_config,
@@ -79,6 +81,28 @@ def test__parse_tasks(compose_yaml):
     assert len(task_map) > 0
 
 
+def test__parse_tasks_options():
+    config = {
+        "tasks": {
+            "light": {"loc": "light.py", "env": "base"},
+            "heavy": {
+                "loc": "heavy.py",
+                "env": "base",
+                "weight": 30,
+                "inputs": ["data/*.csv"],
+                "resources": {"memory_gb": 32},
+            },
+        }
+    }
+    task_map = parse_tasks(config)
+    assert task_map["light"].weight == 1
+    assert task_map["heavy"].weight == 30
+    assert task_map["light"].inputs == ()
+    assert task_map["heavy"].inputs == ("data/*.csv",)
+    assert task_map["light"].resources == {}
+    assert task_map["heavy"].resources == {"memory_gb": 32}
+
+
 def test__parse_upstream_dependencies():
     config = parse_config(COMPOSE_SMALL)
     actual = parse_upstream_dependencies(config)
@@ -91,3 +115,29 @@ def test__parse_upstream_dependencies():
     expected = {time_period: {calendar, numbers}}
 
     assert actual == expected
+
+
+def test__load_config():
+    compiled = load_config(COMPOSE_SMALL)
+    assert compiled.config == parse_config(COMPOSE_SMALL)
+    assert compiled.task_map == parse_tasks(compiled.config)
+    assert compiled.inv_task_map == {v: k for k, v in compiled.task_map.items()}
+    assert compiled.dependency_map == parse_upstream_dependencies(compiled.config)
+    assert compiled.resources == {}
+
+    # every map shares one set of Task objects
+    numbers = compiled.task_map["numbers"]
+    time_period = compiled.task_map["time_period"]
+    assert any(t is numbers for t in compiled.dependency_map[time_period])
+
+    dag = DAG.from_config(compiled)
+    assert dag.tasks == DAG.from_yaml(COMPOSE_SMALL).tasks
+    assert dag.get_upstream(time_period) == {numbers, compiled.task_map["calendar"]}
+
+
+def test__CompiledConfig_get_tasks():
+    compiled = load_config(COMPOSE_SMALL)
+    numbers = compiled.task_map["numbers"]
+    assert compiled.get_tasks(iter(["numbers"])) == {numbers}
+    with pytest.raises(ValueError):
+        compiled.get_tasks(["numbers", "not-a-task"])
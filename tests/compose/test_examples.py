@@ -40,10 +40,10 @@ def test__readme_example():
     ## run tasks
     dq = Composer(make_tea)
     dq.get_schedules()
-    # defaultdict(<class 'set'>, {
-    #     1: {Task(prep_infuser.py), Task(pour_water.py)},
-    #     2: {Task(boil_water.py)},
-    #     3: {Task(steep_tea.py)}})
+    # defaultdict(<class 'list'>, {
+    #     1: [Task(pour_water.py), Task(prep_infuser.py)],
+    #     2: [Task(boil_water.py)],
+    #     3: [Task(steep_tea.py)]})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Unit tests for the compose executor."""
+import itertools
+import sys
+
+import pytest
+
+from alyeska.compose import Task, DAG, Composer
+from alyeska.compose.exceptions import EarlyAbortError
+import alyeska.compose.executor as executor
+from alyeska.compose.executor import get_command, run_dag, run_task
+
+
+# ----------------------------------------------------------------------------
+# Tests
+# ----------------------------------------------------------------------------
+
+
+def test__get_command():
+    task = Task("A.py", env=sys.executable)
+    assert get_command(task) == [sys.executable, str(task.loc)]
+
+    task = Task("A.py", env="not-an-executable-env")
+    assert get_command(task)[:4] == ["conda", "run", "-n", "not-an-executable-env"]
+
+
+def test__run_task(make_task):
+    result = run_task(make_task("A", exit_code=3))
+    assert result.returncode == 3
+    assert result.cpu_time > 0
+
+
+def test__run_task_max_rss(make_task):
+    # the task must not inherit this process's RSS high-water mark
+    ballast = b"x" * 256 * 2 ** 20
+    result = run_task(make_task("A"))
+    assert 0 < result.max_rss < 128 * 2 ** 20
+    del ballast
+
+
+def test__run_dag_respects_dependencies(make_task, read_log):
+    A, B, C, D = (make_task(name) for name in "ABCD")
+    dag = DAG(upstream_dependencies={B: A, C: {A, B}, D: A})
+
+    results = run_dag(dag, max_workers=4)
+
+    assert set(results) == {A, B, C, D}
+    assert all(r.succeeded for r in results.values())
+    log = read_log(sort=False)
+    assert log.index("A") < log.index("B") < log.index("C")
+    assert log.index("A") < log.index("D")
+    for task, result in results.items():
+        for upstream in dag.get_upstream(task):
+            assert results[upstream].end <= result.start
+
+
+def test__run_dag_priorities(make_task, read_log):
+    A, B, C = (make_task(name) for name in "ABC")
+    dag = DAG(tasks={A, B, C})
+
+    run_dag(dag, max_workers=1, priorities={A: 1, B: 3, C: 2})
+
+    assert read_log(sort=False) == ["B", "C", "A"]
+
+
+def test__run_dag_resources(make_task):
+    redshift = {"redshift": 2}
+    A, B, C = (make_task(name, sleep=0.2, resources=redshift) for name in "ABC")
+    Z = make_task("Z", resources={"memory_gb": 8})
+    dag = DAG(tasks={A, B, C, Z})
+
+    results = run_dag(dag, max_workers=4, resources={"redshift": 3})
+
+    # only one redshift task fits in the pool at a time
+    intervals = sorted((results[t].start, results[t].end) for t in (A, B, C))
+    for (_, end), (start, _) in zip(intervals, intervals[1:]):
+        assert end <= start
+    assert set(results) == {A, B, C, Z}
+
+    with pytest.raises(ValueError):
+        run_dag(dag, resources={"redshift": 1})
+
+
+@pytest.mark.parametrize("sleeps", list(itertools.permutations([0, 0.1, 0.2])))
+def test__run_dag_fractional_resources(make_task, sleeps):
+    claims = (0.1, 0.4, 0.2)
+    upstream = {
+        make_task(name, sleep=sleep, resources={"pool": claim})
+        for name, sleep, claim in zip("ABC", sleeps, claims)
+    }
+    # 1.3 - 0.1 - 0.4 - 0.2 + 0.1 + 0.4 + 0.2 isn't 1.3 in floats
+    W = make_task("W", resources={"pool": 1.3})
+    dag = DAG(upstream_dependencies={W: upstream})
+
+    results = run_dag(dag, max_workers=3, resources={"pool": 1.3})
+
+    assert set(results) == upstream | {W}
+
+
+def test__run_dag_stalled(make_task, monkeypatch):
+    # if the pool accounting ever leaves a ready task unable to start with
+    # nothing running, run_dag must not quietly return without it
+    A = make_task("A", resources={"pool": 1})
+    monkeypatch.setattr(executor, "get_free_resources", lambda *_: {"pool": 0})
+
+    with pytest.raises(RuntimeError):
+        run_dag(DAG(tasks={A}), resources={"pool": 1})
+
+
+def test__run_dag_soft_error_handling(make_task, read_log):
+    A = make_task("A", exit_code=1)
+    B = make_task("B")
+    Z = make_task("Z")
+    dag = DAG(tasks={Z}, upstream_dependencies={B: A})
+
+    results = run_dag(dag, max_workers=1, error_handling="soft")
+
+    assert results[A].returncode == 1
+    assert results[Z].succeeded
+    assert B not in results
+    assert read_log() == ["A", "Z"]
+
+
+def test__run_dag_unstartable_tasks(tmp_path, make_task, read_log):
+    # an env whose interpreter is missing, and a task whose directory is
+    broken_env = tmp_path / "python"
+    broken_env.write_text("#!/no/such/interpreter\n")
+    broken_env.chmod(0o755)
+    A = make_task("A", env=str(broken_env))
+    B = make_task("B")
+    C = Task(tmp_path / "missing" / "C.py", env=sys.executable)
+    Z = make_task("Z")
+    dag = DAG(tasks={C, Z}, upstream_dependencies={B: A})
+
+    results = run_dag(dag, max_workers=1, error_handling="soft")
+
+    assert results[A].returncode == results[C].returncode == 127
+    assert results[Z].succeeded
+    assert B not in results
+    assert read_log(sort=False) == ["Z"]
+
+
+def test__run_dag_hard_error_handling(make_task, read_log):
+    A = make_task("A", exit_code=1)
+    B = make_task("B")
+    dag = DAG(upstream_dependencies={B: A})
+
+    with pytest.raises(EarlyAbortError):
+        run_dag(dag, max_workers=1, error_handling="hard")
+    assert read_log(sort=False) == ["A"]
+
+
+def test__run_dag_exceptions():
+    dag = DAG()
+    with pytest.raises(ValueError):
+        run_dag(dag, error_handling="medium")
+    with pytest.raises(TypeError):
+        run_dag(dag, max_workers="2")
+    with pytest.raises(ValueError):
+        run_dag(dag, max_workers=0)
+
+
+def test__Composer_run_tasks(make_task, read_log):
+    A, B = (make_task(name) for name in "AB")
+    dq = Composer(DAG(upstream_dependencies={B: A}))
+
+    results = dq.run_tasks(max_workers=2)
+
+    assert set(results) == {A, B}
+    assert read_log(sort=False) == ["A", "B"]
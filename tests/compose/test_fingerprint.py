@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Unit tests for Task fingerprints and incremental runs."""
+import pytest
+
+from alyeska.compose import Task, DAG, Composer
+from alyeska.compose.fingerprint import find_inputs, get_fingerprints, hash_file
+from alyeska.compose.history import RunHistory
+
+
+def test__hash_file(tmp_path):
+    p = tmp_path / "a.txt"
+    p.write_text("a")
+    assert hash_file(p) == hash_file(p)
+    before = hash_file(p)
+    p.write_text("b")
+    assert hash_file(p) != before
+    assert hash_file(tmp_path / "missing.txt") != hash_file(p)
+
+
+def test__find_inputs(tmp_path):
+    (tmp_path / "data").mkdir()
+    for name in ("a.csv", "b.csv", "c.txt"):
+        (tmp_path / "data" / name).write_text(name)
+    task = Task(tmp_path / "task.py", inputs=["data/*.csv", "data/c.txt"])
+
+    assert find_inputs(task) == [
+        tmp_path / "data" / "a.csv",
+        tmp_path / "data" / "b.csv",
+        tmp_path / "data" / "c.txt",
+    ]
+
+
+def test__get_fingerprints(tmp_path, make_task):
+    (tmp_path / "input.csv").write_text("1,2,3")
+    A = make_task("A", inputs="input.csv")
+    B = make_task("B")
+    Z = make_task("Z")
+    dag = DAG(tasks={Z}, upstream_dependencies={B: A})
+
+    before = get_fingerprints(dag)
+    assert before == get_fingerprints(dag)
+
+    # changing an input changes the task and everything downstream
+    (tmp_path / "input.csv").write_text("1,2,3,4")
+    after = get_fingerprints(dag)
+    assert after[A] != before[A]
+    assert after[B] != before[B]
+    assert after[Z] == before[Z]
+
+    # so does changing the script
+    (tmp_path / "Z.py").write_text("pass\n")
+    assert get_fingerprints(dag)[Z] != after[Z]
+
+
+def test__Composer_run_tasks_incremental(tmp_path, make_task, read_log):
+    A, B, Z = (make_task(name) for name in "ABZ")
+    dq = Composer(DAG(tasks={Z}, upstream_dependencies={B: A}))
+
+    with RunHistory(tmp_path / "history.db") as history:
+        with pytest.raises(ValueError):
+            dq.run_tasks(incremental=True)
+
+        dq.run_tasks(history=history, incremental=True)
+        assert read_log(clear=True) == ["A", "B", "Z"]
+
+        dq.run_tasks(history=history, incremental=True)
+        assert read_log(clear=True) == []
+
+        (tmp_path / "A.py").write_text((tmp_path / "A.py").read_text() + "# edited\n")
+        dq.run_tasks(history=history, incremental=True)
+        assert read_log(clear=True) == ["A", "B"]
+
+        # without incremental, everything runs
+        dq.run_tasks(history=history)
+        assert read_log(clear=True) == ["A", "B", "Z"]
+
+
+def test__Composer_run_tasks_incremental_reverted_change(tmp_path, make_task, read_log):
+    A = make_task("A")
+    B = make_task("B")
+    # B fails while tmp_path/fail exists
+    fails = f"SystemExit(__import__('os').path.exists({str(tmp_path / 'fail')!r}))"
+    B.loc.write_text(B.loc.read_text().replace("SystemExit(0)", fails))
+    dq = Composer(DAG(upstream_dependencies={B: A}))
+    original = A.loc.read_text()
+
+    with RunHistory(tmp_path / "history.db") as history:
+        dq.run_tasks(history=history, incremental=True)
+        assert read_log(clear=True) == ["A", "B"]
+
+        # A changes and B fails, so B's last success is still from run 1
+        A.loc.write_text(original + "# edited\n")
+        (tmp_path / "fail").touch()
+        results = dq.run_tasks(history=history, incremental=True)
+        assert not results[B].succeeded
+        assert read_log(clear=True) == ["A", "B"]
+
+        # reverting A matches B's last success, but A must run first
+        A.loc.write_text(original)
+        (tmp_path / "fail").unlink()
+        results = dq.run_tasks(history=history, incremental=True)
+        assert set(results) == {A, B}
+        assert read_log(clear=True) == ["A", "B"]
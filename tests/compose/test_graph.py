@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Unit tests for the array-backed graph snapshot."""
+import pytest
+
+from alyeska.compose import Task, DAG
+from alyeska.compose.graph import CSRGraph
+
+
+@pytest.fixture()
+def tasks():
+    return [Task(f"{name}.py", env="test-env") for name in "ABCDZ"]
+
+
+@pytest.fixture()
+def dag(tasks):
+    """A -> B -> D, A -> C -> D, Z"""
+    A, B, C, D, Z = tasks
+    return DAG(tasks={Z}, upstream_dependencies={B: A, C: A, D: {B, C}})
+
+
+def test__CSRGraph(dag, tasks):
+    A, B, C, D, Z = tasks
+    csr = dag.compile()
+
+    assert len(csr) == 5
+    assert set(csr.tasks) == dag.tasks
+    assert all(csr.tasks[csr.ids[t]] == t for t in dag.tasks)
+    assert len(csr.targets) == len(csr.reverse_targets) == 4
+    for t in dag.tasks:
+        i = csr.ids[t]
+        assert csr.get_tasks(csr.downstream(i)) == dag.get_downstream(t)
+        assert csr.get_tasks(csr.upstream(i)) == dag.get_upstream(t)
+
+    # computed upstream ids match the DAG's own reverse adjacency
+    transposed = CSRGraph(csr.tasks, dag._edges)
+    assert transposed.reverse_offsets == csr.reverse_offsets
+    for i in range(len(csr)):
+        assert sorted(transposed.upstream(i)) == sorted(csr.upstream(i))
+
+
+def test__CSRGraph_traversals(dag, tasks):
+    A, B, C, D, Z = tasks
+    csr = dag.compile()
+    ids = csr.ids
+
+    order = [csr.tasks[i] for i in csr.topological_order()]
+    assert order.index(A) < order.index(B) < order.index(D)
+    assert order.index(C) < order.index(D)
+
+    levels = csr.levels()
+    assert [levels[ids[t]] for t in tasks] == [1, 2, 2, 3, 1]
+
+    weights = [{B: 10}.get(t, 1) for t in csr.tasks]
+    longest = csr.longest_paths(weights)
+    assert [longest[ids[t]] for t in tasks] == [12, 11, 2, 1, 1]
+
+    assert csr.get_tasks(csr.reachable([ids[A]])) == {B, C, D}
+    assert csr.get_tasks(csr.reachable([ids[D]], reverse=True)) == {A, B, C}
+    assert csr.reachable([ids[Z]]) == set()
+
+
+def test__CSRGraph_cyclic(tasks):
+    A, B, C, D, Z = tasks
+    csr = CSRGraph([A, B, C], {A: [B], B: [C], C: [A]})
+
+    assert csr.topological_order() is None
+    assert csr.levels() is None
+    assert csr.longest_paths([1, 1, 1]) is None
+
+
+def test__DAG_compile_cache(dag, tasks):
+    A, B, C, D, Z = tasks
+    csr = dag.compile()
+    assert dag.compile() is csr
+    assert dag.copy().compile() is csr
+
+    dag.add_dependency(Z, depends_on=D)
+    assert dag.compile() is not csr
+    assert len(dag.compile().targets) == 5
+    assert dag.get_descendants(A) == {B, C, D, Z}
+
+    csr = dag.compile()
+    dag.remove_task(Z)
+    assert dag.compile() is not csr
+    assert len(dag.compile()) == 4
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Unit tests for the compose run history."""
+import sqlite3
+import sys
+
+import pytest
+
+from alyeska.compose import Task, DAG, Composer
+from alyeska.compose.history import RunHistory, percentile
+
+
+@pytest.fixture()
+def history(tmp_path):
+    with RunHistory(tmp_path / "history.db") as h:
+        yield h
+
+
+def record_durations(history, task, durations, returncode=0):
+    for i, duration in enumerate(durations):
+        run_id = history.start_run()
+        history.record(
+            run_id, task, start=i * 100, end=i * 100 + duration, returncode=returncode
+        )
+        history.end_run(run_id)
+
+
+def test__percentile():
+    assert percentile([1, 2, 3, 4], 0) == 1
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([1, 2, 3, 4], 100) == 4
+    assert percentile([7], 90) == 7
+
+    with pytest.raises(ValueError):
+        percentile([], 50)
+    with pytest.raises(ValueError):
+        percentile([1], 101)
+
+
+def test__RunHistory_wal(history):
+    (mode,) = history._cnxn.execute("PRAGMA journal_mode").fetchone()
+    assert mode == "wal"
+
+
+def test__RunHistory_migrate(tmp_path):
+    path = tmp_path / "old.db"
+    cnxn = sqlite3.connect(str(path))
+    cnxn.execute(
+        "CREATE TABLE task_runs (run_id TEXT, loc TEXT, env TEXT, start_time REAL, "
+        "end_time REAL, returncode INTEGER, max_rss INTEGER, cpu_time REAL)"
+    )
+    cnxn.close()
+
+    with RunHistory(path) as history:
+        A = Task("A.py", "test-env")
+        history.record("old-run", A, start=0, end=1, returncode=0, fingerprint="f")
+        assert history.get_last_fingerprints([A]) == {A: "f"}
+
+
+def test__RunHistory_last_fingerprints(history):
+    A, B = (Task(f"{name}.py", "test-env") for name in "AB")
+    history.record("run-1", A, start=0, end=1, returncode=0, fingerprint="a1")
+    history.record("run-2", A, start=5, end=6, returncode=0, fingerprint="a2")
+    history.record("run-3", A, start=9, end=10, returncode=1, fingerprint="a3")
+    history.record("run-1", B, start=0, end=1, returncode=0)
+
+    assert history.get_last_fingerprints([A, B]) == {A: "a2"}
+
+
+def test__RunHistory_record(history):
+    A = Task("A.py", "test-env")
+    run_id = history.start_run()
+    history.record(
+        run_id, A, start=10, end=12.5, returncode=0, max_rss=1024, cpu_time=2.0
+    )
+    history.end_run(run_id)
+
+    (run,) = history.get_task_runs(A)
+    assert run.run_id == run_id
+    assert run.duration == 2.5
+    assert run.max_rss == 1024
+    assert run.cpu_time == 2.0
+    assert history.get_task_runs(Task("B.py", "test-env")) == []
+
+
+def test__RunHistory_percentiles(history):
+    A = Task("A.py", "test-env")
+    record_durations(history, A, [4, 1, 3, 2])
+    record_durations(history, A, [100], returncode=1)  # failures don't count
+
+    assert history.get_durations(A) == [1, 2, 3, 4]
+    assert history.get_percentiles(A, [0, 50, 100]) == {0: 1, 50: 2.5, 100: 4}
+    assert history.get_percentiles(Task("B.py", "test-env")) == {}
+
+
+def test__RunHistory_trend(history):
+    A = Task("A.py", "test-env")
+    B = Task("B.py", "test-env")
+    record_durations(history, A, [10, 12, 14, 16])
+    record_durations(history, B, [5, 5, 5])
+
+    assert history.get_trend(A) == pytest.approx(2)
+    assert history.get_trend(A, last=1) == 0
+    assert history.get_trend(B) == pytest.approx(0)
+
+
+def test__RunHistory_slowest(history):
+    A, B, C = (Task(f"{name}.py", "test-env") for name in "ABC")
+    record_durations(history, A, [1, 1])
+    record_durations(history, B, [30, 10])
+    record_durations(history, C, [5])
+
+    assert history.get_slowest(2) == [(B, 20), (C, 5)]
+    assert history.get_expected_durations([A, B, Task("Z.py")]) == {A: 1, B: 20}
+
+
+def test__Composer_run_tasks_history(history, tmp_path):
+    script = tmp_path / "A.py"
+    script.write_text("x = [0] * 1000\n")
+    A = Task(script, env=sys.executable)
+    B = Task(tmp_path / "B.py", env=sys.executable)  # does not exist, fails
+    dq = Composer(DAG(tasks={A, B}))
+
+    results = dq.run_tasks(history=history)
+
+    (a_run,) = history.get_task_runs(A)
+    (b_run,) = history.get_task_runs(B)
+    assert a_run.run_id == b_run.run_id
+    assert a_run.returncode == 0
+    assert b_run.returncode != 0
+    assert a_run.max_rss > 0
+    assert a_run.cpu_time >= 0
+    assert results[A].max_rss == a_run.max_rss
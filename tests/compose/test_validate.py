@@ -14,10 +14,17 @@
 ## See the License for the specific language governing permissions and
 ## limitations under the License.
 ## ---------------------------------------------------------------------------
+import copy
+import time
+
 import pytest
 
-from alyeska.compose.exceptions import ConfigurationError
-from alyeska.compose.validate import validate_config
+from alyeska.compose.exceptions import (
+    ConfigurationError,
+    CyclicConfigurationError,
+    CyclicGraphError,
+)
+from alyeska.compose.validate import find_cycles, find_errors, validate_config
 
 from test_compose_globals import (
     COMPOSE_SMALL,
@@ -69,6 +76,85 @@ def test__validate_config():
     validate_config(VALID_CONFIG)
 
 
+def test__validate_config_reports_every_error():
+    invalid_config = copy.deepcopy(VALID_CONFIG)
+    invalid_config["tasks"].update(
+        {
+            "no_env": {"loc": "/path/to/no_env"},
+            "bad_types": {"env": "base", "weight": -1, "inputs": 3, "uses": [1]},
+            "typo": {"env": "base", "use": "hello"},
+            "dangling": {"env": "base", "uses": ["hello", "missing", "gone"]},
+        }
+    )
+    with pytest.raises(ConfigurationError) as e:
+        validate_config(invalid_config)
+
+    assert e.value.errors == [
+        "tasks.no_env: missing `env`",
+        "tasks.bad_types.uses: must be a task name or a list of task names",
+        "tasks.bad_types.weight: must not be negative",
+        "tasks.bad_types.inputs: must be a str or a list of str",
+        "tasks.typo: unknown keys ['use']",
+        "tasks.dangling.uses: unknown task 'missing'",
+        "tasks.dangling.uses: unknown task 'gone'",
+    ]
+    assert not isinstance(e.value, CyclicGraphError)
+
+
+def test__validate_config_cycles():
+    cyclic_config = copy.deepcopy(VALID_CONFIG)
+    cyclic_config["tasks"].update(
+        {
+            "a": {"env": "base", "uses": "c"},
+            "b": {"env": "base", "uses": ["a", "hello"]},
+            "c": {"env": "base", "uses": "b"},
+            "me": {"env": "base", "uses": "me"},
+            "unknown": {"env": "base", "uses": "missing"},
+        }
+    )
+    with pytest.raises(CyclicConfigurationError) as e:
+        validate_config(cyclic_config)
+
+    assert isinstance(e.value, CyclicGraphError)
+    assert e.value.errors == [
+        "tasks.unknown.uses: unknown task 'missing'",
+        "cycle: a -> b -> c -> a",
+        "cycle: me -> me",
+    ]
+
+    # cycles can be allowed
+    assert find_errors(cyclic_config, check_cycles=False) == e.value.errors[:1]
+
+
+def test__find_cycles():
+    assert find_cycles({}) == []
+    assert find_cycles({"a": ["b"], "b": []}) == []
+    # two cycles through a, one reported per strongly connected component
+    assert find_cycles({"a": ["b", "c"], "b": ["a"], "c": ["a"]}) == [["a", "b", "a"]]
+    assert find_cycles({"a": ["b"], "b": ["c"], "c": ["b"], "d": ["d"]}) == [
+        ["b", "c", "b"],
+        ["d", "d"],
+    ]
+
+
+def test__validate_config_is_linear():
+    n = 20000
+    config = copy.deepcopy(VALID_CONFIG)
+    config["tasks"] = {
+        f"t{i}": {"env": "base", "uses": [f"t{j}" for j in range(max(0, i - 3), i)]}
+        for i in range(n)
+    }
+    config["tasks"]["t0"]["uses"] = f"t{n - 1}"  # one very long cycle
+
+    start = time.perf_counter()
+    errors = find_errors(config)
+    assert time.perf_counter() - start < 5
+
+    assert len(errors) == 1
+    assert errors[0].startswith("cycle: t0 -> t")
+    assert errors[0].endswith(f"t{n - 1} -> t0")
+
+
 # def test__validate_version():
 #     with pytest.raises(ConfigurationError):
 #         invalid_config = VALID_CONFIG.copy()
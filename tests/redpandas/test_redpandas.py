@@ -19,9 +19,12 @@
 Tests will fail if you don't have valid AWS credentials exported to your dev
 environment.
 """
+import itertools
 import os
 
+import numpy as np
 import pandas as pd
+import psycopg2
 import pytest
 
 import alyeska as aly
@@ -29,6 +32,27 @@ import alyeska.locksmith.redshift as rs
 import alyeska.redpandas as rp
 
 ALYESKA_REDSHIFT_SECRET = os.getenv("ALYESKA_REDSHIFT_SECRET")
+# e.g. "host=localhost dbname=postgres user=postgres"; Redshift can't COPY FROM STDIN
+ALYESKA_POSTGRES_DSN = os.getenv("ALYESKA_POSTGRES_DSN")
+requires_postgres = pytest.mark.skipif(
+    ALYESKA_POSTGRES_DSN is None, reason="ALYESKA_POSTGRES_DSN is not set"
+)
+
+NULLABLE_DF = pd.DataFrame(
+    {
+        "s": ["a", "", None, 'x,"y"\n', np.nan],
+        "f": [1.0, np.nan, 2.5, np.inf, -4.0],
+        "i": [1, 2, 3, 4, 5],
+        "t": [
+            pd.Timestamp("2019-01-01"),
+            pd.NaT,
+            pd.Timestamp("2019-01-02 03:04:05.123456"),
+            None,
+            pd.Timestamp("2019-01-01"),
+        ],
+        "b": [True, False, True, True, False],
+    }
+)
 
 
 def test_input__assert_table_exists():
@@ -66,3 +90,202 @@ def test__insert_pandas_into():
     assert len(test_result) == expected_len
 
     aly.sqlagent.execute_sql(cnxn, f"DROP TABLE {table_name};")
+
+
+def test__generate_csv_chunks():
+    chunks = list(rp.generate_csv_chunks(NULLABLE_DF, chunksize=2))
+    assert chunks == [
+        '"a",1,1,2019-01-01,true\n"",,2,,false\n',
+        ',2.5,3,2019-01-02 03:04:05.123456,true\n"x,""y""\n",Infinity,4,,true\n',
+        ",-4,5,2019-01-01,false\n",
+    ]
+
+    with pytest.raises(ValueError):
+        next(rp.generate_csv_chunks(NULLABLE_DF, chunksize=0))
+
+
+def test__ChunkedReader():
+    reader = rp.ChunkedReader(["abc", "", "defg"])
+    assert reader.read(2) == "ab"
+    assert reader.read(3) == "cde"
+    assert reader.read() == "fg"
+    assert reader.read(5) == ""
+
+
+def test__ChunkedReader_error():
+    def chunks():
+        yield "abc"
+        raise ValueError("bad chunk")
+
+    reader = rp.ChunkedReader(chunks())
+    assert reader.read(3) == "abc"
+    with pytest.raises(ValueError):
+        reader.read(3)
+    assert isinstance(reader.error, ValueError)
+
+
+class CopyCursor:
+    """Stands in for a cursor whose copy_expert fails the way psycopg2's
+    does when reading the file raises"""
+
+    class connection:
+        encoding = "UTF8"
+
+    def copy_expert(self, sql, file):
+        try:
+            while file.read(8192):
+                pass
+        except Exception as e:
+            raise psycopg2.errors.QueryCanceled(f"COPY from stdin failed: {e}")
+
+
+def test__write_frames_copy_error():
+    bad_frames = [NULLABLE_DF, pd.DataFrame({"b": [1]})]
+    with pytest.raises(ValueError):
+        rp.write_frames(CopyCursor(), "t", bad_frames, method="copy")
+
+
+def test__quote_strings():
+    values = pd.Series(["a", "", "it's", "back\\slash"])
+    assert rp.quote_strings(values).tolist() == [
+        "'a'",
+        "''",
+        "'it''s'",
+        "'back\\slash'",
+    ]
+    assert rp.quote_strings(values, standard_strings=False).tolist() == [
+        "E'a'",
+        "E''",
+        "E'it''s'",
+        "E'back\\\\slash'",
+    ]
+
+
+@requires_postgres
+def test__generate_insert_queries():
+    cnxn = psycopg2.connect(ALYESKA_POSTGRES_DSN)
+    df = NULLABLE_DF.assign(
+        s=["it's", "back\\slash", None, "None", "caf\u00e9"],
+        o=[pd.Timestamp("2019-01-01"), 1.5, None, "x", 2],
+    )
+    aly.sqlagent.execute_sql(
+        cnxn,
+        "CREATE TEMP TABLE inserted"
+        "(s TEXT, f FLOAT, i INT, t TIMESTAMP, b BOOLEAN, o TEXT);",
+    )
+    with cnxn.cursor() as curs:
+        queries = list(rp.generate_insert_queries(curs, "inserted", df, chunksize=2))
+        assert len(queries) == 3
+        assert all(isinstance(query, bytes) for query in queries)
+        for query in queries:
+            curs.execute(query)
+
+    inserted = pd.read_sql("SELECT * FROM inserted ORDER BY i", cnxn)
+    assert inserted["s"].tolist() == df["s"].tolist()
+    assert inserted["f"].isna().tolist() == df["f"].isna().tolist()
+    assert inserted["t"].isna().tolist() == df["t"].isna().tolist()
+    assert inserted["o"].tolist() == ["2019-01-01 00:00:00", "1.5", None, "x", "2"]
+
+
+@requires_postgres
+def test__insert_pandas_into_copy():
+    cnxn = psycopg2.connect(ALYESKA_POSTGRES_DSN)
+    aly.sqlagent.execute_sql(
+        cnxn,
+        "CREATE TEMP TABLE copied(s TEXT, f FLOAT, i INT, t TIMESTAMP, b BOOLEAN);"
+        "CREATE TEMP TABLE inserted(s TEXT, f FLOAT, i INT, t TIMESTAMP, b BOOLEAN);",
+    )
+    with pytest.raises(ValueError):
+        rp.insert_pandas_into(cnxn, "copied", NULLABLE_DF, method="csv")
+
+    rp.insert_pandas_into(cnxn, "copied", NULLABLE_DF, chunksize=2, method="copy")
+    rp.insert_pandas_into(cnxn, "inserted", NULLABLE_DF, chunksize=2)
+
+    copied = pd.read_sql("SELECT * FROM copied ORDER BY i", cnxn)
+    inserted = pd.read_sql("SELECT * FROM inserted ORDER BY i", cnxn)
+    pd.testing.assert_frame_equal(copied, inserted)
+    assert copied["s"].tolist() == ["a", "", None, 'x,"y"\n', None]
+    assert copied["t"].isna().tolist() == [False, True, False, True, False]
+
+
+@requires_postgres
+@pytest.mark.parametrize("method", ["values", "copy"])
+def test__insert_frames_into(method):
+    cnxn = psycopg2.connect(ALYESKA_POSTGRES_DSN)
+    cnxn.autocommit = True
+    aly.sqlagent.execute_sql(cnxn, "CREATE TEMP TABLE streamed(a INT, s TEXT);")
+
+    def frames(n):
+        for i in range(n):
+            yield pd.DataFrame({"a": range(i * 3, i * 3 + 3), "s": ["x", None, ""]})
+
+    reports = []
+    rows, nbytes = rp.insert_frames_into(
+        cnxn,
+        "streamed",
+        frames(4),
+        chunksize=2,
+        method=method,
+        progress=lambda *report: reports.append(report),
+    )
+    assert rows == 12
+    assert [r for r, _ in reports] == [2, 3, 5, 6, 8, 9, 11, 12]
+    assert reports[-1] == (rows, nbytes)
+    assert cnxn.autocommit
+
+    actual = pd.read_sql("SELECT * FROM streamed ORDER BY a", cnxn)
+    assert actual["a"].tolist() == list(range(12))
+
+    # a bad frame rolls back the whole stream
+    bad_frames = itertools.chain(frames(2), [pd.DataFrame({"b": [1]})])
+    with pytest.raises(ValueError):
+        rp.insert_frames_into(cnxn, "streamed", bad_frames, method=method)
+    assert len(pd.read_sql("SELECT * FROM streamed", cnxn)) == 12
+
+
+def test__get_staging_table():
+    staging_table = rp.get_staging_table("etl.account")
+    assert staging_table.startswith("etl.account_staging_")
+    assert staging_table != rp.get_staging_table("etl.account")
+
+
+@requires_postgres
+def test__parallel_insert_into():
+    cnxn = psycopg2.connect(ALYESKA_POSTGRES_DSN)
+    cnxn.autocommit = True
+    table_name = f"parallel_{os.getpid()}"
+    aly.sqlagent.execute_sql(cnxn, f"CREATE TABLE {table_name}(a INT, s TEXT);")
+
+    def connect():
+        return psycopg2.connect(ALYESKA_POSTGRES_DSN)
+
+    def count_staging_tables():
+        query = (
+            "SELECT 1 FROM information_schema.tables "
+            f"WHERE table_name LIKE '{table_name}_staging_%';"
+        )
+        return len(pd.read_sql(query, cnxn))
+
+    try:
+        frames = (
+            pd.DataFrame({"a": range(i * 5, i * 5 + 5), "s": ["x"] * 5})
+            for i in range(20)
+        )
+        rows, _ = rp.parallel_insert_into(
+            connect, table_name, frames, connections=3, chunksize=2
+        )
+        assert rows == 100
+        actual = pd.read_sql(f"SELECT a FROM {table_name} ORDER BY a", cnxn)
+        assert actual["a"].tolist() == list(range(100))
+        assert count_staging_tables() == 0
+
+        # a failing frame leaves the target untouched
+        bad_frames = [pd.DataFrame({"a": [1], "s": ["x"]})] * 5 + [
+            pd.DataFrame({"a": ["not a number"], "s": ["x"]})
+        ]
+        with pytest.raises(psycopg2.DataError):
+            rp.parallel_insert_into(connect, table_name, bad_frames, connections=2)
+        assert len(pd.read_sql(f"SELECT * FROM {table_name}", cnxn)) == 100
+        assert count_staging_tables() == 0
+    finally:
+        aly.sqlagent.execute_sql(cnxn, f"DROP TABLE {table_name};")
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+## ---------------------------------------------------------------------------
+## Copyright 2019 Dynatrace LLC
+##
+## Licensed under the Apache License, Version 2.0 (the "License");
+## you may not use this file except in compliance with the License.
+## You may obtain a copy of the License at
+##
+##     http://www.apache.org/licenses/LICENSE-2.0
+##
+## Unless required by applicable law or agreed to in writing, software
+## distributed under the License is distributed on an "AS IS" BASIS,
+## WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+## See the License for the specific language governing permissions and
+## limitations under the License.
+## ---------------------------------------------------------------------------
+"""Tests for the alyeska.redpandas.s3 submodule.
+
+The staging tests need a local S3 stand-in, such as MinIO or moto_server,
+and are skipped unless ALYESKA_S3_ENDPOINT_URL and ALYESKA_S3_BUCKET are set.
+"""
+import gzip
+import json
+import os
+import uuid
+
+import boto3
+import numpy as np
+import pandas as pd
+import pytest
+
+import alyeska.redpandas.s3 as rps
+
+ALYESKA_S3_ENDPOINT_URL = os.getenv("ALYESKA_S3_ENDPOINT_URL")
+ALYESKA_S3_BUCKET = os.getenv("ALYESKA_S3_BUCKET")
+requires_s3 = pytest.mark.skipif(
+    ALYESKA_S3_ENDPOINT_URL is None or ALYESKA_S3_BUCKET is None,
+    reason="ALYESKA_S3_ENDPOINT_URL and ALYESKA_S3_BUCKET are not set",
+)
+
+DF = pd.DataFrame({"a": range(10), "s": ["x", "", None, "y", np.nan] * 2})
+
+
+def test__split_frame():
+    parts = rps.split_frame(DF, 4)
+    assert [len(p) for p in parts] == [3, 3, 2, 2]
+    pd.testing.assert_frame_equal(pd.concat(parts), DF)
+
+    # no empty parts
+    assert [len(p) for p in rps.split_frame(DF.head(2), 4)] == [1, 1]
+
+    with pytest.raises(ValueError):
+        rps.split_frame(DF, 0)
+
+
+def test__serialize_part():
+    text = gzip.decompress(rps.serialize_part(DF.head(3))).decode()
+    assert text == '0,"x"\n1,""\n2,\\N\n'
+
+
+def test__get_manifest():
+    manifest = rps.get_manifest("bucket", ["p/part-0", "p/part-1"], [10, 20])
+    assert manifest == {
+        "entries": [
+            {
+                "url": "s3://bucket/p/part-0",
+                "mandatory": True,
+                "meta": {"content_length": 10},
+            },
+            {
+                "url": "s3://bucket/p/part-1",
+                "mandatory": True,
+                "meta": {"content_length": 20},
+            },
+        ]
+    }
+
+
+def test__get_credentials_clause():
+    session = boto3.Session(
+        aws_access_key_id="KEY", aws_secret_access_key="SECRET", aws_session_token="T"
+    )
+    assert rps.get_credentials_clause(session, "arn:role") == "IAM_ROLE 'arn:role'"
+    assert rps.get_credentials_clause(session) == (
+        "CREDENTIALS 'aws_access_key_id=KEY;aws_secret_access_key=SECRET;token=T'"
+    )
+
+
+def test__get_copy_query():
+    query = rps.get_copy_query("etl.t", ["a", "s"], "s3://b/m", "IAM_ROLE 'r'")
+    assert query == "\n".join(
+        [
+            'COPY etl.t ("a", "s")',
+            "FROM 's3://b/m'",
+            "IAM_ROLE 'r'",
+            "MANIFEST",
+            "FORMAT AS CSV GZIP NULL AS '\\\\N' TIMEFORMAT 'auto';",
+        ]
+    )
+
+    query = rps.get_copy_query(
+        "etl.t", ["a", "s"], "s3://b/m", "IAM_ROLE 'r'", file_format="parquet"
+    )
+    assert query.startswith("COPY etl.t\n")
+    assert query.endswith("MANIFEST\nFORMAT AS PARQUET;")
+
+
+@requires_s3
+def test__stage_frame():
+    s3 = boto3.Session().client("s3", endpoint_url=ALYESKA_S3_ENDPOINT_URL)
+    prefix = f"alyeska-test/{uuid.uuid4().hex}/"
+
+    keys = rps.stage_frame(s3, ALYESKA_S3_BUCKET, prefix, DF, 4, max_workers=2)
+    try:
+        assert keys[-1] == f"{prefix}manifest"
+        manifest = json.loads(
+            s3.get_object(Bucket=ALYESKA_S3_BUCKET, Key=keys[-1])["Body"].read()
+        )
+        assert [e["url"] for e in manifest["entries"]] == [
+            f"s3://{ALYESKA_S3_BUCKET}/{key}" for key in keys[:-1]
+        ]
+
+        rows = []
+        for entry, key in zip(manifest["entries"], keys):
+            body = s3.get_object(Bucket=ALYESKA_S3_BUCKET, Key=key)["Body"].read()
+            assert len(body) == entry["meta"]["content_length"]
+            rows.extend(gzip.decompress(body).decode().splitlines())
+        assert rows[:3] == ['0,"x"', '1,""', "2,\\N"]
+        assert len(rows) == len(DF)
+    finally:
+        rps.delete_staged(s3, ALYESKA_S3_BUCKET, keys)
+
+    listed = s3.list_objects_v2(Bucket=ALYESKA_S3_BUCKET, Prefix=prefix)
+    assert listed.get("KeyCount", 0) == 0